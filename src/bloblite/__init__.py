@@ -0,0 +1,22 @@
+"""BlobLite - local, lightweight simulation of Azure Blob Storage."""
+
+__version__ = "0.1.0"
+
+__all__ = ["BlobServiceClient", "ContainerClient", "Storage", "__version__"]
+
+# Importación diferida: ``import bloblite`` (y por tanto el CLI) no carga
+# storage/pathlib/json hasta que realmente se usa alguna clase.
+_LAZY = {
+    "Storage": "bloblite.storage",
+    "BlobServiceClient": "bloblite.sdk.blob_service_client",
+    "ContainerClient": "bloblite.sdk.container_client",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'bloblite' has no attribute '{name}'")
+    from importlib import import_module
+
+    return getattr(import_module(module_name), name)
@@ -0,0 +1,129 @@
+import os
+import tarfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO
+
+# Formato de los archivos de exportación: un tar con el manifiesto
+# ``bloblite.json`` (contenedor y metadata de todos los blobs) como primer
+# miembro, seguido de un miembro ``blobs/<nombre>`` por blob. Se lee y escribe
+# en modo stream, de forma secuencial y con buffers grandes.
+MANIFEST = "bloblite.json"
+BLOBS_PREFIX = "blobs/"
+FORMAT_VERSION = 1
+
+# Tamaño de los buffers de lectura/escritura del archivo.
+ARCHIVE_BUFFER = 4 * 1024 * 1024
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Sufijo -> modo de tarfile. Los ``.zst`` se comprimen aparte con zstandard.
+_WRITE_MODES = {
+    ".tar": "w|",
+    ".tar.gz": "w|gz",
+    ".tgz": "w|gz",
+    ".tar.bz2": "w|bz2",
+    ".tar.xz": "w|xz",
+    ".tar.zst": "zst",
+    ".tzst": "zst",
+}
+
+
+def write_mode(path: Path) -> str:
+    """
+    Modo de escritura según la extensión del archivo.
+
+    Raises:
+        ValueError: Si la extensión no es un formato soportado.
+    """
+    name = path.name.lower()
+    for suffix, mode in _WRITE_MODES.items():
+        if name.endswith(suffix):
+            return mode
+    raise ValueError(
+        f"unsupported archive extension for '{path.name}' (use .tar, .tar.gz or .tar.zst)"
+    )
+
+
+def _zstandard():
+    """Importa zstandard (dependencia opcional) o lanza ImportError con un mensaje claro."""
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("install the 'zstandard' package to use .zst archives") from None
+    return zstandard
+
+
+@contextmanager
+def open_writer(path: Path, mode: str) -> Iterator[tarfile.TarFile]:
+    """
+    Abre un archivo de exportación para escritura secuencial.
+
+    Args:
+        path: Ruta a escribir.
+        mode: Modo obtenido con ``write_mode`` para el nombre final del archivo.
+
+    Raises:
+        ImportError: Si es ``.zst`` y zstandard no está instalado.
+        OSError: Si no se puede escribir el archivo.
+    """
+    zstd = _zstandard() if mode == "zst" else None
+    with open(path, "wb", buffering=ARCHIVE_BUFFER) as raw:
+        if zstd is None:
+            with tarfile.open(fileobj=raw, mode=mode, bufsize=ARCHIVE_BUFFER) as tar:
+                yield tar
+            return
+        compressor = zstd.ZstdCompressor(threads=-1)
+        with compressor.stream_writer(raw, closefd=False) as stream:
+            with tarfile.open(fileobj=stream, mode="w|", bufsize=ARCHIVE_BUFFER) as tar:
+                yield tar
+
+
+@contextmanager
+def open_reader(path: Path) -> Iterator[tarfile.TarFile]:
+    """
+    Abre un archivo de exportación para lectura secuencial (tar, gz, bz2, xz o zst).
+
+    Raises:
+        ImportError: Si es ``.zst`` y zstandard no está instalado.
+        tarfile.TarError: Si el archivo no es un tar válido.
+        OSError: Si no se puede leer el archivo.
+    """
+    with open(path, "rb", buffering=ARCHIVE_BUFFER) as raw:
+        if raw.peek(4)[:4] != _ZSTD_MAGIC:
+            with tarfile.open(fileobj=raw, mode="r|*", bufsize=ARCHIVE_BUFFER) as tar:
+                yield tar
+            return
+        decompressor = _zstandard().ZstdDecompressor()
+        with decompressor.stream_reader(raw, read_size=ARCHIVE_BUFFER, closefd=False) as stream:
+            with tarfile.open(fileobj=stream, mode="r|", bufsize=ARCHIVE_BUFFER) as tar:
+                yield tar
+
+
+def add_bytes(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+    """Añade un miembro con contenido en memoria (p. ej. el manifiesto)."""
+    import io
+
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
+
+
+def add_stream(tar: tarfile.TarFile, name: str, stream: BinaryIO) -> None:
+    """Añade un miembro copiando un stream abierto (el tamaño se toma del propio stream)."""
+    info = tarfile.TarInfo(name)
+    stream.seek(0, os.SEEK_END)
+    info.size = stream.tell()
+    stream.seek(0)
+    info.mtime = int(time.time())
+    tar.addfile(info, stream)
+
+
+def is_safe_blob_name(name: str) -> bool:
+    """Rechaza nombres que escaparían del contenedor o chocarían con la metadata."""
+    if not name or name in (".", "..") or name.endswith(".metadata.json"):
+        return False
+    return not any(c in name for c in ("/", "\\", "\0"))
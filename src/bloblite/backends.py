@@ -0,0 +1,800 @@
+import os
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+# Tamaño de los buffers de copia al escribir blobs desde un stream.
+_COPY_BUFFER = 1024 * 1024
+
+# Separador entre contenedor y snapshot (``clientes@20261019T101500123456Z``).
+# Los nombres de contenedor de Azure no admiten "@", así que no hay ambigüedad.
+SNAPSHOT_SEP = "@"
+
+# Metadata congelada dentro del directorio de un snapshot. Termina en
+# ``.metadata.json``, así que ``list_blobs`` no la confunde con un blob.
+_SNAPSHOT_RECORDS = ".metadata.json"
+
+# ioctl de Linux para clonar un archivo por referencia (reflink, copy-on-write).
+_FICLONE = 0x40049409
+
+
+class MetadataError(OSError):
+    """``write_blob`` no pudo guardar la metadata (el contenido no se publicó)."""
+
+
+def snapshot_name(container: str, snapshot: str) -> str:
+    """Nombre con el que se lee un snapshot como si fuera un contenedor."""
+    return f"{container}{SNAPSHOT_SEP}{snapshot}"
+
+
+def _share_file(src: Path, dst: Path) -> None:
+    """
+    Crea ``dst`` con el contenido de ``src`` sin duplicar los datos si es posible.
+
+    Usa un hardlink; si el sistema de archivos no lo permite, un reflink
+    (Btrfs, XFS...) y, como último recurso, una copia. Los hardlinks son
+    seguros porque los blobs nunca se modifican en su sitio: toda escritura
+    crea un archivo nuevo y lo mueve con ``os.replace``.
+    """
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        import fcntl
+
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+    import shutil
+
+    shutil.copy2(src, dst)
+
+
+class Backend(ABC):
+    """
+    Interfaz de almacenamiento que usa ``Storage`` para contenedores, blobs y metadata.
+
+    Es una clase abstracta: un backend al que le falte algún método falla al
+    instanciarse, no a mitad de una operación.
+
+    ``Storage`` se encarga de los mensajes, el índice, el journal y el change
+    feed; el backend solo guarda bytes y metadata. Los errores de E/S se
+    propagan como ``OSError`` para que ``Storage`` los reporte.
+
+    Atributos:
+        root: Directorio raíz del backend (None si no usa disco).
+        state_dir: Directorio para el índice, el journal y el change feed.
+            None indica que ese estado se mantiene solo en memoria.
+    """
+
+    root: Path | None = None
+    state_dir: Path | None = None
+
+    def initialize(self) -> None:
+        """
+        Prepara el backend (crear directorios, tablas...).
+
+        Raises:
+            OSError: Si no se puede crear o abrir el almacenamiento.
+        """
+
+    @abstractmethod
+    def container_exists(self, container: str) -> bool: ...
+
+    @abstractmethod
+    def create_container(self, container: str) -> None: ...
+
+    @abstractmethod
+    def list_containers(self) -> list[str]: ...
+
+    @abstractmethod
+    def blob_exists(self, container: str, name: str) -> bool: ...
+
+    @abstractmethod
+    def list_blobs(self, container: str) -> list[str]: ...
+
+    @abstractmethod
+    def write_blob(
+        self,
+        container: str,
+        name: str,
+        source: Path | BinaryIO,
+        token: str | None = None,
+        metadata: dict | None = None,
+    ) -> None:
+        """
+        Escribe (o reemplaza) el contenido de un blob de forma atómica.
+
+        Args:
+            container: Nombre del contenedor.
+            name: Nombre del blob.
+            source: Archivo local o stream binario con el contenido.
+            token: Identificador de la transacción del journal; permite a
+                ``discard_partial`` limpiar una escritura interrumpida.
+            metadata: Si se indica, se guarda junto con el contenido: en la
+                misma transacción si el backend las tiene o, si no, antes de
+                publicar el contenido, para que un fallo no deje el blob
+                nuevo con la metadata anterior.
+        """
+
+    @abstractmethod
+    def read_blob(self, container: str, name: str, destination: str | Path) -> None:
+        """Copia un blob a un archivo o directorio local."""
+
+    @abstractmethod
+    def open_blob(self, container: str, name: str) -> BinaryIO:
+        """Abre un blob para lectura secuencial."""
+
+    @abstractmethod
+    def blob_size(self, container: str, name: str) -> int: ...
+
+    @abstractmethod
+    def delete_blob(self, container: str, name: str) -> None:
+        """Elimina un blob y su metadata."""
+
+    @abstractmethod
+    def read_metadata(self, container: str, name: str) -> dict | None: ...
+
+    @abstractmethod
+    def write_metadata(self, container: str, metadata: dict) -> None:
+        """Guarda la metadata de un blob (clave: ``metadata['name']``)."""
+
+    @abstractmethod
+    def iter_metadata(self, container: str | None = None) -> Iterator[tuple[str, dict]]:
+        """
+        Recorre ``(contenedor, metadata)`` de todos los blobs (para reconstruir el índice).
+
+        Con ``container`` se limita a ese contenedor. Nunca incluye snapshots.
+        """
+
+    @abstractmethod
+    def create_snapshot(self, container: str, snapshot: str, records: dict[str, dict]) -> None:
+        """
+        Congela el contenido actual de un contenedor.
+
+        Los blobs se comparten con el contenedor (hardlinks, reflinks o
+        referencias) en lugar de copiarse, y ``records`` es la copia congelada
+        de su metadata. El snapshot se lee como un contenedor más con el
+        nombre ``snapshot_name(container, snapshot)``.
+        """
+
+    @abstractmethod
+    def list_snapshots(self, container: str) -> list[str]: ...
+
+    @abstractmethod
+    def restore_snapshot(self, container: str, snapshot: str, token: str) -> None:
+        """
+        Deja el contenedor igual que el snapshot (blobs y metadata).
+
+        ``token`` identifica los temporales, como en ``write_blob``.
+        """
+
+    @abstractmethod
+    def delete_snapshot(self, container: str, snapshot: str) -> None: ...
+
+    def discard_partial(self, token: str) -> None:
+        """
+        Limpia los restos de una escritura interrumpida.
+
+        También limpia los de los sub-tokens ``<token>-N`` que usa una
+        importación masiva para escribir varios blobs en paralelo.
+        """
+
+
+class FileSystemBackend(Backend):
+    """
+    Un directorio por contenedor y un archivo por blob, con su metadata al lado
+    en ``<stem>.metadata.json``. Es el formato original de BlobLite.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.state_dir = root / ".bloblite"
+        self._snapshots: dict[str, dict[str, dict]] = {}
+
+    def initialize(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def container_exists(self, container: str) -> bool:
+        return self._path(container).exists()
+
+    def create_container(self, container: str) -> None:
+        self._path(container).mkdir()
+
+    def list_containers(self) -> list[str]:
+        return [
+            d.name for d in self.root.iterdir() if d.is_dir() and not d.name.startswith(".")
+        ]
+
+    def blob_exists(self, container: str, name: str) -> bool:
+        return (self._path(container) / name).is_file()
+
+    def list_blobs(self, container: str) -> list[str]:
+        return [
+            f.name
+            for f in self._path(container).iterdir()
+            if f.is_file() and not f.name.endswith(".metadata.json")
+        ]
+
+    def write_blob(
+        self,
+        container: str,
+        name: str,
+        source: Path | BinaryIO,
+        token: str | None = None,
+        metadata: dict | None = None,
+    ) -> None:
+        import shutil
+        import uuid
+
+        dst = self._path(container) / name
+        # Nunca se escribe sobre el archivo existente: los snapshots pueden
+        # compartir su inodo mediante hardlinks. Sin token, el temporal lleva
+        # un nombre único para que no choquen hilos ni procesos.
+        tmp_path = self._tmp_path(token or f"w{uuid.uuid4().hex}")
+        try:
+            if isinstance(source, Path):
+                shutil.copy2(source, tmp_path)
+            else:
+                with open(tmp_path, "wb") as f:
+                    shutil.copyfileobj(source, f, _COPY_BUFFER)
+            if metadata is not None:
+                try:
+                    self.write_metadata(container, metadata)
+                except OSError as exc:
+                    raise MetadataError(str(exc)) from exc
+            os.replace(tmp_path, dst)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def read_blob(self, container: str, name: str, destination: str | Path) -> None:
+        import shutil
+
+        shutil.copy2(self._path(container) / name, destination)
+
+    def open_blob(self, container: str, name: str) -> BinaryIO:
+        return open(self._path(container) / name, "rb")
+
+    def blob_size(self, container: str, name: str) -> int:
+        return (self._path(container) / name).stat().st_size
+
+    def delete_blob(self, container: str, name: str) -> None:
+        (self._path(container) / name).unlink()
+        self._metadata_path(container, name).unlink(missing_ok=True)
+
+    def read_metadata(self, container: str, name: str) -> dict | None:
+        import json
+
+        if SNAPSHOT_SEP in container:
+            return self._snapshot_records(container).get(name)
+        metadata_path = self._metadata_path(container, name)
+        if not metadata_path.exists():
+            return None
+        with open(metadata_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_metadata(self, container: str, metadata: dict) -> None:
+        import json
+
+        with open(self._metadata_path(container, metadata["name"]), "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+
+    def iter_metadata(self, container: str | None = None) -> Iterator[tuple[str, dict]]:
+        import json
+
+        for container in self.list_containers() if container is None else [container]:
+            for metadata_file in self._path(container).glob("*.metadata.json"):
+                try:
+                    with open(metadata_file, encoding="utf-8") as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if isinstance(metadata, dict) and "name" in metadata:
+                    yield container, metadata
+
+    def create_snapshot(self, container: str, snapshot: str, records: dict[str, dict]) -> None:
+        import json
+
+        src = self._path(container)
+        dst = self._path(snapshot_name(container, snapshot))
+        # Se prepara en un directorio oculto y se renombra al final, para que
+        # un snapshot a medias nunca aparezca en ``list_snapshots``.
+        tmp_dir = dst.with_name(f".{snapshot}.part")
+        tmp_dir.mkdir(parents=True)
+        for name in self.list_blobs(container):
+            _share_file(src / name, tmp_dir / name)
+        with open(tmp_dir / _SNAPSHOT_RECORDS, "w", encoding="utf-8") as f:
+            json.dump(records, f)
+        os.rename(tmp_dir, dst)
+
+    def list_snapshots(self, container: str) -> list[str]:
+        snapshots_dir = self.state_dir / "snapshots" / container
+        if not snapshots_dir.exists():
+            return []
+        return [
+            d.name for d in snapshots_dir.iterdir() if d.is_dir() and not d.name.startswith(".")
+        ]
+
+    def restore_snapshot(self, container: str, snapshot: str, token: str) -> None:
+        name_in_snapshot = snapshot_name(container, snapshot)
+        src = self._path(name_in_snapshot)
+        records = self._snapshot_records(name_in_snapshot)
+        names = set(self.list_blobs(name_in_snapshot))
+        for name in set(self.list_blobs(container)) - names:
+            self.delete_blob(container, name)
+        for number, name in enumerate(sorted(names)):
+            tmp_path = self._tmp_path(f"{token}-{number}")
+            tmp_path.unlink(missing_ok=True)
+            _share_file(src / name, tmp_path)
+            os.replace(tmp_path, self._path(container) / name)
+            if name in records:
+                self.write_metadata(container, records[name])
+            else:
+                self._metadata_path(container, name).unlink(missing_ok=True)
+
+    def delete_snapshot(self, container: str, snapshot: str) -> None:
+        import shutil
+
+        name = snapshot_name(container, snapshot)
+        shutil.rmtree(self._path(name))
+        self._snapshots.pop(name, None)
+
+    def discard_partial(self, token: str) -> None:
+        tmp_dir = self.state_dir / "tmp"
+        (tmp_dir / f"{token}.part").unlink(missing_ok=True)
+        if tmp_dir.exists():
+            for tmp_path in tmp_dir.glob(f"{token}-*.part"):
+                tmp_path.unlink(missing_ok=True)
+
+    def _path(self, container: str) -> Path:
+        """Directorio de un contenedor; los snapshots viven bajo ``.bloblite/snapshots/``."""
+        base, sep, snapshot = container.partition(SNAPSHOT_SEP)
+        if not sep:
+            return self.root / container
+        return self.state_dir / "snapshots" / base / snapshot
+
+    def _snapshot_records(self, container: str) -> dict[str, dict]:
+        """Metadata congelada de un snapshot (se cachea: los snapshots no cambian)."""
+        import json
+
+        records = self._snapshots.get(container)
+        if records is None:
+            try:
+                with open(self._path(container) / _SNAPSHOT_RECORDS, encoding="utf-8") as f:
+                    records = json.load(f)
+            except FileNotFoundError:
+                return {}
+            self._snapshots[container] = records
+        return records
+
+    def _metadata_path(self, container: str, name: str) -> Path:
+        return self._path(container) / f"{Path(name).stem}.metadata.json"
+
+    def _tmp_path(self, token: str) -> Path:
+        """Temporal en el mismo sistema de archivos, para poder moverlo atómicamente."""
+        tmp_dir = self.state_dir / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        return tmp_dir / f"{token}.part"
+
+
+class MemoryBackend(Backend):
+    """
+    Guarda todo en diccionarios del proceso. Pensado para tests rápidos:
+    no toca el disco y el índice, el journal y el change feed viven en memoria.
+    """
+
+    def __init__(self) -> None:
+        self._blobs: dict[str, dict[str, bytes]] = {}
+        self._metadata: dict[str, dict[str, dict]] = {}
+
+    def container_exists(self, container: str) -> bool:
+        return container in self._blobs
+
+    def create_container(self, container: str) -> None:
+        self._blobs[container] = {}
+        self._metadata[container] = {}
+
+    def list_containers(self) -> list[str]:
+        return [container for container in self._blobs if SNAPSHOT_SEP not in container]
+
+    def blob_exists(self, container: str, name: str) -> bool:
+        return name in self._blobs.get(container, {})
+
+    def list_blobs(self, container: str) -> list[str]:
+        return list(self._blobs[container])
+
+    def write_blob(
+        self,
+        container: str,
+        name: str,
+        source: Path | BinaryIO,
+        token: str | None = None,
+        metadata: dict | None = None,
+    ) -> None:
+        data = source.read_bytes() if isinstance(source, Path) else source.read()
+        if metadata is not None:
+            self.write_metadata(container, metadata)
+        self._blobs[container][name] = data
+
+    def read_blob(self, container: str, name: str, destination: str | Path) -> None:
+        destination = Path(destination)
+        if destination.is_dir():
+            destination = destination / name
+        destination.write_bytes(self._blobs[container][name])
+
+    def open_blob(self, container: str, name: str) -> BinaryIO:
+        import io
+
+        return io.BytesIO(self._blobs[container][name])
+
+    def blob_size(self, container: str, name: str) -> int:
+        return len(self._blobs[container][name])
+
+    def delete_blob(self, container: str, name: str) -> None:
+        del self._blobs[container][name]
+        self._metadata[container].pop(name, None)
+
+    def read_metadata(self, container: str, name: str) -> dict | None:
+        import copy
+
+        return copy.deepcopy(self._metadata.get(container, {}).get(name))
+
+    def write_metadata(self, container: str, metadata: dict) -> None:
+        import copy
+
+        self._metadata[container][metadata["name"]] = copy.deepcopy(metadata)
+
+    def iter_metadata(self, container: str | None = None) -> Iterator[tuple[str, dict]]:
+        for name in self.list_containers() if container is None else [container]:
+            for metadata in self._metadata.get(name, {}).values():
+                yield name, metadata
+
+    def create_snapshot(self, container: str, snapshot: str, records: dict[str, dict]) -> None:
+        import copy
+
+        # Los bytes son inmutables: el snapshot comparte los mismos objetos.
+        name = snapshot_name(container, snapshot)
+        self._blobs[name] = dict(self._blobs[container])
+        self._metadata[name] = copy.deepcopy(records)
+
+    def list_snapshots(self, container: str) -> list[str]:
+        prefix = snapshot_name(container, "")
+        return [name[len(prefix):] for name in self._blobs if name.startswith(prefix)]
+
+    def restore_snapshot(self, container: str, snapshot: str, token: str) -> None:
+        import copy
+
+        name = snapshot_name(container, snapshot)
+        self._blobs[container] = dict(self._blobs[name])
+        self._metadata[container] = copy.deepcopy(self._metadata[name])
+
+    def delete_snapshot(self, container: str, snapshot: str) -> None:
+        name = snapshot_name(container, snapshot)
+        del self._blobs[name]
+        self._metadata.pop(name, None)
+
+
+class SQLiteBackend(Backend):
+    """
+    Empaqueta los blobs en una base SQLite (``<root>/blobs.sqlite3``).
+
+    Los blobs de hasta ``inline_limit`` bytes se guardan dentro de la propia
+    base junto a su metadata, evitando un archivo (e inodo) por blob; los más
+    grandes se guardan como archivos en ``<root>/objects/``. Usa modo WAL, por
+    lo que varios procesos pueden compartir la misma raíz.
+    """
+
+    def __init__(self, root: Path, inline_limit: int = 256 * 1024) -> None:
+        import threading
+
+        self.root = root
+        self.state_dir = root / ".bloblite"
+        self.db_path = root / "blobs.sqlite3"
+        self.inline_limit = inline_limit
+        self._local = threading.local()
+
+    def initialize(self) -> None:
+        import sqlite3
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        try:
+            with self._conn() as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS containers (name TEXT PRIMARY KEY)")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS blobs ("
+                    " container TEXT NOT NULL, name TEXT NOT NULL, size INTEGER NOT NULL,"
+                    " data BLOB, path TEXT, metadata TEXT,"
+                    " PRIMARY KEY (container, name))"
+                )
+        except sqlite3.Error as exc:
+            raise OSError(f"cannot initialize '{self.db_path}': {exc}") from exc
+
+    def _conn(self):
+        """Una conexión por hilo (sqlite3 no comparte conexiones entre hilos)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=30)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            except sqlite3.Error as exc:
+                raise OSError(f"cannot open '{self.db_path}': {exc}") from exc
+            self._local.conn = conn
+        return conn
+
+    def container_exists(self, container: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM containers WHERE name = ?", (container,)
+        ).fetchone()
+        return row is not None
+
+    def create_container(self, container: str) -> None:
+        with self._conn() as conn:
+            conn.execute("INSERT OR IGNORE INTO containers (name) VALUES (?)", (container,))
+
+    def list_containers(self) -> list[str]:
+        rows = self._conn().execute("SELECT name FROM containers")
+        return [row[0] for row in rows if SNAPSHOT_SEP not in row[0]]
+
+    def blob_exists(self, container: str, name: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM blobs WHERE container = ? AND name = ?", (container, name)
+        ).fetchone()
+        return row is not None
+
+    def list_blobs(self, container: str) -> list[str]:
+        rows = self._conn().execute("SELECT name FROM blobs WHERE container = ?", (container,))
+        return [row[0] for row in rows]
+
+    def write_blob(
+        self,
+        container: str,
+        name: str,
+        source: Path | BinaryIO,
+        token: str | None = None,
+        metadata: dict | None = None,
+    ) -> None:
+        import json
+        import shutil
+        import uuid
+
+        stream = open(source, "rb") if isinstance(source, Path) else source
+        try:
+            head = stream.read(self.inline_limit + 1)
+            data, path = head, None
+            if len(head) > self.inline_limit:
+                # Blob grande: se escribe a un temporal y se mueve a objects/.
+                objects = self.root / "objects" / container
+                objects.mkdir(parents=True, exist_ok=True)
+                tmp_path = objects / f".{token or uuid.uuid4().hex}.part"
+                with open(tmp_path, "wb") as f:
+                    f.write(head)
+                    shutil.copyfileobj(stream, f, _COPY_BUFFER)
+                path = objects / name
+                os.replace(tmp_path, path)
+                data = None
+        finally:
+            if stream is not source:
+                stream.close()
+
+        size = len(data) if data is not None else path.stat().st_size
+        old_path = self._blob_path(container, name)
+        # El contenido y la metadata se confirman en la misma transacción.
+        encoded = None if metadata is None else json.dumps(metadata)
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO blobs (container, name, size, data, path, metadata)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (container, name) DO UPDATE SET"
+                " size = excluded.size, data = excluded.data, path = excluded.path,"
+                " metadata = coalesce(excluded.metadata, metadata)",
+                (container, name, size, data, None if path is None else str(path), encoded),
+            )
+        if old_path is not None and path is None:
+            old_path.unlink(missing_ok=True)
+
+    def read_blob(self, container: str, name: str, destination: str | Path) -> None:
+        import shutil
+
+        destination = Path(destination)
+        if destination.is_dir():
+            destination = destination / name
+        with self.open_blob(container, name) as src, open(destination, "wb") as dst:
+            shutil.copyfileobj(src, dst, _COPY_BUFFER)
+
+    def open_blob(self, container: str, name: str) -> BinaryIO:
+        import io
+
+        row = self._row(container, name, "data, path")
+        if row[1] is not None:
+            return open(row[1], "rb")
+        return io.BytesIO(row[0])
+
+    def blob_size(self, container: str, name: str) -> int:
+        return self._row(container, name, "size")[0]
+
+    def delete_blob(self, container: str, name: str) -> None:
+        path = self._blob_path(container, name)
+        with self._conn() as conn:
+            conn.execute("DELETE FROM blobs WHERE container = ? AND name = ?", (container, name))
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def read_metadata(self, container: str, name: str) -> dict | None:
+        import json
+
+        row = self._conn().execute(
+            "SELECT metadata FROM blobs WHERE container = ? AND name = ?", (container, name)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def write_metadata(self, container: str, metadata: dict) -> None:
+        import json
+
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE blobs SET metadata = ? WHERE container = ? AND name = ?",
+                (json.dumps(metadata), container, metadata["name"]),
+            )
+
+    def iter_metadata(self, container: str | None = None) -> Iterator[tuple[str, dict]]:
+        import json
+
+        if container is None:
+            rows = self._conn().execute(
+                "SELECT container, metadata FROM blobs"
+                " WHERE metadata IS NOT NULL AND instr(container, ?) = 0",
+                (SNAPSHOT_SEP,),
+            ).fetchall()
+        else:
+            rows = self._conn().execute(
+                "SELECT container, metadata FROM blobs WHERE container = ? AND metadata IS NOT NULL",
+                (container,),
+            ).fetchall()
+        for container, metadata in rows:
+            yield container, json.loads(metadata)
+
+    def create_snapshot(self, container: str, snapshot: str, records: dict[str, dict]) -> None:
+        import json
+
+        name = snapshot_name(container, snapshot)
+        files = self._share_objects(container, name)
+        with self._conn() as conn:
+            conn.execute("INSERT INTO containers (name) VALUES (?)", (name,))
+            # Los blobs pequeños se copian dentro de la base; los grandes
+            # comparten el archivo de objects/ (hardlink o reflink).
+            conn.execute(
+                "INSERT INTO blobs (container, name, size, data, path)"
+                " SELECT ?, name, size, data, NULL FROM blobs"
+                " WHERE container = ? AND path IS NULL",
+                (name, container),
+            )
+            conn.executemany(
+                "INSERT INTO blobs (container, name, size, path) VALUES (?, ?, ?, ?)",
+                [(name, blob, size, str(path)) for blob, size, path in files],
+            )
+            conn.executemany(
+                "UPDATE blobs SET metadata = ? WHERE container = ? AND name = ?",
+                [(json.dumps(record), name, blob) for blob, record in records.items()],
+            )
+
+    def list_snapshots(self, container: str) -> list[str]:
+        prefix = snapshot_name(container, "")
+        rows = self._conn().execute(
+            "SELECT name FROM containers WHERE substr(name, 1, ?) = ?", (len(prefix), prefix)
+        )
+        return [row[0][len(prefix):] for row in rows]
+
+    def restore_snapshot(self, container: str, snapshot: str, token: str) -> None:
+        name = snapshot_name(container, snapshot)
+        old_paths = {
+            row[0]
+            for row in self._conn().execute(
+                "SELECT path FROM blobs WHERE container = ? AND path IS NOT NULL", (container,)
+            )
+        }
+        files = self._share_objects(name, container, token)
+        with self._conn() as conn:
+            conn.execute("DELETE FROM blobs WHERE container = ?", (container,))
+            conn.execute(
+                "INSERT INTO blobs (container, name, size, data, path, metadata)"
+                " SELECT ?, name, size, data, NULL, metadata FROM blobs"
+                " WHERE container = ? AND path IS NULL",
+                (container, name),
+            )
+            conn.executemany(
+                "INSERT INTO blobs (container, name, size, path, metadata)"
+                " SELECT ?, ?, ?, ?, metadata FROM blobs WHERE container = ? AND name = ?",
+                [(container, blob, size, str(path), name, blob) for blob, size, path in files],
+            )
+        for path in old_paths - {str(path) for _, _, path in files}:
+            Path(path).unlink(missing_ok=True)
+
+    def delete_snapshot(self, container: str, snapshot: str) -> None:
+        import shutil
+
+        name = snapshot_name(container, snapshot)
+        with self._conn() as conn:
+            conn.execute("DELETE FROM blobs WHERE container = ?", (name,))
+            conn.execute("DELETE FROM containers WHERE name = ?", (name,))
+        shutil.rmtree(self.root / "objects" / name, ignore_errors=True)
+
+    def discard_partial(self, token: str) -> None:
+        objects = self.root / "objects"
+        if objects.exists():
+            for pattern in (f"*/.{token}.part", f"*/.{token}-*.part"):
+                for tmp_path in objects.glob(pattern):
+                    tmp_path.unlink(missing_ok=True)
+
+    def _share_objects(
+        self, source: str, target: str, token: str | None = None
+    ) -> list[tuple[str, int, Path]]:
+        """
+        Comparte los blobs grandes de ``source`` en ``objects/<target>/``.
+
+        Con ``token`` cada archivo pasa por un temporal y se mueve con
+        ``os.replace``, para no tocar el inodo que pueda estar en uso.
+
+        Returns:
+            Tuplas ``(nombre, tamaño, ruta nueva)``.
+        """
+        rows = self._conn().execute(
+            "SELECT name, size, path FROM blobs WHERE container = ? AND path IS NOT NULL",
+            (source,),
+        ).fetchall()
+        if not rows:
+            return []
+        objects = self.root / "objects" / target
+        objects.mkdir(parents=True, exist_ok=True)
+        shared = []
+        for number, (name, size, path) in enumerate(rows):
+            dst = objects / name
+            if token is None:
+                _share_file(Path(path), dst)
+            else:
+                tmp_path = objects / f".{token}-{number}.part"
+                tmp_path.unlink(missing_ok=True)
+                _share_file(Path(path), tmp_path)
+                os.replace(tmp_path, dst)
+            shared.append((name, size, dst))
+        return shared
+
+    def _row(self, container: str, name: str, columns: str) -> tuple:
+        row = self._conn().execute(
+            f"SELECT {columns} FROM blobs WHERE container = ? AND name = ?", (container, name)
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"blob '{container}/{name}' not found")
+        return row
+
+    def _blob_path(self, container: str, name: str) -> Path | None:
+        row = self._conn().execute(
+            "SELECT path FROM blobs WHERE container = ? AND name = ?", (container, name)
+        ).fetchone()
+        return Path(row[0]) if row and row[0] else None
+
+
+def create_backend(kind: str, root: Path) -> Backend:
+    """
+    Crea un backend por nombre (``fs``, ``memory`` o ``sqlite``).
+
+    Raises:
+        ValueError: Si el tipo de backend no existe.
+    """
+    if kind in ("fs", "filesystem"):
+        return FileSystemBackend(root)
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SQLiteBackend(root)
+    raise ValueError(f"unknown backend '{kind}'")
@@ -0,0 +1,146 @@
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+# Tamaño de los bloques con los que se lee el final de un feed.
+_TAIL_BLOCK = 64 * 1024
+
+
+class ChangeFeed:
+    """
+    Registro append-only y ordenado de eventos por contenedor.
+
+    En disco cada contenedor tiene un archivo ``<directory>/<contenedor>.log``
+    con un evento JSON por línea, y el cursor es el offset en bytes tras el
+    evento. Con ``directory=None`` los eventos se guardan en memoria y el
+    cursor es la posición en la lista.
+    """
+
+    def __init__(self, directory: Path | None) -> None:
+        self.directory = directory
+        self._events: dict[str, list[dict]] = {}
+
+    def append(self, container: str, event: dict) -> None:
+        """
+        Añade un evento al final del feed del contenedor.
+
+        Raises:
+            OSError: Si no se puede escribir el feed.
+        """
+        if self.directory is None:
+            self._events.setdefault(container, []).append(dict(event))
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._path(container), "ab") as f:
+            f.write((json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8"))
+
+    def tail(self, container: str, count: int) -> list[dict]:
+        """
+        Retorna los últimos ``count`` eventos completos del feed de un contenedor.
+
+        Raises:
+            OSError: Si el feed existe pero no se puede leer.
+        """
+        if count <= 0:
+            return []
+        if self.directory is None:
+            return [dict(event) for event in self._events.get(container, [])[-count:]]
+        try:
+            f = open(self._path(container), "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            # Se lee desde el final por bloques hasta tener ``count`` líneas.
+            end = position = f.seek(0, os.SEEK_END)
+            data = b""
+            while position > 0 and data.count(b"\n") <= count:
+                step = min(_TAIL_BLOCK, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        data = data[: data.rfind(b"\n") + 1] if end else b""
+        events = []
+        for line in data.splitlines()[-count:]:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events
+
+    def drop_partial(self, container: str) -> None:
+        """
+        Elimina un evento a medio escribir al final del feed (de un proceso que murió).
+
+        Debe llamarse con el lock del journal tomado, como ``append``.
+
+        Raises:
+            OSError: Si no se puede leer o recortar el feed.
+        """
+        if self.directory is None:
+            return
+        try:
+            f = open(self._path(container), "r+b")
+        except FileNotFoundError:
+            return
+        with f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            position = size
+            while position > 0:
+                step = min(_TAIL_BLOCK, position)
+                position -= step
+                f.seek(position)
+                newline = f.read(step).rfind(b"\n")
+                if newline >= 0:
+                    f.truncate(position + newline + 1)
+                    return
+            f.truncate(0)
+
+    def read(self, container: str, offset: int) -> Iterator[tuple[dict, int]]:
+        """
+        Recorre los eventos posteriores a ``offset``.
+
+        Yields:
+            Tuplas ``(evento, offset_siguiente)``.
+
+        Raises:
+            OSError: Si el feed existe pero no se puede leer.
+        """
+        if self.directory is None:
+            events = self._events.get(container, [])
+            for position in range(offset, len(events)):
+                yield dict(events[position]), position + 1
+            return
+
+        try:
+            f = open(self._path(container), "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # evento a medio escribir; se leerá en la próxima llamada
+                offset += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                yield event, offset
+
+    def end(self, container: str) -> int:
+        """Offset del final actual del feed de un contenedor."""
+        if self.directory is None:
+            return len(self._events.get(container, []))
+        try:
+            return self._path(container).stat().st_size
+        except OSError:
+            return 0
+
+    def _path(self, container: str) -> Path:
+        return self.directory / f"{container}.log"
@@ -1,75 +1,362 @@
-import argparse
 import os
-from pathlib import Path
+import sys
 
-from bloblite.storage import Storage
+# The CLI keeps its imports to the bare minimum: argparse, pathlib and the
+# storage module are only loaded when a command actually needs them, so tight
+# shell loops pay for interpreter startup and little else.
 
+# Command table shared by the fast-path dispatcher and the argparse parser.
+# Each command is (help, positionals, options); positionals are (name, help)
+# and options are (flag, kind, help) with kind "required", "optional" or "flag".
+_RESOURCES = {
+    "container": (
+        "Manage containers",
+        {
+            "create": (
+                "Create a new container",
+                [("name", "Name of the container to create")],
+                [],
+            ),
+            "list": ("List all containers", [], []),
+            "export": (
+                "Export a whole container (blobs and metadata) to one archive",
+                [],
+                [
+                    ("--container", "required", "Container name"),
+                    ("--out", "required", "Archive path (.tar, .tar.gz, .tar.xz or .tar.zst)"),
+                ],
+            ),
+            "import": (
+                "Import an archive created with 'container export'",
+                [],
+                [
+                    ("--file", "required", "Archive path"),
+                    ("--container", "optional", "Target container (defaults to the exported one)"),
+                    ("--overwrite", "flag", "Replace blobs that already exist"),
+                    ("--workers", "optional", "Parallel writers (default 4)"),
+                ],
+            ),
+            "snapshot": (
+                "Create a read-only point-in-time snapshot of a container",
+                [],
+                [("--container", "required", "Container name")],
+            ),
+            "snapshots": (
+                "List the snapshots of a container",
+                [],
+                [("--container", "required", "Container name")],
+            ),
+            "restore": (
+                "Restore a container to one of its snapshots",
+                [],
+                [
+                    ("--container", "required", "Container name"),
+                    ("--snapshot", "required", "Snapshot id"),
+                ],
+            ),
+            "delete-snapshot": (
+                "Delete a snapshot of a container",
+                [],
+                [
+                    ("--container", "required", "Container name"),
+                    ("--snapshot", "required", "Snapshot id"),
+                ],
+            ),
+        },
+    ),
+    "blob": (
+        "Manage blobs inside containers",
+        {
+            "upload": (
+                "Upload a file to a container",
+                [],
+                [
+                    ("--container", "required", "Target container name"),
+                    ("--file", "required", "Path to local file"),
+                    ("--overwrite", "flag", "Replace the blob if it already exists"),
+                ],
+            ),
+            "download": (
+                "Download a blob from a container",
+                [],
+                [
+                    ("--container", "required", "Container name"),
+                    ("--name", "required", "Blob name to download"),
+                    ("--dest", "required", "Destination folder path"),
+                ],
+            ),
+            "list": (
+                "List all blobs in a container",
+                [],
+                [("--container", "required", "Container name")],
+            ),
+            "show-metadata": (
+                "Show blob metadata",
+                [],
+                [
+                    ("--container", "required", "Container name"),
+                    ("--name", "required", "Blob name"),
+                ],
+            ),
+            "delete": (
+                "Delete a blob from a container",
+                [],
+                [
+                    ("--container", "required", "Container name"),
+                    ("--name", "required", "Blob name to delete"),
+                ],
+            ),
+            "changes": (
+                "Show the change feed of a container",
+                [],
+                [
+                    ("--container", "required", "Container name"),
+                    ("--since", "optional", "Cursor to resume from"),
+                    ("--watch", "flag", "Keep waiting for new events"),
+                    ("--timeout", "optional", "With --watch, stop after N idle seconds"),
+                ],
+            ),
+            "set-tags": (
+                "Replace the index tags of a blob",
+                [],
+                [
+                    ("--container", "required", "Container name"),
+                    ("--name", "required", "Blob name"),
+                    ("--tags", "required", "Comma-separated tags, e.g. 'tier=hot,owner=ana'"),
+                ],
+            ),
+            "get-tags": (
+                "Show the index tags of a blob",
+                [],
+                [
+                    ("--container", "required", "Container name"),
+                    ("--name", "required", "Blob name"),
+                ],
+            ),
+            "set-tier": (
+                "Move a blob to the hot, cool or archive tier",
+                [],
+                [
+                    ("--container", "required", "Container name"),
+                    ("--name", "required", "Blob name"),
+                    ("--tier", "required", "hot, cool or archive"),
+                ],
+            ),
+            "apply-tier-policy": (
+                "Demote blobs that have not been read for a while",
+                [],
+                [
+                    ("--container", "optional", "Limit the policy to one container"),
+                    ("--cool-after-days", "optional", "Idle days before moving to cool (default 30)"),
+                    ("--archive-after-days", "optional", "Idle days before moving to archive"),
+                ],
+            ),
+            "find": (
+                "Find blobs by tags and metadata",
+                [],
+                [
+                    ("--query", "required", "Query, e.g. \"size > 1000 AND tier = 'hot'\""),
+                    ("--container", "optional", "Limit the search to one container"),
+                ],
+            ),
+        },
+    ),
+}
 
-def _setup_arg_parser() -> argparse.ArgumentParser:
+# Top-level commands without a resource/action pair.
+_COMMANDS = {
+    "batch": (
+        "Run many commands (one per line) from stdin or a file in one process",
+        [],
+        [("--file", "optional", "File with commands ('-' or omitted reads stdin)")],
+    ),
+    "replay": (
+        "Replay a recorded trace (BLOBLITE_TRACE) against a scratch root",
+        [("trace", "Trace file to replay")],
+        [
+            ("--speed", "optional", "Speed factor, e.g. 2x, 0.5x or max (default 1x)"),
+            ("--workers", "optional", "Number of concurrent workers (default 4)"),
+            ("--root", "optional", "Scratch storage root (default: a temporary directory)"),
+        ],
+    ),
+}
+
+
+def _dest(flag: str) -> str:
+    """Return the attribute name argparse would use for an option flag."""
+    return flag.lstrip("-").replace("-", "_")
+
+
+def _add_arguments(parser, positionals: list, options: list) -> None:
+    """Register positionals and options from the command table on a parser."""
+    for name, arg_help in positionals:
+        parser.add_argument(name, help=arg_help)
+    for flag, kind, opt_help in options:
+        if kind == "flag":
+            parser.add_argument(flag, action="store_true", help=opt_help)
+        else:
+            parser.add_argument(flag, required=kind == "required", help=opt_help)
+
+
+def _setup_arg_parser():
     """Configure and return the argument parser for BlobLite CLI."""
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog="bloblite",
         description="[ok] BlobLite - Azure Blob Storage simulator (local)",
         epilog="Example: 'bloblite container create my-container'",
     )
 
-    # Container subcommands
     subp = parser.add_subparsers(dest="resource", required=True)
 
-    cont_parser = subp.add_parser("container", help="Manage containers")
-    cont_sub = cont_parser.add_subparsers(dest="action", required=True)
+    for resource, (res_help, actions) in _RESOURCES.items():
+        res_parser = subp.add_parser(resource, help=res_help)
+        res_sub = res_parser.add_subparsers(dest="action", required=True)
+        for action, (act_help, positionals, options) in actions.items():
+            act_parser = res_sub.add_parser(action, help=act_help)
+            _add_arguments(act_parser, positionals, options)
 
-    # Container actions
-    cont_create = cont_sub.add_parser("create", help="Create a new container")
-    cont_create.add_argument("name", help="Name of the container to create")
+    for command, (cmd_help, positionals, options) in _COMMANDS.items():
+        cmd_parser = subp.add_parser(command, help=cmd_help)
+        cmd_parser.set_defaults(action=None)
+        _add_arguments(cmd_parser, positionals, options)
 
-    cont_sub.add_parser("list", help="List all containers")
+    return parser
 
-    # Blob subcommands
-    blob_parser = subp.add_parser("blob", help="Manage blobs inside containers")
-    blob_sub = blob_parser.add_subparsers(dest="action", required=True)
 
-    # Blob actions
-    blob_upload = blob_sub.add_parser("upload", help="Upload a file to a container")
-    blob_upload.add_argument("--container", required=True, help="Target container name")
-    blob_upload.add_argument("--file", required=True, help="Path to local file")
+def _fast_parse(argv: list[str]):
+    """
+    Parse argv against the command table without importing argparse.
 
-    blob_download = blob_sub.add_parser(
-        "download", help="Download a blob from a container"
-    )
-    blob_download.add_argument("--container", required=True, help="Container name")
-    blob_download.add_argument("--name", required=True, help="Blob name to download")
-    blob_download.add_argument("--dest", required=True, help="Destination folder path")
+    Returns None whenever the input is not a plain, well-formed command
+    (help flags, unknown options, missing arguments...), so the caller can
+    fall back to argparse for the proper usage/error output.
+    """
+    if argv and argv[0] in _COMMANDS:
+        resource, action, rest = argv[0], None, argv[1:]
+        _, positionals, options = _COMMANDS[resource]
+    elif len(argv) >= 2 and argv[0] in _RESOURCES:
+        resource, action, rest = argv[0], argv[1], argv[2:]
+        spec = _RESOURCES[resource][1].get(action)
+        if spec is None:
+            return None
+        _, positionals, options = spec
+    else:
+        return None
 
-    blob_list = blob_sub.add_parser("list", help="List all blobs in a container")
-    blob_list.add_argument("--container", required=True, help="Container name")
+    values: dict[str, object] = {"resource": resource, "action": action}
+    kinds = {}
+    for flag, kind, _ in options:
+        kinds[flag] = kind
+        values[_dest(flag)] = False if kind == "flag" else None
+    pending = [name for name, _ in positionals]
 
-    blob_meta = blob_sub.add_parser("show-metadata", help="Show blob metadata")
-    blob_meta.add_argument("--container", required=True, help="Container name")
-    blob_meta.add_argument("--name", required=True, help="Blob name")
+    i = 0
+    while i < len(rest):
+        token = rest[i]
+        if token.startswith("-"):
+            flag, eq, value = token.partition("=")
+            kind = kinds.get(flag)
+            if kind is None:
+                return None
+            if kind == "flag":
+                if eq:
+                    return None
+                values[_dest(flag)] = True
+            else:
+                if not eq:
+                    i += 1
+                    if i >= len(rest):
+                        return None
+                    value = rest[i]
+                values[_dest(flag)] = value
+        elif pending:
+            values[pending.pop(0)] = token
+        else:
+            return None
+        i += 1
 
-    return parser
+    if pending:
+        return None
+    for flag, kind, _ in options:
+        if kind == "required" and values[_dest(flag)] is None:
+            return None
+
+    from types import SimpleNamespace
 
+    return SimpleNamespace(**values)
+
+
+def _parse_args(argv: list[str]):
+    """Parse argv with the fast path, falling back to argparse."""
+    args = _fast_parse(argv)
+    if args is None:
+        args = _setup_arg_parser().parse_args(argv)
+    return args
+
+
+def _get_storage():
+    """Crea una instancia de Storage configurable vía BLOBLITE_ROOT y BLOBLITE_BACKEND."""
+    from pathlib import Path
+
+    from bloblite.storage import Storage
 
-def _get_storage() -> Storage:
-    """Crea una instancia de Storage configurable vía BLOBLITE_ROOT."""
     custom_root = os.environ.get("BLOBLITE_ROOT")
-    root_path = Path(custom_root) if custom_root else None
-    return Storage(base_path=root_path)
+    root_path = Path(custom_root) if custom_root else Path.home() / ".bloblite_storage"
+    kind = os.environ.get("BLOBLITE_BACKEND", "fs")
+    if kind in ("fs", "filesystem"):
+        return Storage(base_path=root_path)
+
+    from bloblite.backends import create_backend
+
+    try:
+        backend = create_backend(kind, root_path)
+    except ValueError as exc:
+        print(f"[error] BLOBLITE_BACKEND: {exc}.")
+        sys.exit(2)
+    return Storage(backend=backend)
 
 
-def _handle_container_actions(args, storage: Storage) -> None:
+def _handle_container_actions(args, storage) -> None:
     """Execute container-related actions based on parsed arguments."""
     if args.action == "create":
         storage.create_container(name=args.name)
     elif args.action == "list":
         storage.list_containers()
+    elif args.action == "export":
+        storage.export_container(container=args.container, out_path=args.out)
+    elif args.action == "import":
+        try:
+            workers = int(args.workers) if args.workers is not None else 4
+        except ValueError:
+            print("[error] --workers must be a positive integer.")
+            return
+        if workers < 1:
+            print("[error] --workers must be a positive integer.")
+            return
+        storage.import_container(
+            archive_path=args.file,
+            container=args.container,
+            overwrite=args.overwrite,
+            workers=workers,
+        )
+    elif args.action == "snapshot":
+        storage.create_container_snapshot(container=args.container)
+    elif args.action == "snapshots":
+        storage.list_snapshots(container=args.container)
+    elif args.action == "restore":
+        storage.restore_snapshot(container=args.container, snapshot=args.snapshot)
+    elif args.action == "delete-snapshot":
+        storage.delete_snapshot(container=args.container, snapshot=args.snapshot)
 
 
-def _handle_blob_actions(args, storage: Storage) -> None:
+def _handle_blob_actions(args, storage) -> None:
     """Execute blob-related actions based on parsed arguments."""
     if args.action == "upload":
-        storage.upload_blob(container=args.container, file_path=args.file)
+        storage.upload_blob(
+            container=args.container, file_path=args.file, overwrite=args.overwrite
+        )
     elif args.action == "download":
         storage.download_blob(
             container=args.container,
@@ -86,19 +373,227 @@ def _handle_blob_actions(args, storage: Storage) -> None:
             print(metadata)
         else:
             print("[info] Metadata not found.")
+    elif args.action == "delete":
+        storage.delete_blob(container=args.container, blob_name=args.name)
+    elif args.action == "changes":
+        _handle_changes(args, storage)
+    elif args.action == "set-tags":
+        tags = _parse_tags(args.tags)
+        if tags is None:
+            print("[error] Tags must look like 'key=value,key2=value2'.")
+        else:
+            storage.set_blob_tags(container=args.container, blob_name=args.name, tags=tags)
+    elif args.action == "get-tags":
+        print(storage.get_blob_tags(container=args.container, blob_name=args.name))
+    elif args.action == "set-tier":
+        storage.set_blob_tier(container=args.container, blob_name=args.name, tier=args.tier)
+    elif args.action == "apply-tier-policy":
+        try:
+            cool = float(args.cool_after_days) if args.cool_after_days is not None else 30
+            archive = (
+                float(args.archive_after_days) if args.archive_after_days is not None else None
+            )
+        except ValueError:
+            print("[error] --cool-after-days and --archive-after-days must be numbers of days.")
+            return
+        storage.apply_tier_policy(
+            container=args.container, cool_after_days=cool, archive_after_days=archive
+        )
+    elif args.action == "find":
+        blobs = storage.find_blobs_by_tags(query=args.query, container=args.container)
+        for blob in blobs:
+            print(f"  {blob['container']}/{blob['name']}")
+        print(f"\nTotal: {len(blobs)} blob(s)")
+
 
+def _handle_changes(args, storage) -> None:
+    """Print change feed events, optionally waiting for new ones."""
+    if args.watch:
+        try:
+            timeout = float(args.timeout) if args.timeout is not None else None
+        except ValueError:
+            print("[error] --timeout must be a number of seconds.")
+            return
+        events = storage.watch(container=args.container, since=args.since, timeout=timeout)
+    else:
+        events = storage.iter_changes(container=args.container, since=args.since)
 
-def main() -> None:
+    cursor = args.since
+    try:
+        for event in events:
+            cursor = event["cursor"]
+            print(f"  [{event['seq']}] {event['event_type']} {event['name']} (cursor {cursor})")
+    except KeyboardInterrupt:
+        pass
+    print(f"\nCursor: {cursor or storage.change_feed_cursor(args.container)}")
+
+
+def _parse_tags(text: str) -> dict[str, str] | None:
+    """Parse 'k=v,k2=v2' into a dict. Returns None if malformed."""
+    tags = {}
+    for pair in filter(None, (item.strip() for item in text.split(","))):
+        key, sep, value = pair.partition("=")
+        if not sep or not key.strip():
+            return None
+        tags[key.strip()] = value.strip()
+    return tags
+
+
+_HANDLERS = {
+    "container": _handle_container_actions,
+    "blob": _handle_blob_actions,
+}
+
+
+def _run_batch(lines, storage) -> int:
+    """
+    Run one CLI command per line against a single Storage instance.
+
+    Blank lines and lines starting with '#' are ignored. Invalid lines are
+    reported and skipped. Returns the number of lines that failed to parse.
+    """
+    import shlex
+
+    failures = 0
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            argv = shlex.split(line)
+        except ValueError as exc:
+            print(f"[error] Line {lineno}: {exc}.")
+            failures += 1
+            continue
+
+        try:
+            args = _parse_args(argv)
+        except SystemExit:
+            args = None
+        if args is None or args.resource not in _HANDLERS:
+            print(f"[error] Line {lineno}: invalid command '{line}'.")
+            failures += 1
+            continue
+
+        _HANDLERS[args.resource](args, storage)
+    return failures
+
+
+def _handle_batch(args, storage) -> int:
+    """Execute the batch command reading from --file or stdin."""
+    if args.file in (None, "-"):
+        return _run_batch(sys.stdin, storage)
+    try:
+        with open(args.file, encoding="utf-8") as f:
+            return _run_batch(f, storage)
+    except OSError:
+        print(f"[error] Cannot read batch file '{args.file}'.")
+        return 1
+
+
+def _parse_speed(text: str | None) -> float | None:
+    """Parse '2x', '0.5', 'max'... into a speed factor (0 = as fast as possible)."""
+    if text is None:
+        return 1.0
+    text = text.strip().lower()
+    if text == "max":
+        return 0.0
+    try:
+        speed = float(text[:-1] if text.endswith("x") else text)
+    except ValueError:
+        return None
+    return speed if speed > 0 else None
+
+
+def _handle_replay(args) -> int:
+    """Replay a trace against a scratch root with synthetic data and report latencies."""
+    import shutil
+    import tempfile
+    import time
+    from contextlib import redirect_stdout
+    from pathlib import Path
+
+    from bloblite.backends import create_backend
+    from bloblite.storage import Storage
+    from bloblite.trace import percentile, read_trace, replay
+
+    speed = _parse_speed(args.speed)
+    if speed is None:
+        print("[error] --speed must look like '2x', '0.5x' or 'max'.")
+        return 1
+    try:
+        workers = int(args.workers) if args.workers is not None else 4
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        print("[error] --workers must be a positive integer.")
+        return 1
+    try:
+        records = list(read_trace(args.trace))
+    except (OSError, ValueError) as exc:
+        print(f"[error] Cannot read trace: {exc}.")
+        return 1
+    if not records:
+        print(f"[info] Trace '{args.trace}' has no operations.")
+        return 0
+
+    scratch = Path(args.root) if args.root else Path(tempfile.mkdtemp(prefix="bloblite-replay-"))
+    try:
+        kind = os.environ.get("BLOBLITE_BACKEND", "fs")
+        try:
+            backend = create_backend(kind, scratch / "root")
+        except ValueError as exc:
+            print(f"[error] BLOBLITE_BACKEND: {exc}.")
+            return 1
+        print(f"[info] Replaying {len(records)} operation(s) with {workers} worker(s)...")
+        # La salida de cada operación se descarta sin acumularla en memoria.
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            storage = Storage(backend=backend, trace=False)
+            began = time.perf_counter()
+            latencies = replay(records, storage, scratch / "data", speed, workers)
+            elapsed = time.perf_counter() - began
+    finally:
+        if not args.root:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"[ok] Replayed {total} operation(s) in {elapsed:.2f}s ({total / max(elapsed, 1e-9):.1f} ops/s).")
+    print(
+        f"\n  {'operation':<18} {'count':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}"
+        f" {'max ms':>9} {'recorded p50/p99 ms':>21}"
+    )
+    recorded: dict[str, list[float]] = {}
+    for r in records:
+        recorded.setdefault(r.op, []).append(r.duration)
+    for op in sorted(latencies):
+        values = sorted(latencies[op])
+        before = sorted(recorded.get(op, []))
+        row = [percentile(values, p) * 1000 for p in (50, 90, 99, 100)]
+        original = f"{percentile(before, 50) * 1000:.2f}/{percentile(before, 99) * 1000:.2f}"
+        print(
+            f"  {op:<18} {len(values):>7} "
+            + " ".join(f"{value:>9.2f}" for value in row)
+            + f" {original:>21}"
+        )
+    return 0
+
+
+def main(argv: list[str] | None = None) -> None:
     """Entry point for the BlobLite CLI application."""
-    parser = _setup_arg_parser()
-    args = parser.parse_args()
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.resource == "replay":
+        if _handle_replay(args):
+            sys.exit(1)
+        return
 
     storage = _get_storage()
 
-    if args.resource == "container":
-        _handle_container_actions(args, storage)
-    elif args.resource == "blob":
-        _handle_blob_actions(args, storage)
+    if args.resource == "batch":
+        if _handle_batch(args, storage):
+            sys.exit(1)
+    else:
+        _HANDLERS[args.resource](args, storage)
 
 
 if __name__ == "__main__":
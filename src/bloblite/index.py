@@ -0,0 +1,278 @@
+import re
+from bisect import bisect_left, bisect_right, insort
+from pathlib import Path
+
+# Campos de sistema presentes en la metadata de todo blob. Los tags de usuario
+# no pueden reutilizar estos nombres para que las consultas no sean ambiguas.
+SYSTEM_FIELDS = ("name", "size", "uploaded_at", "content_type", "tier")
+
+_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<op><=|>=|=|<|>)
+      | (?P<str>'(?:[^']|'')*')
+      | (?P<qid>"[^"]+")
+      | (?P<num>-?\d+(?:\.\d+)?(?![\w.]))
+      | (?P<word>[@\w.\-]+)
+    )""",
+    re.VERBOSE,
+)
+
+# Cota superior para nombres de contenedor/blob en las búsquedas binarias.
+_MAX = "\uffff"
+
+
+def parse_query(expression: str) -> list[tuple[str, str, str | int | float]]:
+    """
+    Convierte una expresión estilo Azure en una lista de condiciones.
+
+    La sintaxis admitida es ``campo op valor [AND campo op valor ...]`` donde
+    ``op`` es uno de ``= > >= < <=``, los valores de texto van entre comillas
+    simples y los numéricos sin comillas. Los nombres de campo pueden ir entre
+    comillas dobles (``"@container" = 'datos'``).
+
+    Args:
+        expression: Consulta, p. ej. ``size > 1000000 AND tier = 'hot'``.
+
+    Returns:
+        Lista de tuplas ``(campo, operador, valor)``.
+
+    Raises:
+        ValueError: Si la expresión no es válida.
+    """
+    tokens = []
+    pos = 0
+    expression = expression.strip()
+    while pos < len(expression):
+        match = _TOKEN_RE.match(expression, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"unexpected input at position {pos}")
+        pos = match.end()
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+
+    conditions = []
+    i = 0
+    while True:
+        if i + 3 > len(tokens):
+            raise ValueError("expected '<field> <op> <value>'")
+        (f_kind, field), (o_kind, op), (v_kind, raw) = tokens[i : i + 3]
+        if f_kind == "qid":
+            field = field[1:-1]
+        elif f_kind != "word":
+            raise ValueError(f"invalid field name {field!r}")
+        if o_kind != "op":
+            raise ValueError(f"invalid operator {op!r}")
+        if v_kind == "str":
+            value = raw[1:-1].replace("''", "'")
+        elif v_kind == "num":
+            value = float(raw) if "." in raw else int(raw)
+        else:
+            raise ValueError(f"invalid value {raw!r} (quote text values with '')")
+        conditions.append((field, op, value))
+
+        i += 3
+        if i == len(tokens):
+            return conditions
+        kind, word = tokens[i]
+        if kind != "word" or word.upper() != "AND":
+            raise ValueError(f"expected AND, found {word!r}")
+        i += 1
+
+
+def _fields(container: str, record: dict) -> dict[str, str | int | float]:
+    """Campos consultables de un registro: sistema, tags y ``@container``."""
+    fields = {
+        key: value
+        for key, value in record.get("tags", {}).items()
+        if isinstance(value, str)
+    }
+    for key in SYSTEM_FIELDS:
+        # Los blobs sin nivel explícito están en ``hot``.
+        value = record.get(key, "hot" if key == "tier" else None)
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            fields[key] = value
+    fields["@container"] = container
+    return fields
+
+
+def _kind(value) -> str:
+    return "str" if isinstance(value, str) else "num"
+
+
+def _matches(value, op: str, expected) -> bool:
+    if value is None or _kind(value) != _kind(expected):
+        return False
+    if op == "=":
+        return value == expected
+    if op == ">":
+        return value > expected
+    if op == ">=":
+        return value >= expected
+    if op == "<":
+        return value < expected
+    return value <= expected
+
+
+class BlobIndex:
+    """
+    Índice en memoria de la metadata de todos los blobs.
+
+    El archivo JSON es un checkpoint: junto con ``seq`` indica hasta qué
+    entrada del journal está incluido; el resto se aplica leyendo el journal.
+
+    Además de los registros por contenedor mantiene índices secundarios
+    ordenados por campo (uno para valores numéricos y otro para texto), de
+    modo que las consultas se resuelven con búsquedas binarias en lugar de
+    abrir la metadata de cada blob.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        # Número de secuencia del journal hasta el que llega este índice.
+        self.seq = 0
+        self.records: dict[str, dict[str, dict]] = {}
+        # (campo, "num"|"str") -> lista ordenada de (valor, contenedor, blob)
+        self._sorted: dict[tuple[str, str], list] | None = None
+
+    def load(self) -> bool:
+        """
+        Carga el índice desde disco.
+
+        Returns:
+            True si se pudo leer el archivo, False si no existe o está dañado.
+        """
+        import json
+
+        if self.path is None:
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or not isinstance(data.get("containers"), dict):
+            return False
+        self.records = data["containers"]
+        self.seq = data.get("seq", 0)
+        self._sorted = None
+        return True
+
+    def save(self) -> None:
+        """
+        Escribe el índice completo de forma atómica.
+
+        Raises:
+            OSError: Si no se puede escribir el archivo.
+        """
+        import json
+        import os
+
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"seq": self.seq, "containers": self.records}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Vacía el índice en memoria."""
+        self.records = {}
+        self._sorted = None
+
+    def get(self, container: str, name: str) -> dict | None:
+        """Retorna el registro de un blob o None si no está indexado."""
+        return self.records.get(container, {}).get(name)
+
+    def put(self, container: str, record: dict) -> None:
+        """Inserta o reemplaza el registro de un blob (clave: ``record['name']``)."""
+        name = record["name"]
+        self.remove(container, name)
+        self.records.setdefault(container, {})[name] = record
+        if self._sorted is not None:
+            for field, value in _fields(container, record).items():
+                insort(
+                    self._sorted.setdefault((field, _kind(value)), []),
+                    (value, container, name),
+                )
+
+    def remove(self, container: str, name: str) -> None:
+        """Elimina un blob del índice si estaba presente."""
+        record = self.records.get(container, {}).pop(name, None)
+        if record is None or self._sorted is None:
+            return
+        for field, value in _fields(container, record).items():
+            entries = self._sorted.get((field, _kind(value)), [])
+            pos = bisect_left(entries, (value, container, name))
+            if pos < len(entries) and entries[pos] == (value, container, name):
+                del entries[pos]
+
+    def _build(self) -> dict[tuple[str, str], list]:
+        if self._sorted is None:
+            self._sorted = {}
+            for container, blobs in self.records.items():
+                for name, record in blobs.items():
+                    for field, value in _fields(container, record).items():
+                        self._sorted.setdefault((field, _kind(value)), []).append(
+                            (value, container, name)
+                        )
+            for entries in self._sorted.values():
+                entries.sort()
+        return self._sorted
+
+    def _bounds(self, field: str, op: str, value) -> tuple[list, int, int]:
+        """
+        Límites de una condición en su índice secundario, sin copiar entradas.
+
+        Returns:
+            Tupla ``(entradas, low, high)``: cumplen la condición ``entradas[low:high]``.
+        """
+        entries = self._build().get((field, _kind(value)), [])
+        # (valor,) ordena antes que cualquier (valor, contenedor, blob) y
+        # (valor, _MAX) después, así acotamos todas las entradas con ese valor.
+        first, after = (value,), (value, _MAX)
+        low, high = 0, len(entries)
+        if op in ("=", ">="):
+            low = bisect_left(entries, first)
+        elif op == ">":
+            low = bisect_right(entries, after)
+        if op in ("=", "<="):
+            high = bisect_right(entries, after)
+        elif op == "<":
+            high = bisect_left(entries, first)
+        return entries, low, high
+
+    def query(self, expression: str, container: str | None = None) -> list[tuple[str, str]]:
+        """
+        Resuelve una consulta sobre los índices secundarios.
+
+        Se materializa solo la condición más selectiva; el resto se verifica
+        contra el registro ya cargado en memoria.
+
+        Args:
+            expression: Consulta (ver ``parse_query``).
+            container: Si se indica, limita la búsqueda a ese contenedor.
+
+        Returns:
+            Lista ordenada de tuplas ``(contenedor, blob)``.
+
+        Raises:
+            ValueError: Si la expresión no es válida.
+        """
+        conditions = parse_query(expression)
+        if container is not None:
+            conditions.append(("@container", "=", container))
+
+        # Solo se calculan los límites de cada condición; se recorre el rango
+        # más estrecho.
+        entries, low, high = min(
+            (self._bounds(field, op, value) for field, op, value in conditions),
+            key=lambda bounds: bounds[2] - bounds[1],
+        )
+        results = []
+        for i in range(low, high):
+            _, cont, name = entries[i]
+            fields = _fields(cont, self.records[cont][name])
+            if all(_matches(fields.get(f), op, v) for f, op, v in conditions):
+                results.append((cont, name))
+        return sorted(set(results))
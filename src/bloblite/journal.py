@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class Journal:
+    """
+    Write-ahead journal compartido entre procesos.
+
+    Cada operación se añade como una línea JSON con un número de secuencia
+    creciente (``seq``). Los escritores serializan las escrituras con un lock
+    de archivo; los lectores no bloquean: cada instancia recuerda hasta qué
+    byte leyó y en cada sincronización solo lee las líneas nuevas.
+
+    Al compactar, el journal se reemplaza por un archivo nuevo cuya cabecera
+    indica el ``seq`` del checkpoint. Los lectores detectan el cambio de
+    cabecera y deben recargar el checkpoint del índice antes de seguir leyendo
+    (``read_new`` lo indica con ``rotated=True``).
+
+    Con ``state_dir=None`` (backends en memoria) no se escribe nada a disco:
+    solo se asignan números de secuencia dentro del proceso.
+    """
+
+    def __init__(self, state_dir: Path | None) -> None:
+        self.path = None if state_dir is None else state_dir / "journal.log"
+        self.lock_path = None if state_dir is None else state_dir / "lock"
+        self.seq = 0
+        self.entries = 0  # entradas en el archivo actual (para decidir compactar)
+        self._offset = 0
+        self._base: int | None = None
+        self._mutex = threading.RLock()
+
+    @contextmanager
+    def lock(self):
+        """
+        Lock exclusivo entre procesos (y entre hilos de este proceso).
+
+        Raises:
+            OSError: Si no se puede crear o bloquear el archivo de lock.
+        """
+        with self._mutex:
+            if self.lock_path is None:
+                yield
+                return
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a+b") as f:
+                _lock_file(f)
+                try:
+                    yield
+                finally:
+                    _unlock_file(f)
+
+    def read_new(self) -> tuple[list[dict], bool]:
+        """
+        Lee las entradas añadidas desde la última llamada.
+
+        Returns:
+            Tupla ``(entradas, rotated)``. ``rotated`` es True si otro proceso
+            compactó entradas que esta instancia no llegó a leer: el llamador
+            debe recargar el checkpoint (y actualizar ``seq``) antes de aplicar
+            las entradas con ``seq`` mayor que el del checkpoint.
+        """
+        with self._mutex:
+            if self.path is None:
+                return [], False
+            try:
+                f = open(self.path, "rb")
+            except FileNotFoundError:
+                return [], False
+            with f:
+                # La cabecera identifica la generación del archivo: el seq del
+                # checkpoint a partir del cual empieza (0 si nunca se compactó).
+                header = f.readline()
+                base = 0
+                if header.startswith(b'{"base"'):
+                    base = json.loads(header)["base"]
+                else:
+                    f.seek(0)
+                if base != self._base:
+                    self._base = base
+                    self._offset = f.tell()
+                    self.entries = 0
+                # Si el archivo empieza después de lo último que vimos, hubo
+                # entradas que solo están ya en el checkpoint.
+                rotated = base > self.seq
+                f.seek(self._offset)
+                data = f.read()
+
+            # Solo se consumen líneas completas; una escritura en curso se
+            # leerá en la próxima sincronización.
+            end = data.rfind(b"\n") + 1
+            self._offset += end
+            entries = []
+            for line in data[:end].splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # línea dañada por un crash durante la escritura
+                entries.append(entry)
+                self.seq = max(self.seq, entry.get("seq", 0))
+            self.entries += len(entries)
+            return entries, rotated
+
+    def read_all(self) -> list[dict]:
+        """
+        Lee todas las entradas del archivo actual (las posteriores al último checkpoint).
+
+        No cambia lo que devolverá ``read_new``. Debe llamarse con el lock tomado.
+
+        Raises:
+            OSError: Si no se puede leer el journal.
+        """
+        if self.path is None:
+            return []
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        entries = []
+        with f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if "seq" in entry:
+                    entries.append(entry)
+        return entries
+
+    def append(self, entry: dict) -> dict:
+        """
+        Añade una entrada asignándole el siguiente número de secuencia.
+
+        Debe llamarse con el lock tomado y después de ``read_new`` para que
+        ``seq`` refleje lo escrito por otros procesos.
+
+        Returns:
+            La entrada con su ``seq``.
+
+        Raises:
+            OSError: Si no se puede escribir el journal.
+        """
+        return self.append_many([entry])[0]
+
+    def append_many(self, entries: list[dict], sync: bool = True) -> list[dict]:
+        """
+        Añade varias entradas consecutivas con una sola escritura y un solo fsync.
+
+        Mismas condiciones que ``append``; útil para operaciones masivas. Con
+        ``sync=False`` no se hace fsync: la escritura sobrevive a la caída del
+        proceso y la hace durable el siguiente fsync del journal.
+
+        Returns:
+            Las entradas con su ``seq``.
+
+        Raises:
+            OSError: Si no se puede escribir el journal.
+        """
+        entries = [{"seq": self.seq + i, **entry} for i, entry in enumerate(entries, 1)]
+        if not entries:
+            return entries
+        if self.path is None:
+            self.seq = entries[-1]["seq"]
+            return entries
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+        with open(self.path, "ab") as f:
+            f.write(data.encode("utf-8"))
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+        self.seq = entries[-1]["seq"]
+        # Nuestra propia escritura ya está aplicada: avanzamos el offset para
+        # no volver a leerla (nadie más escribe mientras tenemos el lock).
+        self.read_new()
+        return entries
+
+    def reset(self) -> None:
+        """
+        Reemplaza el journal por uno vacío tras escribir un checkpoint.
+
+        Debe llamarse con el lock tomado y con el checkpoint ya guardado hasta
+        ``seq``, que pasa a ser la cabecera (generación) del nuevo archivo.
+        """
+        if self.path is None:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps({"base": self.seq}).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.read_new()
+
+
+def _lock_file(f) -> None:
+    if os.name == "nt":
+        import msvcrt
+
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue  # LK_LOCK se rinde tras ~10 s; seguimos esperando
+    else:
+        import fcntl
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(f) -> None:
+    if os.name == "nt":
+        import msvcrt
+
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def pid_alive(pid: int) -> bool:
+    """Indica si un proceso de este host sigue vivo (para recuperar crashes)."""
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
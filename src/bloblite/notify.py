@@ -0,0 +1,95 @@
+import os
+import time
+from pathlib import Path
+
+# Máscara inotify: archivo modificado, creado o movido dentro del directorio.
+_IN_MODIFY = 0x00000002
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+
+
+class Notifier:
+    """
+    Espera cambios en un directorio consultándolo periódicamente.
+
+    Es el mecanismo portátil; ``InotifyNotifier`` lo reemplaza en Linux.
+    """
+
+    def __init__(self, directory: Path | None, poll_interval: float = 0.5) -> None:
+        self.directory = directory
+        self.poll_interval = poll_interval
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Bloquea hasta que pueda haber cambios o se agote ``timeout``."""
+        delay = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+        time.sleep(max(delay, 0))
+
+    def close(self) -> None:
+        """Libera los recursos del notificador."""
+
+
+class InotifyNotifier(Notifier):
+    """
+    Espera cambios en un directorio usando inotify (Linux).
+
+    Despierta en cuanto otro proceso escribe en el directorio, sin sondeo.
+
+    Raises:
+        OSError: Si inotify no está disponible.
+    """
+
+    def __init__(self, directory: Path, poll_interval: float = 0.5) -> None:
+        super().__init__(directory, poll_interval)
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_MODIFY | _IN_CREATE | _IN_MOVED_TO
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"cannot watch '{directory}'")
+
+    def wait(self, timeout: float | None = None) -> None:
+        import select
+
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if ready:
+            # Se descartan los eventos: el llamador vuelve a leer el feed.
+            try:
+                while os.read(self._fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def make_notifier(
+    directory: Path | None, poll_interval: float = 0.5, use_inotify: bool = True
+) -> Notifier:
+    """
+    Crea el mejor notificador disponible para un directorio.
+
+    Args:
+        directory: Directorio a observar (debe existir). None fuerza el sondeo.
+        poll_interval: Intervalo de sondeo si no se usa inotify.
+        use_inotify: Si False, fuerza el sondeo periódico.
+
+    Returns:
+        Un ``InotifyNotifier`` en Linux o un ``Notifier`` de sondeo en otro caso.
+    """
+    if use_inotify and directory is not None and os.name == "posix":
+        try:
+            return InotifyNotifier(directory, poll_interval)
+        except (OSError, AttributeError):
+            pass
+    return Notifier(directory, poll_interval)
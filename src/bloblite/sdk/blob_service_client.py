@@ -9,18 +9,33 @@ class BlobServiceClient:
     Simulates Azure BlobServiceClient for local use.
     """
 
-    def __init__(self, storage_root: Path | None) -> None:
-        self.storage = Storage(storage_root)
-        self.storage_root = storage_root
+    def __init__(self, storage_root: Path | None = None, backend=None, trace=None) -> None:
+        """
+        `backend` selects a storage backend from `bloblite.backends`
+        (e.g. `MemoryBackend()` for fast tests); by default blobs are files
+        under `storage_root`. `trace` records every operation to a file for
+        `bloblite replay` (defaults to the `BLOBLITE_TRACE` variable).
+        """
+        self.storage = Storage(storage_root, backend=backend, trace=trace)
+        self.storage_root = self.storage.base_path
 
     def list_containers(self) -> list[str]:
         """
-        List all available containers (folders).
+        List all available containers.
         """
-        return [item.name for item in self.storage_root.iterdir() if item.is_dir()]
+        return self.storage.list_containers(verbose=False)
 
-    def get_container_client(self, name: str) -> ContainerClient:
+    def get_container_client(self, name: str, snapshot: str | None = None) -> ContainerClient:
         """
         Returns a ContainerClient for the given container name.
+        With `snapshot`, the client reads that read-only snapshot instead.
         """
+        if snapshot is not None:
+            name = f"{name}@{snapshot}"
         return ContainerClient(name=name, storage=self.storage)
+
+    def find_blobs_by_tags(self, query: str) -> list[dict]:
+        """
+        Find blobs across all containers matching a tag/metadata query.
+        """
+        return self.storage.find_blobs_by_tags(query)
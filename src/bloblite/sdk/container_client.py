@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from pathlib import Path
 
 from bloblite.storage import Storage
@@ -24,11 +25,11 @@ class ContainerClient:
         """
         self.storage.list_blobs(self.name)
 
-    def upload_blob(self, file_path: str | Path) -> None:
+    def upload_blob(self, file_path: str | Path, overwrite: bool = False) -> None:
         """
         Upload a blob to the container.
         """
-        self.storage.upload_blob(self.name, str(file_path))
+        self.storage.upload_blob(self.name, str(file_path), overwrite=overwrite)
 
     def download_blob(self, blob_name: str, dest_path: str | Path) -> None:
         """
@@ -41,3 +42,115 @@ class ContainerClient:
         Return metadata for a blob.
         """
         return self.storage.get_blob_metadata(self.name, blob_name)
+
+    def delete_blob(self, blob_name: str) -> None:
+        """
+        Delete a blob and its metadata.
+        """
+        self.storage.delete_blob(self.name, blob_name)
+
+    def iter_changes(self, since: str | None = None) -> Iterator[dict]:
+        """
+        Iterate over the change feed of this container, resuming after `since`.
+        Each event carries a `cursor` to resume from.
+        """
+        return self.storage.iter_changes(self.name, since=since)
+
+    def watch(
+        self,
+        since: str | None = None,
+        timeout: float | None = None,
+        poll_interval: float = 0.5,
+        use_inotify: bool = True,
+    ) -> Iterator[dict]:
+        """
+        Yield change feed events as they happen (new events only by default).
+        """
+        return self.storage.watch(
+            self.name,
+            since=since,
+            timeout=timeout,
+            poll_interval=poll_interval,
+            use_inotify=use_inotify,
+        )
+
+    def set_blob_tags(self, blob_name: str, tags: dict[str, str]) -> None:
+        """
+        Replace the index tags of a blob.
+        """
+        self.storage.set_blob_tags(self.name, blob_name, tags)
+
+    def get_blob_tags(self, blob_name: str) -> dict[str, str]:
+        """
+        Return the index tags of a blob.
+        """
+        return self.storage.get_blob_tags(self.name, blob_name)
+
+    def set_blob_tier(self, blob_name: str, tier: str) -> None:
+        """
+        Move a blob to the "hot", "cool" or "archive" tier.
+        Cool and archive blobs are compressed and rehydrated when downloaded.
+        """
+        self.storage.set_blob_tier(self.name, blob_name, tier)
+
+    def apply_tier_policy(
+        self, cool_after_days: float = 30, archive_after_days: float | None = None
+    ) -> dict[str, int]:
+        """
+        Demote blobs of this container that have not been read for a while.
+        """
+        return self.storage.apply_tier_policy(
+            self.name, cool_after_days=cool_after_days, archive_after_days=archive_after_days
+        )
+
+    def find_blobs_by_tags(self, query: str) -> list[dict]:
+        """
+        Find blobs in this container matching a tag/metadata query.
+        """
+        return self.storage.find_blobs_by_tags(query, container=self.name)
+
+    def export_container(self, out_path: str | Path) -> int:
+        """
+        Export every blob of this container, with its metadata, to one archive.
+        """
+        return self.storage.export_container(self.name, str(out_path))
+
+    def import_container(
+        self, archive_path: str | Path, overwrite: bool = False, workers: int = 4
+    ) -> int:
+        """
+        Import an archive created with `export_container` into this container.
+        """
+        return self.storage.import_container(
+            str(archive_path), container=self.name, overwrite=overwrite, workers=workers
+        )
+
+    def create_snapshot(self) -> str | None:
+        """
+        Create a read-only point-in-time snapshot of this container and return its id.
+        """
+        return self.storage.create_container_snapshot(self.name)
+
+    def list_snapshots(self) -> list[str]:
+        """
+        List the snapshot ids of this container, oldest first.
+        """
+        return self.storage.list_snapshots(self.name, verbose=False)
+
+    def get_snapshot_client(self, snapshot: str) -> "ContainerClient":
+        """
+        Return a read-only ContainerClient over one snapshot of this container.
+        """
+        return ContainerClient(name=f"{self.name}@{snapshot}", storage=self.storage)
+
+    def restore_snapshot(self, snapshot: str) -> bool:
+        """
+        Restore this container to the given snapshot.
+        """
+        return self.storage.restore_snapshot(self.name, snapshot)
+
+    def delete_snapshot(self, snapshot: str) -> None:
+        """
+        Delete one snapshot of this container.
+        """
+        self.storage.delete_snapshot(self.name, snapshot)
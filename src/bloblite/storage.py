@@ -1,20 +1,65 @@
-import json
-import shutil
-from datetime import datetime, timezone
+from collections.abc import Iterator
 from pathlib import Path
 
+# json, shutil y datetime se importan dentro de los métodos que los usan para
+# que comandos simples (p. ej. ``container list``) arranquen más rápido.
+
 
 class Storage:
 
-    def __init__(self, base_path: Path | None = None):
-        self.base_path = base_path or Path.home() / ".bloblite_storage"
-        try:
-            self.base_path.mkdir(parents=True, exist_ok=True)
-        except PermissionError:
-            print(
-                f"[alert] Warning: Cannot create or access storage at {self.base_path}. Check your permissions."
-            )
-            self.base_path = None
+    def __init__(self, base_path: Path | None = None, backend=None, trace=None):
+        """
+        Args:
+            base_path: Raíz del almacenamiento en disco (por defecto
+                ``~/.bloblite_storage``). Se ignora si se pasa ``backend``.
+            backend: Backend de almacenamiento (ver ``bloblite.backends``). Por
+                defecto, un ``FileSystemBackend`` sobre ``base_path``.
+            trace: Ruta de un archivo donde registrar cada operación para
+                reproducirla después con ``bloblite replay``. Por defecto se
+                usa la variable de entorno ``BLOBLITE_TRACE`` (si existe);
+                ``False`` desactiva el registro.
+        """
+        if backend is None:
+            from bloblite.backends import FileSystemBackend
+
+            backend = FileSystemBackend(base_path or Path.home() / ".bloblite_storage")
+        # El backend se prepara, y el índice se carga (recuperando lo que haya
+        # quedado a medias), la primera vez que una operación los necesita.
+        self._backend = backend
+        self._initialized = False
+        self.base_path = backend.root
+        self._index = None
+        self._journal = None
+        self._feed = None
+        self._cold = None
+        self.trace = None
+        if trace is None:
+            import os
+
+            trace = os.environ.get("BLOBLITE_TRACE")
+        if trace:
+            self._start_trace(trace)
+        self._pending: dict[int, dict] = {}
+        self._recovering = False
+
+    @property
+    def backend(self):
+        """Backend de almacenamiento (None si no se pudo preparar)."""
+        if not self._initialized:
+            self._initialized = True
+            try:
+                self._backend.initialize()
+            except PermissionError:
+                print(
+                    f"[alert] Warning: Cannot create or access storage at {self.base_path}. Check your permissions."
+                )
+                self._backend = None
+                self.base_path = None
+            except OSError as exc:
+                print(f"[alert] Warning: Cannot create or access storage at {self.base_path}: {exc}.")
+                self._backend = None
+                self.base_path = None
+        return self._backend
 
     def create_container(self, name: str) -> None:
         """
@@ -26,38 +71,44 @@ class Storage:
         Raises:
             ValueError: Si el contenedor ya existe.
         """
-        if not self.base_path:
+        if not self.backend:
             print("[alert] Storage not initialized. Cannot create container.")
             return
-        container_path = self.base_path / name
-        if container_path.exists():
+        error = _validate_container_name(name)
+        if error:
+            print(f"[error] Invalid container name '{name}': {error}.")
+            return
+        if self.backend.container_exists(name):
             print(f"[info] Container '{name}' already exists.")
             return
 
         try:
-            container_path.mkdir()
+            self.backend.create_container(name)
             print(f"[ok] Container '{name}' created.")
         except PermissionError:
             print(f"[alert] Cannot create container '{name}'. Check your permissions.")
 
-    def list_containers(self) -> list[str]:
+    def list_containers(self, verbose: bool = True) -> list[str]:
         """
         Lista todos los contenedores existentes.
 
+        Args:
+            verbose: Si True, imprime los resultados (modo CLI). Si False, solo retorna la lista.
+
         Returns:
             Lista de nombres de contenedores.
         """
-        if not self.base_path:
+        if not self.backend:
             print("[alert] Storage not initialized. Cannot list containers.")
             return []
         try:
-            containers = sorted(
-                [d.name for d in self.base_path.iterdir() if d.is_dir()]
-            )
+            containers = sorted(self.backend.list_containers())
         except (PermissionError, OSError):
             print("[alert] Cannot access containers. Permission denied.")
             return []
 
+        if not verbose:
+            return containers
         if not containers:
             print("[alert] No exists containers")
         else:
@@ -67,22 +118,25 @@ class Storage:
             print(f"\nTotal: {len(containers)} container(s)")
         return containers
 
-    def upload_blob(self, container: str, file_path: str) -> None:
+    def upload_blob(self, container: str, file_path: str, overwrite: bool = False) -> None:
         """
         Sube un archivo al contenedor especificado y guarda su metadata.
 
         Args:
             container: Nombre del contenedor.
             file_path: Ruta del archivo local a subir.
+            overwrite: Si True, reemplaza el blob si ya existe.
 
         Raises:
             FileNotFoundError: Si el contenedor o el archivo no existen.
         """
-        if not self.base_path:
+        if not self.backend:
             print("[alert] Storage not initialized. Cannot upload.")
             return
-        container_path = self.base_path / container
-        if not container_path.exists():
+        if _is_snapshot(container):
+            print(f"[error] '{container}' is a snapshot and is read-only.")
+            return
+        if not self.backend.container_exists(container):
             print(f"Container '{container}' does not exist.")
             return
 
@@ -91,34 +145,15 @@ class Storage:
             print(f"[error] Source file '{file_path}' not found.")
             return
 
-        dst = container_path / source.name
-
-        if dst.exists():
+        existed = self.backend.blob_exists(container, source.name)
+        if existed and not overwrite:
             print(
                 f"[info] Blob '{source.name}' already exists in container '{container}'. Skipping upload."
             )
             return
 
-        try:
-            shutil.copy2(source, dst)
-        except OSError:
-            print(f"[alert] Cannot copy file to '{dst}'. Check permissions.")
+        if not self._write_blob(container, source.name, source, existed):
             return
-
-        metadata: dict[str, str | int] = {
-            "name": source.name,
-            "size": source.stat().st_size,
-            "uploaded_at": datetime.now(timezone.utc).isoformat(),
-            "content_type": "application/octet-stream",
-        }
-
-        metadata_file = container_path / f"{source.stem}.metadata.json"
-        try:
-            with open(metadata_file, "w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=2)
-        except OSError:
-            print(f"[alert] Failed to write metadata for '{source.name}'.")
-
         print(f"[ok]  Uploaded '{source.name}' to container '{container}'.")
 
     def list_blobs(self, container: str, verbose: bool = True) -> list[str]:
@@ -134,24 +169,17 @@ class Storage:
         Raises:
             FileNotFoundError: Si el contenedor no existe.
         """
-        if not self.base_path:
+        if not self.backend:
             if verbose:
                 print("[alert] Storage not initialized. Cannot list blobs.")
             return []
-        container_path = self.base_path / container
-        if not container_path.exists():
+        if not self.backend.container_exists(container):
             if verbose:
                 print(f"[error] Error: Container '{container}' does not exist.")
             return []
 
         try:
-            blobs = sorted(
-                [
-                    f.name
-                    for f in container_path.iterdir()
-                    if f.is_file() and not f.name.endswith(".metadata.json")
-                ]
-            )
+            blobs = sorted(self.backend.list_blobs(container))
         except (PermissionError, OSError):
             if verbose:
                 print(f"[alert] Cannot access files in container '{container}'.")
@@ -179,20 +207,32 @@ class Storage:
         Raises:
             FileNotFoundError: Si el blob no existe.
         """
-        if not self.base_path:
+        if not self.backend:
             print("[alert] Storage not initialized. Cannot download.")
             return
-        container_path = self.base_path / container
-        blob_path = container_path / blob_name
-        if not blob_path.exists():
+        if not self.backend.blob_exists(container, blob_name):
             print(f"Blob '{blob_name}' not found in container '{container}'.")
             return
 
+        # La metadata basta para saber si el blob está en un nivel frío.
         try:
-            shutil.copy2(blob_path, destination)
-            print(f"[ok]  Downloaded '{blob_name}' to '{destination}'.")
-        except OSError:
-            print(f"[alert] Cannot write blob to '{destination}'. Check permissions.")
+            record = self._lookup(container, blob_name)
+        except (OSError, ValueError):
+            record = None
+        if record and record.get("cold"):
+            # Blob en un nivel frío: se rehidrata (o, en un snapshot, se
+            # descomprime directamente al destino).
+            record = self._read_cold(container, blob_name, record, destination)
+            if record is None:
+                return
+        else:
+            try:
+                self.backend.read_blob(container, blob_name, destination)
+            except OSError:
+                print(f"[alert] Cannot write blob to '{destination}'. Check permissions.")
+                return
+        print(f"[ok]  Downloaded '{blob_name}' to '{destination}'.")
+        self._touch(container, record)
 
     def get_blob_metadata(self, container: str, blob_name: str) -> dict[str, str | int]:
         """
@@ -205,17 +245,1533 @@ class Storage:
         Returns:
             Diccionario con metadata o None si no existe.
         """
-        if not self.base_path:
+        if not self.backend:
             print("[alert] Storage not initialized. Cannot get metadata.")
             return None
-        container_path = self.base_path / container
-        metadata_path = container_path / f"{Path(blob_name).stem}.metadata.json"
-        if not metadata_path.exists():
+        try:
+            return self._lookup(container, blob_name)
+        except (OSError, ValueError):
+            print(f"[alert] Cannot read metadata for blob '{blob_name}'.")
             return None
 
+    def delete_blob(self, container: str, blob_name: str) -> None:
+        """
+        Elimina un blob y su metadata.
+
+        Args:
+            container: Nombre del contenedor.
+            blob_name: Nombre del archivo.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot delete.")
+            return
+        if _is_snapshot(container):
+            print(f"[error] '{container}' is a snapshot and is read-only.")
+            return
+        if not self.backend.blob_exists(container, blob_name):
+            print(f"Blob '{blob_name}' not found in container '{container}'.")
+            return
+
+        previous = self._get_index().get(container, blob_name)
         try:
-            with open(metadata_path, encoding="utf-8") as f:
-                return json.load(f)
+            self.backend.delete_blob(container, blob_name)
         except OSError:
-            print(f"[alert] Cannot read metadata for blob '{blob_name}'.")
+            print(f"[alert] Cannot delete blob '{blob_name}'. Check permissions.")
+            return
+        self._log(
+            {"op": "delete", "container": container, "name": blob_name},
+            event_type="BlobDeleted",
+        )
+        if previous and previous.get("cold"):
+            self._collect_cold(container)
+        print(f"[ok]  Deleted '{blob_name}' from container '{container}'.")
+
+    def iter_changes(self, container: str, since: str | None = None) -> Iterator[dict]:
+        """
+        Recorre el change feed de un contenedor (sin bloquear).
+
+        Cada evento es un diccionario con ``seq``, ``event_type``
+        (``BlobCreated``, ``BlobOverwritten`` o ``BlobDeleted``), ``container``,
+        ``name``, ``size``, ``time`` y ``cursor``. Guardar el ``cursor`` del
+        último evento procesado permite reanudar con ``since=cursor``.
+
+        Args:
+            container: Nombre del contenedor.
+            since: Cursor desde el que continuar (None = desde el principio).
+
+        Yields:
+            Eventos en el orden en que ocurrieron.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot read changes.")
+            return
+        offset = _parse_cursor(since)
+        if offset is None:
+            print(f"[error] Invalid change feed cursor '{since}'.")
+            return
+
+        try:
+            for event, next_offset in self._get_feed().read(container, offset):
+                event["cursor"] = str(next_offset)
+                yield event
+        except OSError:
+            print(f"[alert] Cannot read change feed of container '{container}'.")
+
+    def change_feed_cursor(self, container: str) -> str:
+        """
+        Retorna el cursor del final actual del change feed de un contenedor.
+
+        Útil para empezar a consumir solo los eventos que ocurran a partir de ahora.
+        """
+        if not self.backend:
+            return "0"
+        return str(self._get_feed().end(container))
+
+    def watch(
+        self,
+        container: str,
+        since: str | None = None,
+        timeout: float | None = None,
+        poll_interval: float = 0.5,
+        use_inotify: bool = True,
+    ) -> Iterator[dict]:
+        """
+        Espera y entrega eventos del change feed a medida que se producen.
+
+        En Linux usa inotify para despertar en cuanto se escribe un evento;
+        en otros sistemas (o con ``use_inotify=False``) consulta el feed cada
+        ``poll_interval`` segundos.
+
+        Args:
+            container: Nombre del contenedor.
+            since: Cursor desde el que continuar (None = solo eventos nuevos).
+            timeout: Segundos sin eventos tras los que se termina (None = nunca).
+            poll_interval: Intervalo de sondeo cuando no hay inotify.
+            use_inotify: Si False, fuerza el sondeo periódico.
+
+        Yields:
+            Eventos, igual que ``iter_changes``.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot watch changes.")
+            return
+        import time
+
+        from bloblite.notify import make_notifier
+
+        feed_dir = self._get_feed().directory
+        try:
+            if feed_dir is not None:
+                feed_dir.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            print(f"[alert] Cannot watch change feed of container '{container}'.")
+            return
+        # El notificador se crea antes de leer para no perder eventos escritos
+        # entre la lectura y la espera.
+        notifier = make_notifier(feed_dir, poll_interval, use_inotify)
+        cursor = self.change_feed_cursor(container) if since is None else since
+        try:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                for event in self.iter_changes(container, since=cursor):
+                    cursor = event["cursor"]
+                    yield event
+                    if timeout is not None:
+                        deadline = time.monotonic() + timeout
+                if _parse_cursor(cursor) is None:
+                    return
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return
+                notifier.wait(remaining)
+        finally:
+            notifier.close()
+
+    def set_blob_tags(self, container: str, blob_name: str, tags: dict[str, str]) -> None:
+        """
+        Reemplaza los tags de índice (blob index tags) de un blob.
+
+        Los tags se guardan en la metadata del blob y en el índice compartido,
+        de modo que ``find_blobs_by_tags`` puede consultarlos sin abrir cada blob.
+
+        Args:
+            container: Nombre del contenedor.
+            blob_name: Nombre del archivo.
+            tags: Diccionario clave/valor (texto). Reemplaza los tags previos.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot set tags.")
+            return
+        if _is_snapshot(container):
+            print(f"[error] '{container}' is a snapshot and is read-only.")
+            return
+        error = _validate_tags(tags)
+        if error:
+            print(f"[error] Invalid tags: {error}")
+            return
+        metadata = self.get_blob_metadata(container, blob_name)
+        if metadata is None:
+            print(f"Blob '{blob_name}' not found in container '{container}'.")
+            return
+
+        metadata["tags"] = dict(tags)
+        if self._write_metadata(container, metadata) and self._log_put(container, metadata):
+            print(f"[ok]  Tags updated for '{blob_name}' in container '{container}'.")
+
+    def get_blob_tags(self, container: str, blob_name: str) -> dict[str, str]:
+        """
+        Retorna los tags de índice de un blob.
+
+        Args:
+            container: Nombre del contenedor.
+            blob_name: Nombre del archivo.
+
+        Returns:
+            Diccionario de tags (vacío si el blob no tiene tags o no existe).
+        """
+        metadata = self.get_blob_metadata(container, blob_name)
+        if not metadata:
+            return {}
+        return dict(metadata.get("tags", {}))
+
+    def find_blobs_by_tags(
+        self, query: str, container: str | None = None
+    ) -> list[dict[str, object]]:
+        """
+        Busca blobs por metadata y tags usando los índices secundarios.
+
+        Ejemplo: ``find_blobs_by_tags("size > 1000000 AND tier = 'hot'")``.
+        Los campos consultables son ``name``, ``size``, ``uploaded_at``,
+        ``content_type``, ``@container`` y cualquier tag de usuario.
+
+        Args:
+            query: Expresión de consulta (condiciones unidas con AND).
+            container: Si se indica, limita la búsqueda a ese contenedor.
+
+        Returns:
+            Lista de diccionarios con ``container``, ``name`` y ``tags``.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot query blobs.")
+            return []
+        index = self._get_index()
+        try:
+            matches = index.query(query, container=container)
+        except ValueError as exc:
+            print(f"[error] Invalid query: {exc}.")
+            return []
+        return [
+            {
+                "container": cont,
+                "name": name,
+                "tags": dict(index.get(cont, name).get("tags", {})),
+            }
+            for cont, name in matches
+        ]
+
+    def export_container(self, container: str, out_path: str) -> int:
+        """
+        Exporta un contenedor completo (blobs y metadata) a un único archivo tar.
+
+        El archivo se escribe de forma secuencial con buffers grandes; la
+        extensión elige la compresión (``.tar``, ``.tar.gz``, ``.tar.xz`` o
+        ``.tar.zst``, esta última con el paquete opcional ``zstandard``).
+
+        Args:
+            container: Nombre del contenedor.
+            out_path: Ruta del archivo a crear.
+
+        Returns:
+            Número de blobs exportados.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot export.")
+            return 0
+        if not self.backend.container_exists(container):
+            print(f"[error] Error: Container '{container}' does not exist.")
+            return 0
+        import json
+        import os
+
+        from bloblite import archive
+
+        target = Path(out_path)
+        try:
+            mode = archive.write_mode(target)
+        except ValueError as exc:
+            print(f"[error] Cannot export: {exc}.")
+            return 0
+
+        index = self._get_index()
+        try:
+            names = sorted(self.backend.list_blobs(container))
+            records, cold_locations = {}, {}
+            for name in names:
+                record = index.get(container, name) or self.backend.read_metadata(container, name)
+                if record and record.get("cold"):
+                    cold_locations[name] = record["cold"]
+                record = record or _new_metadata(name, self.backend.blob_size(container, name))
+                # El archivo lleva los datos descomprimidos: se importan como hot.
+                records[name] = {k: v for k, v in record.items() if k not in ("tier", "cold")}
+        except (OSError, ValueError):
+            print(f"[alert] Cannot access files in container '{container}'.")
+            return 0
+        manifest = {"format": archive.FORMAT_VERSION, "container": container, "blobs": records}
+
+        # Se escribe a un temporal para no dejar un archivo truncado si falla.
+        tmp_path = target.with_name(f".{target.name}.part")
+        try:
+            with archive.open_writer(tmp_path, mode) as tar:
+                archive.add_bytes(tar, archive.MANIFEST, json.dumps(manifest).encode("utf-8"))
+                for name in names:
+                    with self._open_content(container, name, cold_locations.get(name)) as stream:
+                        archive.add_stream(tar, archive.BLOBS_PREFIX + name, stream)
+            os.replace(tmp_path, target)
+        except ImportError as exc:
+            print(f"[error] Cannot export: {exc}.")
+            return 0
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            print(f"[alert] Cannot write archive '{out_path}'. Check permissions.")
+            return 0
+        print(f"[ok]  Exported {len(names)} blob(s) from container '{container}' to '{out_path}'.")
+        return len(names)
+
+    def import_container(
+        self,
+        archive_path: str,
+        container: str | None = None,
+        overwrite: bool = False,
+        workers: int = 4,
+    ) -> int:
+        """
+        Importa un archivo creado con ``export_container``.
+
+        El archivo se lee de forma secuencial y las escrituras en el backend
+        se reparten entre ``workers`` hilos. Toda la importación se registra
+        en el journal como una sola transacción (una escritura al empezar y
+        otra al terminar), así que un crash a mitad se recupera reindexando el
+        contenedor con ``recover``.
+
+        Args:
+            archive_path: Ruta del archivo a importar.
+            container: Contenedor destino (por defecto, el del archivo). Se
+                crea si no existe.
+            overwrite: Si True, reemplaza los blobs que ya existan.
+            workers: Número de hilos de escritura.
+
+        Returns:
+            Número de blobs importados.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot import.")
+            return 0
+        import json
+        import os
+        import tarfile
+
+        from bloblite import archive
+
+        if not Path(archive_path).is_file():
+            print(f"[error] Archive '{archive_path}' not found.")
+            return 0
+        begin = None
+        try:
+            with archive.open_reader(Path(archive_path)) as tar:
+                member = tar.next()
+                if member is None or member.name != archive.MANIFEST:
+                    print(f"[error] '{archive_path}' is not a BlobLite archive.")
+                    return 0
+                manifest = json.load(tar.extractfile(member))
+                container = container or manifest["container"]
+                if isinstance(container, str) and _is_snapshot(container):
+                    print(f"[error] '{container}' is a snapshot and is read-only.")
+                    return 0
+                # El nombre puede venir del manifiesto: no debe salir de la raíz.
+                error = _validate_container_name(container)
+                if error:
+                    print(f"[error] Invalid container name '{container}': {error}.")
+                    return 0
+                if not self.backend.container_exists(container):
+                    self.create_container(container)
+                    if not self.backend.container_exists(container):
+                        return 0
+                begin = self._log(
+                    {"op": "begin", "container": container, "name": None, "pid": os.getpid()}
+                )
+                if begin is None:
+                    return 0
+                results = self._import_members(
+                    tar, container, manifest.get("blobs", {}), begin["seq"], overwrite, workers
+                )
+        except ImportError as exc:
+            print(f"[error] Cannot import: {exc}.")
+            return 0
+        except (OSError, tarfile.TarError, ValueError, KeyError):
+            print(f"[error] Cannot read archive '{archive_path}'.")
+            if begin is not None:
+                # Se indexan los blobs que llegaron a escribirse antes del error.
+                self._reindex_container(container, begin["seq"])
+            return 0
+
+        operations = [
+            (
+                {"op": "put", "container": container, "record": metadata},
+                "BlobOverwritten" if existed else "BlobCreated",
+            )
+            for metadata, existed in results
+        ]
+        operations.append(({"op": "commit", "txn": begin["seq"], "container": container}, None))
+        if self._log_many(operations) is None:
+            return 0
+        if overwrite:
+            self._collect_cold(container)
+        print(f"[ok]  Imported {len(results)} blob(s) into container '{container}'.")
+        return len(results)
+
+    def create_container_snapshot(self, container: str) -> str | None:
+        """
+        Crea un snapshot (copia de solo lectura a un instante) de un contenedor.
+
+        Los blobs no se copian: el backend los comparte con hardlinks o
+        reflinks, y la metadata del índice se congela junto al snapshot, así
+        que el coste no depende del tamaño de los blobs. El snapshot se lee
+        con los métodos normales usando el contenedor ``<contenedor>@<snapshot>``.
+
+        Args:
+            container: Nombre del contenedor.
+
+        Returns:
+            Identificador del snapshot, o None si no se pudo crear.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot create snapshot.")
+            return None
+        if _is_snapshot(container):
+            print(f"[error] '{container}' is a snapshot and is read-only.")
+            return None
+        if not self.backend.container_exists(container):
+            print(f"[error] Error: Container '{container}' does not exist.")
             return None
+        from datetime import datetime, timezone
+
+        index = self._get_index()
+        try:
+            existing = set(self.backend.list_snapshots(container))
+            snapshot = base = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+            suffix = 1
+            while snapshot in existing:
+                snapshot, suffix = f"{base}-{suffix}", suffix + 1
+            # Con el lock del journal ningún otro escritor registra cambios
+            # mientras se congela el contenedor.
+            with self._journal.lock():
+                self._sync()
+                names = self.backend.list_blobs(container)
+                records = {
+                    name: _copy_record(index.get(container, name))
+                    for name in names
+                    if index.get(container, name) is not None
+                }
+                self.backend.create_snapshot(container, snapshot, records)
+        except OSError:
+            print(f"[alert] Cannot create snapshot of container '{container}'. Check permissions.")
+            return None
+        print(f"[ok]  Snapshot '{snapshot}' of container '{container}' created ({len(names)} blob(s)).")
+        return snapshot
+
+    def list_snapshots(self, container: str, verbose: bool = True) -> list[str]:
+        """
+        Lista los snapshots de un contenedor, del más antiguo al más reciente.
+
+        Args:
+            container: Nombre del contenedor.
+            verbose: Si True, imprime los resultados (modo CLI). Si False, solo retorna la lista.
+
+        Returns:
+            Lista de identificadores de snapshot.
+        """
+        if not self.backend:
+            if verbose:
+                print("[alert] Storage not initialized. Cannot list snapshots.")
+            return []
+        try:
+            snapshots = sorted(self.backend.list_snapshots(container))
+        except OSError:
+            if verbose:
+                print(f"[alert] Cannot access snapshots of container '{container}'.")
+            return []
+
+        if verbose:
+            if not snapshots:
+                print(f"[info]  Container '{container}' has no snapshots.")
+            else:
+                print(f"Snapshots of container '{container}':")
+                for i, snapshot in enumerate(snapshots, 1):
+                    print(f"  {i}. {snapshot}")
+                print(f"\nTotal: {len(snapshots)} snapshot(s)")
+        return snapshots
+
+    def restore_snapshot(self, container: str, snapshot: str) -> bool:
+        """
+        Devuelve un contenedor al estado de uno de sus snapshots.
+
+        Los blobs creados después del snapshot se eliminan y el resto recupera
+        su contenido y metadata; el change feed registra cada cambio. Se
+        registra en el journal como una transacción, así que una restauración
+        interrumpida se completa reindexando el contenedor con ``recover``.
+
+        Args:
+            container: Nombre del contenedor.
+            snapshot: Identificador del snapshot.
+
+        Returns:
+            True si el contenedor quedó restaurado.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot restore snapshot.")
+            return False
+        if snapshot not in self.list_snapshots(container, verbose=False):
+            print(f"[error] Snapshot '{snapshot}' of container '{container}' not found.")
+            return False
+        import os
+
+        begin = self._log({"op": "begin", "container": container, "name": None, "pid": os.getpid()})
+        if begin is None:
+            return False
+        try:
+            self.backend.restore_snapshot(container, snapshot, token=str(begin["seq"]))
+        except OSError:
+            print(f"[alert] Cannot restore snapshot '{snapshot}'. Check permissions.")
+            self._reindex_container(container, begin["seq"])
+            return False
+        if not self._reindex_container(container, begin["seq"]):
+            return False
+        self._collect_cold(container)
+        print(f"[ok]  Container '{container}' restored from snapshot '{snapshot}'.")
+        return True
+
+    def delete_snapshot(self, container: str, snapshot: str) -> None:
+        """
+        Elimina un snapshot. El contenedor no se ve afectado.
+
+        Args:
+            container: Nombre del contenedor.
+            snapshot: Identificador del snapshot.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot delete snapshot.")
+            return
+        if snapshot not in self.list_snapshots(container, verbose=False):
+            print(f"[error] Snapshot '{snapshot}' of container '{container}' not found.")
+            return
+        try:
+            self.backend.delete_snapshot(container, snapshot)
+        except OSError:
+            print(f"[alert] Cannot delete snapshot '{snapshot}'. Check permissions.")
+            return
+        self._collect_cold(container)
+        print(f"[ok]  Deleted snapshot '{snapshot}' of container '{container}'.")
+
+    def set_blob_tier(self, container: str, blob_name: str, tier: str) -> None:
+        """
+        Cambia el nivel de acceso de un blob (``hot``, ``cool`` o ``archive``).
+
+        Los blobs ``hot`` son archivos normales del backend. Al pasar a
+        ``cool`` (zlib) o ``archive`` (lzma) el contenido se comprime en un
+        objeto frío y en el backend queda un marcador vacío, de modo que el
+        blob sigue apareciendo en ``list_blobs``. Leerlo con ``download_blob``
+        lo rehidrata a ``hot``. Los objetos fríos que dejan de usarse se
+        borran, salvo los que algún snapshot sigue referenciando.
+
+        Args:
+            container: Nombre del contenedor.
+            blob_name: Nombre del archivo.
+            tier: Nivel destino.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot set tier.")
+            return
+        from bloblite.tiering import TIERS
+
+        if tier not in TIERS:
+            print(f"[error] Invalid tier '{tier}'. Use one of: {', '.join(TIERS)}.")
+            return
+        if _is_snapshot(container):
+            print(f"[error] '{container}' is a snapshot and is read-only.")
+            return
+        metadata = self.get_blob_metadata(container, blob_name)
+        if metadata is None or not self.backend.blob_exists(container, blob_name):
+            print(f"Blob '{blob_name}' not found in container '{container}'.")
+            return
+        if metadata.get("tier", "hot") == tier:
+            print(f"[info] Blob '{blob_name}' is already in the {tier} tier.")
+            return
+        if self._set_tier(container, metadata, tier):
+            print(f"[ok]  Blob '{blob_name}' moved to the {tier} tier.")
+
+    def apply_tier_policy(
+        self,
+        container: str | None = None,
+        cool_after_days: float = 30,
+        archive_after_days: float | None = None,
+        now=None,
+    ) -> dict[str, int]:
+        """
+        Baja de nivel los blobs que llevan tiempo sin leerse.
+
+        La inactividad se mide desde ``last_accessed_at`` (que ``download_blob``
+        actualiza como mucho una vez al día, igual que Azure) o, si el blob
+        nunca se leyó, desde ``uploaded_at``. Los candidatos salen del índice,
+        sin recorrer los archivos. La política nunca sube de nivel: eso ocurre
+        al leer el blob. Pensado para ejecutarse periódicamente (cron).
+
+        Args:
+            container: Si se indica, solo se aplica a ese contenedor.
+            cool_after_days: Días de inactividad para pasar a ``cool``.
+            archive_after_days: Días de inactividad para pasar a ``archive``
+                (None = nunca).
+            now: Instante de referencia (``datetime`` con zona horaria; por
+                defecto, ahora).
+
+        Returns:
+            Número de blobs movidos a cada nivel.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot apply tier policy.")
+            return {}
+        from datetime import datetime, timedelta, timezone
+
+        from bloblite.tiering import TIERS
+
+        now = now or datetime.now(timezone.utc)
+        index = self._get_index()
+        containers = [container] if container is not None else list(index.records)
+        candidates = []
+        for cont in containers:
+            for record in list(index.records.get(cont, {}).values()):
+                idle = now - _parse_time(record.get("last_accessed_at") or record.get("uploaded_at"))
+                if archive_after_days is not None and idle >= timedelta(days=archive_after_days):
+                    tier = "archive"
+                elif idle >= timedelta(days=cool_after_days):
+                    tier = "cool"
+                else:
+                    continue
+                if TIERS.index(tier) > TIERS.index(record.get("tier", "hot")):
+                    candidates.append((cont, _copy_record(record), tier))
+
+        moved = {"cool": 0, "archive": 0}
+        released = set()
+        for cont, record, tier in candidates:
+            if not self.backend.blob_exists(cont, record["name"]):
+                continue
+            # Los objetos fríos reemplazados se recogen una vez por contenedor.
+            if self._set_tier(cont, record, tier, collect=False):
+                moved[tier] += 1
+                if record.get("cold"):
+                    released.add(cont)
+        for cont in sorted(released):
+            self._collect_cold(cont)
+        print(
+            f"[ok]  Tier policy moved {moved['cool']} blob(s) to cool and "
+            f"{moved['archive']} to archive."
+        )
+        return moved
+
+    def recover(self) -> int:
+        """
+        Completa o descarta las subidas que quedaron a medias por un crash.
+
+        Recorre las transacciones abiertas del journal cuyo proceso ya no está
+        vivo: si el blob llegó a escribirse se regenera su metadata a partir
+        del contenido; si no, se limpian los restos y se aborta. Después
+        vuelve a publicar los eventos del journal que no llegaron al change
+        feed. Se ejecuta automáticamente la primera vez que se usa el índice.
+
+        Returns:
+            Número de subidas recuperadas.
+        """
+        if not self.backend:
+            print("[alert] Storage not initialized. Cannot recover.")
+            return 0
+        self._get_index()
+        if self._recovering:
+            return 0
+        self._recovering = True
+        try:
+            recovered = self._recover_dead()
+            try:
+                with self._journal.lock():
+                    self._sync()
+                    self._repair_feed()
+            except OSError:
+                print("[alert] Cannot rebuild the change feed. Check your permissions.")
+            return recovered
+        finally:
+            self._recovering = False
+
+    def _recover_dead(self) -> int:
+        """Cierra las transacciones abiertas de procesos muertos (ver ``recover``)."""
+        from bloblite.journal import pid_alive
+
+        recovered = 0
+        for seq, entry in list(self._pending.items()):
+            if pid_alive(entry.get("pid", 0)):
+                continue
+            container, name = entry["container"], entry["name"]
+            if name is None:
+                # Importación o restauración interrumpida: se reindexa el contenedor.
+                if self._reindex_container(container, seq):
+                    self._collect_cold(container)
+                    print(f"[info] Recovered interrupted bulk operation on container '{container}'.")
+                    recovered += 1
+                continue
+            try:
+                self.backend.discard_partial(str(seq))
+                exists = self.backend.blob_exists(container, name)
+                size = self.backend.blob_size(container, name) if exists else 0
+            except OSError:
+                print(f"[alert] Cannot recover upload of '{name}'. Check permissions.")
+                continue
+            target = entry.get("record")
+            if target is not None:
+                # Cambio de nivel: se confirma solo si el backend ya tiene el
+                # contenido esperado (vacío si el blob pasó a un objeto frío).
+                expected = 0 if target.get("cold") else target["size"]
+                if exists and size == expected:
+                    self._write_metadata(container, target)
+                    self._log_put(container, target, txn=seq)
+                else:
+                    self._log({"op": "abort", "txn": seq, "container": container, "name": name})
+                # El objeto frío que sobra (el anterior o el descartado) se borra.
+                self._collect_cold(container)
+            elif exists:
+                metadata = _new_metadata(name, size)
+                previous = self._index.get(container, name)
+                if previous and previous.get("tags"):
+                    metadata["tags"] = dict(previous["tags"])
+                self._write_metadata(container, metadata)
+                self._log_put(
+                    container,
+                    metadata,
+                    txn=seq,
+                    event_type="BlobOverwritten" if previous else "BlobCreated",
+                )
+            else:
+                self._log({"op": "abort", "txn": seq, "container": container, "name": name})
+            operation = "upload" if target is None else "tier change"
+            print(f"[info] Recovered interrupted {operation} of '{name}' in container '{container}'.")
+            recovered += 1
+        return recovered
+
+    def _import_members(
+        self,
+        tar,
+        container: str,
+        records: dict[str, dict],
+        txn: int,
+        overwrite: bool,
+        workers: int,
+    ) -> list[tuple[dict, bool]]:
+        """
+        Lee los blobs del archivo en orden y los escribe en paralelo.
+
+        Cada miembro se vuelca a un temporal (en memoria si es pequeño) para
+        poder seguir leyendo el archivo mientras otro hilo lo escribe; el
+        número de escrituras en curso está acotado para limitar la memoria.
+
+        Returns:
+            Pares ``(metadata, existía)`` de los blobs escritos.
+        """
+        import shutil
+        import tempfile
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+        from bloblite import archive
+
+        existing = set(self.backend.list_blobs(container))
+        skipped = 0
+        results = []
+        inflight = set()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for number, member in enumerate(tar, 1):
+                name = member.name.removeprefix(archive.BLOBS_PREFIX)
+                if not member.isfile() or name == member.name:
+                    continue
+                if not archive.is_safe_blob_name(name):
+                    print(f"[alert] Skipping blob with invalid name '{member.name}'.")
+                    continue
+                if name in existing and not overwrite:
+                    skipped += 1
+                    continue
+
+                spool = tempfile.SpooledTemporaryFile(max_size=_IMPORT_SPOOL_LIMIT)
+                shutil.copyfileobj(tar.extractfile(member), spool, archive.ARCHIVE_BUFFER)
+                spool.seek(0)
+                metadata = _imported_metadata(name, records.get(name))
+                inflight.add(
+                    pool.submit(
+                        self._import_blob, container, spool, metadata, f"{txn}-{number}"
+                    )
+                )
+                if len(inflight) >= 2 * max(1, workers):
+                    done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                    results += [future.result() for future in done]
+            done, _ = wait(inflight)
+            results += [future.result() for future in done]
+
+        if skipped:
+            print(f"[info] Skipped {skipped} existing blob(s) in container '{container}'.")
+        return [(m, m["name"] in existing) for m in results if m is not None]
+
+    def _import_blob(self, container: str, source, metadata: dict, token: str) -> dict | None:
+        """Escribe un blob importado y su metadata (se ejecuta en un hilo del pool)."""
+        import os
+
+        name = metadata["name"]
+        try:
+            with source:
+                metadata["size"] = source.seek(0, os.SEEK_END)
+                source.seek(0)
+                self.backend.write_blob(container, name, source, token=token, metadata=metadata)
+        except OSError:
+            print(f"[alert] Cannot copy file to '{container}/{name}'. Check permissions.")
+            try:
+                self.backend.discard_partial(token)
+            except OSError:
+                pass
+            return None
+        return metadata
+
+    def _reindex_container(self, container: str, txn: int) -> bool:
+        """
+        Cierra una operación masiva sobre un contenedor (importación o
+        restauración) sincronizando el índice con lo que haya en el backend.
+
+        Se descartan los temporales de la transacción ``txn``, se registra la
+        metadata de cada blob que haya cambiado y se eliminan del índice los
+        blobs que ya no existen.
+        """
+        try:
+            self.backend.discard_partial(str(txn))
+            found = {m["name"]: m for _, m in self.backend.iter_metadata(container)}
+        except OSError:
+            print(f"[alert] Cannot reindex container '{container}'. Check permissions.")
+            return False
+        indexed = self._index.records.get(container, {})
+        operations = [
+            (
+                {"op": "put", "container": container, "record": metadata},
+                "BlobOverwritten" if name in indexed else "BlobCreated",
+            )
+            for name, metadata in found.items()
+            if indexed.get(name) != metadata
+        ]
+        operations += [
+            ({"op": "delete", "container": container, "name": name}, "BlobDeleted")
+            for name in indexed
+            if name not in found
+        ]
+        operations.append(({"op": "commit", "txn": txn, "container": container}, None))
+        return self._log_many(operations) is not None
+
+    def _start_trace(self, path) -> None:
+        """Activa el registro de operaciones en ``path`` (ver ``bloblite.trace``)."""
+        from bloblite.trace import open_recorder
+
+        try:
+            self.trace = open_recorder(path)
+        except OSError:
+            print(f"[alert] Cannot open trace file '{path}'. Tracing disabled.")
+            return
+        self.trace.attach(self, self._blob_size_for_trace)
+
+    def _blob_size_for_trace(self, container: str, name: str) -> int:
+        """Tamaño lógico de un blob según su metadata (0 si no está), para la traza."""
+        try:
+            record = self._lookup(container, name)
+        except (OSError, ValueError):
+            return 0
+        return record["size"] if record else 0
+
+    def _lookup(self, container: str, name: str) -> dict | None:
+        """
+        Metadata de un blob para una lectura puntual.
+
+        Si el índice ya está cargado se usa su registro. Si no, se lee la
+        metadata del backend: cargar y sincronizar el índice entero cuesta
+        mucho más que la propia lectura en un proceso de una sola operación
+        (la CLI). Solo se confía en ella si coincide con el tamaño del blob en
+        el backend; si no, puede haber una escritura interrumpida y se pasa
+        por el índice, que la recupera. Los snapshots no están indexados.
+
+        Raises:
+            OSError: Si no se puede leer la metadata.
+            ValueError: Si la metadata está dañada.
+        """
+        if self._index is None:
+            record = self.backend.read_metadata(container, name)
+            if _is_snapshot(container):
+                return record
+            if record is not None and self.backend.blob_exists(container, name):
+                expected = 0 if record.get("cold") else record.get("size")
+                if self.backend.blob_size(container, name) == expected:
+                    return record
+        record = self._get_index().get(container, name)
+        if record is not None:
+            return _copy_record(record)
+        return self.backend.read_metadata(container, name)
+
+    def _write_blob(self, container: str, name: str, source, existed: bool) -> bool:
+        """
+        Escribe un blob y su metadata siguiendo el protocolo write-ahead.
+
+        Se registra la intención en el journal antes de tocar el contenedor y
+        el backend escribe de forma atómica, de modo que una subida
+        interrumpida se puede completar o descartar con ``recover``. El
+        ``begin`` se escribe sin fsync: basta para recuperar la caída del
+        proceso (el sistema conserva la escritura) y el fsync del ``put`` lo
+        hace durable junto con él, así que cada subida paga un solo fsync. El
+        contenido del blob tampoco se sincroniza, de modo que un corte de luz
+        a mitad ya podía dejarlo a medias con o sin ese ``begin`` en disco.
+        """
+        import os
+
+        previous = self._get_index().get(container, name) if existed else None
+        begin = self._log(
+            {"op": "begin", "container": container, "name": name, "pid": os.getpid()}, sync=False
+        )
+        from bloblite.backends import MetadataError
+
+        token = str(begin["seq"]) if begin else None
+        metadata = _new_metadata(name, 0)
+        try:
+            metadata["size"] = source.stat().st_size
+            self.backend.write_blob(container, name, source, token=token, metadata=metadata)
+            size = self.backend.blob_size(container, name)
+        except OSError as exc:
+            if isinstance(exc, MetadataError):
+                print(f"[alert] Failed to write metadata for '{name}'.")
+            else:
+                print(f"[alert] Cannot copy file to '{container}/{name}'. Check permissions.")
+            if begin:
+                try:
+                    self.backend.discard_partial(token)
+                except OSError:
+                    pass
+                self._log({"op": "abort", "txn": begin["seq"], "container": container, "name": name})
+            return False
+
+        if size != metadata["size"]:
+            # El archivo local cambió durante la copia: manda lo que se escribió.
+            metadata["size"] = size
+            self._write_metadata(container, metadata)
+        put = self._log_put(
+            container,
+            metadata,
+            txn=begin["seq"] if begin else None,
+            event_type="BlobOverwritten" if existed else "BlobCreated",
+        )
+        if put is None:
+            return False
+        if previous and previous.get("cold"):
+            self._collect_cold(container)
+        return True
+
+    def _set_tier(self, container: str, metadata: dict, tier: str, collect: bool = True) -> bool:
+        """
+        Mueve el contenido de un blob al nivel indicado.
+
+        El contenido se prepara fuera del lock (comprimido o descomprimido a un
+        temporal). Después, con el lock del journal tomado, se comprueba que el
+        blob no cambió desde que se leyó ``metadata``, se registra un
+        ``begin`` con la metadata final (para que ``recover`` pueda confirmar
+        o descartar el cambio) y se escriben el contenido y la metadata. Con
+        ``collect`` se borra después el objeto frío anterior si ya no se usa.
+
+        Returns:
+            True si el blob cambió de nivel.
+        """
+        import io
+        import os
+        from datetime import datetime, timezone
+
+        from bloblite import tiering
+
+        name = metadata["name"]
+        target = {k: v for k, v in metadata.items() if k != "cold"}
+        target["tier"] = tier
+        cold = self._get_cold()
+        compressed = None
+        try:
+            if tier == "hot":
+                source = self._open_content(container, name, metadata["cold"])
+                target["last_accessed_at"] = datetime.now(timezone.utc).isoformat()
+            else:
+                codec = tiering.CODECS[tier]
+                with self._open_content(container, name, metadata.get("cold")) as stream:
+                    compressed = tiering.compress(stream, codec)
+                source = io.BytesIO(b"")
+        except OSError:
+            print(f"[alert] Cannot move blob '{name}' to the {tier} tier. Check permissions.")
+            return False
+
+        self._get_index()
+        begin = None
+        try:
+            with source, self._journal.lock():
+                self._sync()
+                if not self._unchanged(container, metadata):
+                    print(f"[info] Blob '{name}' changed while moving it to {tier}. Skipped.")
+                    return False
+                if compressed is not None:
+                    with compressed:
+                        target["cold"] = cold.put(container, compressed, codec)
+                begin_entry = {
+                    "op": "begin",
+                    "container": container,
+                    "name": name,
+                    "pid": os.getpid(),
+                    "record": target,
+                }
+                begin = self._append([(begin_entry, None)])[0]
+                token = str(begin["seq"])
+                self.backend.write_blob(container, name, source, token=token, metadata=target)
+                self._append([(_put_entry(container, target, begin["seq"]), None)])
+        except OSError:
+            print(f"[alert] Cannot move blob '{name}' to the {tier} tier. Check permissions.")
+            if begin is not None and begin["seq"] in self._pending:
+                try:
+                    self.backend.discard_partial(str(begin["seq"]))
+                except OSError:
+                    pass
+                self._log({"op": "abort", "txn": begin["seq"], "container": container, "name": name})
+            return False
+        if collect and metadata.get("cold"):
+            self._collect_cold(container)
+        return True
+
+    def _read_cold(
+        self, container: str, name: str, metadata: dict, destination: str
+    ) -> dict | None:
+        """
+        Lee un blob de un nivel frío hacia ``destination``.
+
+        En un contenedor normal el blob se rehidrata a ``hot`` y se descarga
+        como cualquier otro; en un snapshot (de solo lectura) se descomprime
+        directamente desde el objeto frío del contenedor original.
+
+        Returns:
+            La metadata del blob tras la lectura, o None si falló.
+        """
+        if _is_snapshot(container):
+            import shutil
+
+            from bloblite.backends import SNAPSHOT_SEP
+
+            dest = Path(destination)
+            if dest.is_dir():
+                dest = dest / name
+            base = container.split(SNAPSHOT_SEP, 1)[0]
+            try:
+                with self._get_cold().open(base, metadata["cold"]) as src, open(dest, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            except OSError:
+                print(f"[alert] Cannot write blob to '{destination}'. Check permissions.")
+                return None
+            return metadata
+
+        self._get_index()
+        if not self._set_tier(container, metadata, "hot"):
+            return None
+        try:
+            self.backend.read_blob(container, name, destination)
+        except OSError:
+            print(f"[alert] Cannot write blob to '{destination}'. Check permissions.")
+            return None
+        record = self._get_index().get(container, name)
+        return _copy_record(record) if record else None
+
+    def _touch(self, container: str, metadata: dict | None) -> None:
+        """
+        Actualiza ``last_accessed_at`` tras una lectura.
+
+        Como en Azure, se escribe como mucho una vez por ``_ACCESS_RESOLUTION``
+        para que las lecturas frecuentes no paguen una escritura cada vez. Si
+        el blob cambió desde la lectura no se toca: la actualización es
+        opcional y no debe pisar la metadata de otro escritor.
+        """
+        if not metadata or _is_snapshot(container):
+            return
+        from datetime import datetime, timezone
+
+        now = datetime.now(timezone.utc)
+        last = metadata.get("last_accessed_at") or metadata.get("uploaded_at")
+        if (now - _parse_time(last)).total_seconds() < _ACCESS_RESOLUTION:
+            return
+        target = _copy_record(metadata)
+        target["last_accessed_at"] = now.isoformat()
+        self._get_index()
+        try:
+            with self._journal.lock():
+                self._sync()
+                if self._unchanged(container, metadata):
+                    self.backend.write_metadata(container, target)
+                    self._append([(_put_entry(container, target), None)])
+        except OSError:
+            print(f"[alert] Failed to write metadata for '{metadata['name']}'.")
+
+    def _open_content(self, container: str, name: str, cold: dict | None):
+        """
+        Abre el contenido de un blob, esté en el backend o en un objeto frío.
+
+        El contenido frío se descomprime a un temporal para que el stream sea
+        posicionable (lo necesitan, p. ej., los miembros de un tar).
+        """
+        if not cold:
+            return self.backend.open_blob(container, name)
+        import shutil
+        import tempfile
+
+        from bloblite.backends import SNAPSHOT_SEP
+
+        spool = tempfile.SpooledTemporaryFile(max_size=_IMPORT_SPOOL_LIMIT)
+        with self._get_cold().open(container.split(SNAPSHOT_SEP, 1)[0], cold) as src:
+            shutil.copyfileobj(src, spool, 1024 * 1024)
+        spool.seek(0)
+        return spool
+
+    def _get_cold(self):
+        """Retorna el almacenamiento frío (objetos comprimidos) del backend."""
+        if self._cold is None:
+            from bloblite.tiering import ColdStore
+
+            state_dir = self.backend.state_dir
+            self._cold = ColdStore(None if state_dir is None else state_dir / "cold")
+        return self._cold
+
+    def _collect_cold(self, container: str) -> None:
+        """
+        Recupera el espacio frío del contenedor que ya no referencia nadie.
+
+        Se consideran vivos los objetos que usan el índice, los snapshots del
+        contenedor y los cambios de nivel aún abiertos en el journal. Los
+        packs sin objetos vivos se borran. Los que tienen más bytes muertos
+        que vivos se compactan: sus objetos vivos se copian al pack abierto,
+        se registra la nueva ubicación de cada blob y se borra el pack. Los
+        packs que usa un snapshot o un cambio de nivel abierto no se compactan
+        (esas referencias no se pueden mover). Se ejecuta con el lock tomado
+        para que ningún escritor ni snapshot cambie las referencias a mitad.
+        """
+        from bloblite.backends import SNAPSHOT_SEP
+
+        cold = self._get_cold()
+        self._get_index()
+        try:
+            with self._journal.lock():
+                self._sync()
+                stored = cold.objects(container)
+                if not stored:
+                    return
+                indexed = [
+                    r for r in self._index.records.get(container, {}).values() if r.get("cold")
+                ]
+                pinned = [
+                    entry["record"]
+                    for entry in self._pending.values()
+                    if entry.get("container") == container and entry.get("record")
+                ]
+                for snapshot in self.backend.list_snapshots(container):
+                    frozen = f"{container}{SNAPSHOT_SEP}{snapshot}"
+                    for name in self.backend.list_blobs(frozen):
+                        pinned.append(self.backend.read_metadata(frozen, name) or {})
+                pinned_packs = {r["cold"]["object"] for r in pinned if r.get("cold")}
+                live: dict[str, int] = {}
+                for record in indexed:
+                    location = record["cold"]
+                    live[location["object"]] = live.get(location["object"], 0) + location["length"]
+
+                compact = frozenset(
+                    key
+                    for key, size in stored.items()
+                    if key in live and key not in pinned_packs and size - live[key] > live[key]
+                )
+                moved = []
+                for record in indexed:
+                    if record["cold"]["object"] in compact:
+                        target = _copy_record(record)
+                        target["cold"] = cold.copy(container, record["cold"], compact)
+                        self.backend.write_metadata(container, target)
+                        moved.append((_put_entry(container, target), None))
+                if moved:
+                    self._append(moved)
+                for key in stored:
+                    if key in compact or (key not in live and key not in pinned_packs):
+                        cold.delete(container, key)
+        except (OSError, ValueError):
+            print(f"[alert] Cannot reclaim cold storage of container '{container}'.")
+
+    def _write_metadata(self, container: str, metadata: dict) -> bool:
+        """Guarda la metadata de un blob en el backend."""
+        try:
+            self.backend.write_metadata(container, metadata)
+        except OSError:
+            print(f"[alert] Failed to write metadata for '{metadata['name']}'.")
+            return False
+        return True
+
+    def _get_index(self):
+        """
+        Retorna el índice compartido, al día con el journal.
+
+        La primera llamada carga el checkpoint (o lo reconstruye a partir de la
+        metadata) y recupera subidas interrumpidas; las siguientes solo leen
+        las entradas nuevas del journal escritas por otros procesos.
+        """
+        if self._index is not None:
+            self._sync()
+            return self._index
+
+        from bloblite.index import BlobIndex
+        from bloblite.journal import Journal
+
+        state_dir = self.backend.state_dir
+        self._index = BlobIndex(None if state_dir is None else state_dir / "index.json")
+        self._journal = Journal(state_dir)
+        self._pending = {}
+        if self._index.load():
+            self._journal.seq = self._index.seq
+            self._sync()
+        else:
+            self._rebuild_index()
+        if self._pending:
+            self.recover()
+        return self._index
+
+    def _get_feed(self):
+        """Retorna el change feed del backend (en disco o en memoria)."""
+        if self._feed is None:
+            from bloblite.changefeed import ChangeFeed
+
+            state_dir = self.backend.state_dir
+            self._feed = ChangeFeed(None if state_dir is None else state_dir / "changefeed")
+        return self._feed
+
+    def _sync(self) -> None:
+        """Aplica al índice local las entradas nuevas del journal."""
+        try:
+            entries, rotated = self._journal.read_new()
+        except OSError:
+            return
+        if rotated and self._index.load():
+            # Otro proceso compactó: su checkpoint contiene todo lo anterior.
+            self._journal.seq = max(self._journal.seq, self._index.seq)
+            self._pending = {}
+        for entry in entries:
+            if entry.get("seq", 0) > self._index.seq:
+                self._apply(entry)
+
+    def _apply(self, entry: dict) -> None:
+        """Aplica una entrada del journal al índice en memoria."""
+        op = entry.get("op")
+        if op == "put":
+            self._index.put(entry["container"], entry["record"])
+        elif op == "delete":
+            self._index.remove(entry["container"], entry["name"])
+        if op == "begin":
+            self._pending[entry["seq"]] = entry
+        elif "txn" in entry:
+            self._pending.pop(entry["txn"], None)
+        self._index.seq = entry["seq"]
+
+    def _log(self, entry: dict, event_type: str | None = None, sync: bool = True) -> dict | None:
+        """
+        Escribe una operación en el journal y la aplica al índice local.
+
+        Si se indica ``event_type`` también se publica el evento en el change
+        feed del contenedor, dentro del mismo lock para respetar el orden.
+        ``sync`` se pasa a ``Journal.append_many``.
+
+        Returns:
+            La entrada con su número de secuencia, o None si no se pudo escribir.
+        """
+        entries = self._log_many([(entry, event_type)], sync=sync)
+        return entries[0] if entries else None
+
+    def _log_many(
+        self, operations: list[tuple[dict, str | None]], sync: bool = True
+    ) -> list[dict] | None:
+        """
+        Igual que ``_log`` para varias operaciones, con un solo fsync del journal.
+
+        Args:
+            operations: Pares ``(entrada, event_type)``.
+
+        Returns:
+            Las entradas con su número de secuencia, o None si no se pudieron escribir.
+        """
+        self._get_index()
+        try:
+            with self._journal.lock():
+                self._sync()
+                entries = self._append(operations, sync=sync)
+        except OSError:
+            print("[alert] Cannot update blob index. Check your permissions.")
+            return None
+        if self._checkpoint_blocked():
+            self.recover()
+        return entries
+
+    def _checkpoint_blocked(self) -> bool:
+        """
+        True si toca checkpoint pero lo impide una transacción de un proceso muerto.
+
+        ``recover`` solo se ejecuta al abrir el índice: sin esta comprobación
+        una instancia de larga duración nunca cerraría la transacción de un
+        escritor que murió después y el journal crecería sin límite.
+        """
+        if self._recovering or self._journal.entries < _CHECKPOINT_EVERY:
+            return False
+        from bloblite.journal import pid_alive
+
+        return any(not pid_alive(entry.get("pid", 0)) for entry in list(self._pending.values()))
+
+    def _append(self, operations: list[tuple[dict, str | None]], sync: bool = True) -> list[dict]:
+        """
+        Escribe operaciones en el journal; requiere el lock tomado y el índice al día.
+
+        Raises:
+            OSError: Si no se puede escribir el journal o el change feed.
+        """
+        # El tipo de evento va en la propia entrada: si el feed no llega a
+        # escribirse, ``_repair_feed`` lo reconstruye a partir del journal.
+        journaled = [
+            {**entry, "event": event_type} if event_type else entry
+            for entry, event_type in operations
+        ]
+        entries = self._journal.append_many(journaled, sync=sync)
+        unpublished = set()
+        for entry in entries:
+            self._apply(entry)
+            if entry.get("event") and entry["container"] not in unpublished:
+                try:
+                    self._publish(entry)
+                except OSError:
+                    unpublished.add(entry["container"])
+                    print(
+                        f"[alert] Cannot write change feed of container '{entry['container']}'. "
+                        "It will be rebuilt from the journal."
+                    )
+        if self._journal.entries >= _CHECKPOINT_EVERY and not self._pending:
+            # El checkpoint vacía el journal: antes se completa el feed.
+            self._repair_feed()
+            self._index.save()
+            self._journal.reset()
+        return entries
+
+    def _repair_feed(self) -> None:
+        """
+        Vuelve a publicar los eventos del journal que no llegaron al change feed.
+
+        El evento se añade al feed después de confirmar la entrada en el
+        journal, que es lo que se sincroniza a disco: si el proceso muere entre
+        ambas escrituras, o si escribir el feed falla, el evento sigue en el
+        journal. Se ejecuta con el lock tomado en ``recover`` y antes de cada
+        checkpoint, así que ningún evento se pierde (aunque puede llegar más
+        tarde que otros posteriores).
+
+        Raises:
+            OSError: Si no se puede leer el journal o escribir el feed.
+        """
+        journaled: dict[str, list[dict]] = {}
+        for entry in self._journal.read_all():
+            if entry.get("event"):
+                journaled.setdefault(entry["container"], []).append(entry)
+        feed = self._get_feed()
+        for container, entries in journaled.items():
+            # Todo evento posterior al inicio del journal está en él, así que
+            # los publicados están entre los últimos ``len(entries)`` del feed.
+            feed.drop_partial(container)
+            published = {event.get("seq") for event in feed.tail(container, len(entries))}
+            for entry in entries:
+                if entry["seq"] not in published:
+                    self._publish(entry)
+
+    def _unchanged(self, container: str, expected: dict) -> bool:
+        """
+        True si el registro indexado sigue siendo ``expected`` y nadie lo está escribiendo.
+
+        Debe llamarse con el lock del journal tomado y el índice al día.
+        """
+        name = expected["name"]
+        if self._index.get(container, name) != expected:
+            return False
+        return not any(
+            entry.get("container") == container and entry.get("name") in (name, None)
+            for entry in self._pending.values()
+        )
+
+    def _log_put(
+        self,
+        container: str,
+        metadata: dict,
+        txn: int | None = None,
+        event_type: str | None = None,
+    ) -> dict | None:
+        """Registra en el journal la metadata (nueva o actualizada) de un blob."""
+        return self._log(_put_entry(container, metadata, txn), event_type=event_type)
+
+    def _publish(self, entry: dict) -> None:
+        """Añade al change feed (append-only) del contenedor el evento de una entrada."""
+        from datetime import datetime, timezone
+
+        record = entry.get("record", {})
+        event = {
+            "seq": entry["seq"],
+            "event_type": entry["event"],
+            "container": entry["container"],
+            "name": record.get("name", entry.get("name")),
+            "size": record.get("size"),
+            "time": datetime.now(timezone.utc).isoformat(),
+        }
+        self._get_feed().append(entry["container"], event)
+
+    def _rebuild_index(self) -> None:
+        """Reconstruye el índice leyendo la metadata de todos los blobs."""
+        try:
+            with self._journal.lock():
+                if self._index.load():
+                    # Otro proceso lo reconstruyó mientras esperábamos el lock.
+                    self._sync()
+                    return
+                self._sync()
+                self._index.clear()
+                for container, metadata in self.backend.iter_metadata():
+                    self._index.put(container, metadata)
+                self._index.seq = self._journal.seq
+                self._index.save()
+        except OSError:
+            print("[alert] Cannot rebuild blob index. Check your permissions.")
+
+
+# Entradas del journal tras las cuales se escribe un checkpoint del índice.
+_CHECKPOINT_EVERY = 1000
+
+# Al importar, los blobs de hasta este tamaño se mantienen en memoria mientras
+# esperan a un hilo de escritura; los mayores se vuelcan a un temporal.
+_IMPORT_SPOOL_LIMIT = 8 * 1024 * 1024
+
+# Campos de la metadata que se conservan al importar un archivo.
+_IMPORTED_FIELDS = ("uploaded_at", "content_type", "last_accessed_at")
+
+# Segundos mínimos entre dos actualizaciones de ``last_accessed_at`` de un blob.
+_ACCESS_RESOLUTION = 24 * 60 * 60
+
+
+def _is_snapshot(container: str) -> bool:
+    """True si el nombre se refiere a un snapshot (``<contenedor>@<snapshot>``)."""
+    from bloblite.backends import SNAPSHOT_SEP
+
+    return SNAPSHOT_SEP in container
+
+
+def _validate_container_name(name: str) -> str | None:
+    """Valida un nombre de contenedor (no puede salir de la raíz). Retorna el error o None."""
+    if not isinstance(name, str) or not name:
+        return "the name must be a non-empty string"
+    if _is_snapshot(name):
+        return "'@' is reserved for snapshots"
+    if name.startswith(".") or ".." in name or any(c in name for c in ("/", "\\", "\0")):
+        return "names cannot start with '.' or contain '..', '/' or '\\'"
+    return None
+
+
+def _parse_time(value: str | None):
+    """Convierte una fecha ISO 8601 de la metadata en ``datetime`` (época si falta)."""
+    from datetime import datetime, timezone
+
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return datetime.fromtimestamp(0, timezone.utc)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _parse_cursor(cursor: str | None) -> int | None:
+    """Convierte un cursor del change feed en un offset (None si no es válido)."""
+    if cursor is None:
+        return 0
+    try:
+        offset = int(cursor)
+    except (TypeError, ValueError):
+        return None
+    return offset if offset >= 0 else None
+
+
+def _new_metadata(name: str, size: int) -> dict[str, str | int]:
+    """Metadata inicial de un blob recién escrito."""
+    from datetime import datetime, timezone
+
+    return {
+        "name": name,
+        "size": size,
+        "uploaded_at": datetime.now(timezone.utc).isoformat(),
+        "content_type": "application/octet-stream",
+    }
+
+
+def _put_entry(container: str, metadata: dict, txn: int | None = None) -> dict:
+    """Entrada ``put`` del journal (cierra la transacción ``txn`` si se indica)."""
+    entry = {"op": "put", "container": container, "record": metadata}
+    if txn is not None:
+        entry["txn"] = txn
+    return entry
+
+
+def _imported_metadata(name: str, record) -> dict:
+    """
+    Metadata de un blob importado a partir de su registro en el manifiesto.
+
+    Se parte de ``_new_metadata`` (el tamaño real lo pone quien escribe el
+    blob) y solo se conservan los campos públicos del registro: los internos
+    del backend (``tier``, ``cold``...) no se pueden aceptar de un archivo.
+    """
+    metadata = _new_metadata(name, 0)
+    if not isinstance(record, dict):
+        return metadata
+    for key in _IMPORTED_FIELDS:
+        if isinstance(record.get(key), str):
+            metadata[key] = record[key]
+    tags = record.get("tags")
+    if tags:
+        # Los tags pasan las mismas reglas que ``set_blob_tags``; si no las
+        # cumplen se descartan para no romper el índice.
+        error = _validate_tags(tags) if isinstance(tags, dict) else "tags must be a mapping"
+        if error:
+            print(f"[alert] Ignoring invalid tags of blob '{name}': {error}.")
+        else:
+            metadata["tags"] = dict(tags)
+    return metadata
+
+
+def _copy_record(record: dict) -> dict:
+    """Copia un registro del índice para que el llamador pueda modificarlo."""
+    copy = dict(record)
+    if "tags" in copy:
+        copy["tags"] = dict(copy["tags"])
+    return copy
+
+
+def _validate_tags(tags: dict[str, str]) -> str | None:
+    """Valida tags con las mismas reglas básicas que Azure. Retorna el error o None."""
+    from bloblite.index import SYSTEM_FIELDS
+
+    if len(tags) > 10:
+        return "a blob can have at most 10 tags"
+    for key, value in tags.items():
+        if not isinstance(key, str) or not isinstance(value, str):
+            return "tag keys and values must be strings"
+        if not 1 <= len(key) <= 128 or len(value) > 256:
+            return f"tag '{key}' exceeds the allowed length"
+        if key in SYSTEM_FIELDS or key.startswith("@"):
+            return f"'{key}' is a reserved field name"
+    return None
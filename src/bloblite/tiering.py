@@ -0,0 +1,258 @@
+import os
+from pathlib import Path
+from typing import BinaryIO
+
+# Niveles de acceso, del más rápido al más barato. ``hot`` es un archivo normal
+# del backend; los demás se comprimen y se guardan como objetos fríos.
+TIERS = ("hot", "cool", "archive")
+
+# Compresión de cada nivel frío: zlib descomprime rápido (``cool`` se sigue
+# leyendo de vez en cuando); lzma ocupa menos (``archive`` casi nunca se lee).
+CODECS = {"cool": "zlib", "archive": "lzma"}
+
+_CHUNK = 1024 * 1024
+# Los blobs comprimidos de hasta este tamaño se preparan en memoria.
+_SPOOL_LIMIT = 8 * 1024 * 1024
+# Tamaño a partir del cual un pack deja de recibir objetos nuevos.
+_PACK_LIMIT = 64 * 1024 * 1024
+
+
+def _compressor(codec: str):
+    if codec == "zlib":
+        import zlib
+
+        return zlib.compressobj(6)
+    import lzma
+
+    return lzma.LZMACompressor(preset=6)
+
+
+def compress(source: BinaryIO, codec: str):
+    """
+    Comprime un stream en un temporal (en memoria si es pequeño).
+
+    Returns:
+        Un archivo temporal posicionado al principio con los datos comprimidos.
+    """
+    import tempfile
+
+    compressor = _compressor(codec)
+    spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_LIMIT)
+    for chunk in iter(lambda: source.read(_CHUNK), b""):
+        spool.write(compressor.compress(chunk))
+    spool.write(compressor.flush())
+    spool.seek(0)
+    return spool
+
+
+class ColdReader:
+    """
+    Stream de solo lectura que descomprime un objeto frío.
+
+    Descomprime por bloques acotados, así que puede pasarse directamente a
+    ``Backend.write_blob`` o a ``shutil.copyfileobj`` sin cargar el blob entero.
+    """
+
+    def __init__(self, stream: BinaryIO, length: int, codec: str) -> None:
+        self._stream = stream
+        self._remaining = length
+        self._codec = codec
+        if codec == "zlib":
+            import zlib
+
+            self._decompressor = zlib.decompressobj()
+        else:
+            import lzma
+
+            self._decompressor = lzma.LZMADecompressor()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(_CHUNK), b""))
+        parts, total = [], 0
+        while total < size and not self._decompressor.eof:
+            data = self._decompress(size - total)
+            parts.append(data)
+            total += len(data)
+        return b"".join(parts)
+
+    def close(self) -> None:
+        self._stream.close()
+
+    def __enter__(self) -> "ColdReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _next_chunk(self) -> bytes:
+        chunk = self._stream.read(min(_CHUNK, self._remaining))
+        if not chunk:
+            raise OSError("cold storage object is truncated")
+        self._remaining -= len(chunk)
+        return chunk
+
+    def _decompress(self, max_length: int) -> bytes:
+        if self._codec == "zlib":
+            data = self._decompressor.unconsumed_tail or self._next_chunk()
+        else:
+            data = self._next_chunk() if self._decompressor.needs_input else b""
+        return self._decompressor.decompress(data, max_length)
+
+
+class ColdStore:
+    """
+    Almacenamiento frío: los blobs comprimidos se añaden a packs por contenedor.
+
+    En disco cada pack es ``<directory>/<contenedor>/<pack>`` y crece por el
+    final hasta ``_PACK_LIMIT``; la ubicación de un blob (``object`` = pack,
+    ``offset``, ``length``, ``codec``) se guarda en su metadata. Con
+    ``directory=None`` los packs viven en memoria. Lo ya escrito no se
+    modifica nunca: un snapshot puede seguir apuntando a un objeto aunque el
+    blob cambie. El espacio de los objetos que nadie referencia se recupera
+    borrando los packs vacíos y compactando los que tienen más datos muertos
+    que vivos (ver ``Storage._collect_cold``).
+    """
+
+    def __init__(self, directory: Path | None) -> None:
+        self.directory = directory
+        self._objects: dict[str, dict[str, bytearray]] = {}
+        self._current: dict[str, str] = {}
+
+    def put(
+        self, container: str, compressed: BinaryIO, codec: str, exclude: frozenset = frozenset()
+    ) -> dict[str, int | str]:
+        """
+        Añade datos ya comprimidos al pack abierto del contenedor.
+
+        Debe llamarse con el lock del journal tomado: es lo que garantiza un
+        único escritor por pack, y la recolección (que también lo toma) no
+        debe ver un objeto a medias.
+
+        Args:
+            container: Nombre del contenedor.
+            compressed: Stream con los datos comprimidos.
+            codec: Codec con el que se comprimieron.
+            exclude: Packs en los que no se debe escribir (los que se compactan).
+
+        Returns:
+            La ubicación del objeto.
+
+        Raises:
+            OSError: Si no se puede escribir el pack.
+        """
+        import shutil
+
+        pack = self._open_pack(container, exclude)
+        if self.directory is None:
+            buffer = self._objects.setdefault(container, {}).setdefault(pack, bytearray())
+            offset = len(buffer)
+            buffer += compressed.read()
+            return {"codec": codec, "object": pack, "offset": offset, "length": len(buffer) - offset}
+
+        path = self._path(container, pack)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "ab") as f:
+            # Un append interrumpido solo deja bytes muertos al final del pack.
+            offset = f.seek(0, os.SEEK_END)
+            shutil.copyfileobj(compressed, f, _CHUNK)
+            f.flush()
+            os.fsync(f.fileno())
+            length = f.tell() - offset
+        return {"codec": codec, "object": pack, "offset": offset, "length": length}
+
+    def open(self, container: str, location: dict) -> ColdReader:
+        """
+        Abre un objeto para leerlo descomprimido.
+
+        Raises:
+            OSError: Si el objeto no existe o no se puede leer.
+        """
+        return ColdReader(self._open_raw(container, location), location["length"], location["codec"])
+
+    def copy(self, container: str, location: dict, exclude: frozenset) -> dict[str, int | str]:
+        """
+        Copia un objeto (sin descomprimirlo) al pack abierto, fuera de ``exclude``.
+
+        Raises:
+            OSError: Si no se puede leer el objeto o escribir la copia.
+        """
+        import tempfile
+
+        spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_LIMIT)
+        with spool, self._open_raw(container, location) as stream:
+            remaining = location["length"]
+            while remaining > 0:
+                chunk = stream.read(min(_CHUNK, remaining))
+                if not chunk:
+                    raise OSError("cold storage object is truncated")
+                spool.write(chunk)
+                remaining -= len(chunk)
+            spool.seek(0)
+            return self.put(container, spool, location["codec"], exclude)
+
+    def objects(self, container: str) -> dict[str, int]:
+        """
+        Packs del contenedor con su tamaño (incluidos restos a medias).
+
+        Raises:
+            OSError: Si no se puede listar el directorio.
+        """
+        if self.directory is None:
+            return {key: len(data) for key, data in self._objects.get(container, {}).items()}
+        folder = self.directory / container
+        if not folder.is_dir():
+            return {}
+        return {entry.name: entry.stat().st_size for entry in folder.iterdir()}
+
+    def delete(self, container: str, key: str) -> None:
+        """
+        Elimina un pack (no falla si ya no existe).
+
+        Raises:
+            OSError: Si no se puede borrar.
+        """
+        if self._current.get(container) == key:
+            del self._current[container]
+        if self.directory is None:
+            self._objects.get(container, {}).pop(key, None)
+        else:
+            self._path(container, key).unlink(missing_ok=True)
+
+    def _open_pack(self, container: str, exclude: frozenset) -> str:
+        """
+        Elige el pack en el que escribir: el último usado si aún tiene sitio o,
+        si no, cualquier otro del contenedor con sitio (así varios procesos
+        llenan los mismos packs). Si no hay ninguno se empieza uno nuevo.
+        """
+        import uuid
+
+        sizes = self.objects(container)
+        current = self._current.get(container)
+        if current not in sizes or sizes[current] >= _PACK_LIMIT or current in exclude:
+            candidates = [
+                key
+                for key, size in sizes.items()
+                if size < _PACK_LIMIT and key not in exclude and not key.startswith(".")
+            ]
+            current = max(candidates) if candidates else uuid.uuid4().hex
+            self._current[container] = current
+        return current
+
+    def _open_raw(self, container: str, location: dict) -> BinaryIO:
+        """Stream de los bytes comprimidos de un objeto, posicionado en su inicio."""
+        import io
+
+        key, offset = location["object"], location.get("offset", 0)
+        if self.directory is None:
+            data = self._objects.get(container, {}).get(key)
+            if data is None:
+                raise FileNotFoundError(f"cold object '{key}' not found")
+            stream = io.BytesIO(data)
+        else:
+            stream = open(self._path(container, key), "rb")
+        stream.seek(offset)
+        return stream
+
+    def _path(self, container: str, key: str) -> Path:
+        return self.directory / container / key
@@ -0,0 +1,565 @@
+import os
+import struct
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+# Formato binario de las trazas: la cabecera ``MAGIC`` y, después, registros
+# de tamaño fijo ``_RECORD`` (operación, opciones, instante, id de contenedor,
+# hash del nombre, tamaño y duración). El código de operación 0 define un
+# contenedor: ``size`` es la longitud del nombre, que va a continuación. El id
+# de un contenedor es un hash de su nombre, así que varios procesos pueden
+# escribir en el mismo archivo sin ponerse de acuerdo.
+MAGIC = b"BLTR\x02"
+_RECORD = struct.Struct("<BBdIQQf")
+_DEFINE = 0
+_NO_CONTAINER = 0xFFFFFFFF
+
+# Operaciones de ``Storage`` que se registran: (método, código, parámetro con
+# el contenedor, parámetro que identifica el objeto de la operación). Todos
+# los métodos públicos tienen su propio código; ``replay`` reproduce cada uno.
+_OPERATIONS = (
+    ("create_container", 1, "name", None),
+    ("list_containers", 2, None, None),
+    ("upload_blob", 3, "container", "file_path"),
+    ("list_blobs", 4, "container", None),
+    ("download_blob", 5, "container", "blob_name"),
+    ("get_blob_metadata", 6, "container", "blob_name"),
+    ("delete_blob", 7, "container", "blob_name"),
+    ("set_blob_tags", 8, "container", "blob_name"),
+    ("get_blob_tags", 9, "container", "blob_name"),
+    ("find_blobs_by_tags", 10, "container", None),
+    ("iter_changes", 11, "container", None),
+    ("change_feed_cursor", 12, "container", None),
+    ("watch", 13, "container", None),
+    ("export_container", 14, "container", None),
+    ("import_container", 15, "container", "archive_path"),
+    ("create_container_snapshot", 16, "container", None),
+    ("list_snapshots", 17, "container", None),
+    ("restore_snapshot", 18, "container", "snapshot"),
+    ("delete_snapshot", 19, "container", "snapshot"),
+    ("set_blob_tier", 20, "container", "blob_name"),
+    ("apply_tier_policy", 21, "container", None),
+    ("recover", 22, None, None),
+)
+OPERATIONS = {code: method for method, code, _, _ in _OPERATIONS}
+
+# Opciones de un registro: ``overwrite`` en las subidas e importaciones y, en
+# ``set_blob_tier``, la posición del nivel en ``TIERS`` más uno.
+_OVERWRITE = 1
+
+# Operaciones que cambian un contenedor entero: ``replay`` espera a que
+# terminen las anteriores antes de lanzarlas y a que terminen ellas antes de
+# seguir, para no reordenarlas respecto a las operaciones sobre blobs.
+_BARRIERS = frozenset(
+    {
+        "create_container",
+        "import_container",
+        "create_container_snapshot",
+        "restore_snapshot",
+        "delete_snapshot",
+        "apply_tier_policy",
+        "recover",
+    }
+)
+
+# Operaciones que necesitan que el blob exista (``replay`` lo crea si la
+# traza no lo subió antes).
+_NEEDS_BLOB = frozenset(
+    {
+        "download_blob",
+        "get_blob_metadata",
+        "delete_blob",
+        "set_blob_tags",
+        "get_blob_tags",
+        "set_blob_tier",
+    }
+)
+
+# Un único recorder por archivo en cada proceso (ver ``open_recorder``).
+_recorders: dict[Path, "TraceRecorder"] = {}
+_recorders_lock = threading.Lock()
+
+
+class TraceRecord(NamedTuple):
+    time: float
+    op: str
+    container: str | None
+    name_hash: int
+    size: int
+    duration: float
+    flags: int = 0
+
+
+def name_hash(name: str) -> int:
+    """Hash estable de 64 bits de un nombre de blob (la traza no guarda nombres)."""
+    import hashlib
+
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _container_id(container: str) -> int:
+    import zlib
+
+    return zlib.crc32(container.encode("utf-8")) % _NO_CONTAINER
+
+
+def open_recorder(path: str | Path) -> "TraceRecorder":
+    """
+    Retorna el recorder de ``path``, compartido por todos los ``Storage`` del proceso.
+
+    Raises:
+        OSError: Si no se puede abrir el archivo de traza.
+    """
+    resolved = Path(str(path).replace("{pid}", str(os.getpid()))).resolve()
+    with _recorders_lock:
+        recorder = _recorders.get(resolved)
+        if recorder is None or recorder.closed:
+            recorder = _recorders[resolved] = TraceRecorder(resolved)
+        return recorder
+
+
+def _arg(args: tuple, kwargs: dict, position: int, name: str):
+    return args[position] if len(args) > position else kwargs.get(name)
+
+
+class TraceRecorder:
+    """
+    Registra en un archivo binario compacto las operaciones de un ``Storage``.
+
+    Cada operación ocupa 34 bytes y se escribe sin buffer con una sola
+    escritura en modo append, así que varios procesos pueden compartir el
+    archivo sin intercalar registros. Solo se registran las llamadas de primer
+    nivel (no las que un método de ``Storage`` hace a otro). Un ``{pid}`` en la
+    ruta se reemplaza por el PID. Usa ``open_recorder`` para compartir el
+    recorder entre instancias del mismo proceso.
+
+    Raises:
+        OSError: Si no se puede abrir el archivo de traza.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        import atexit
+
+        from bloblite.journal import _lock_file, _unlock_file
+
+        self.path = Path(str(path).replace("{pid}", str(os.getpid())))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab", buffering=0)
+        # La cabecera se escribe una sola vez aunque otro proceso abra a la vez.
+        _lock_file(self._file)
+        try:
+            if os.fstat(self._file.fileno()).st_size == 0:
+                self._file.write(MAGIC)
+        finally:
+            _unlock_file(self._file)
+        self._containers: set[str] = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        atexit.register(self.close)
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def attach(self, storage, size_of: Callable[[str, str], int]) -> None:
+        """
+        Envuelve los métodos públicos de ``storage`` para registrar cada llamada.
+
+        Args:
+            storage: Instancia de ``Storage``.
+            size_of: Función ``(contenedor, blob) -> tamaño`` para las
+                operaciones sobre blobs existentes.
+        """
+        import inspect
+
+        for method, code, container_param, subject_param in _OPERATIONS:
+            bound = getattr(storage, method)
+            params = list(inspect.signature(bound).parameters)
+            wrap = self._wrap_iterator if inspect.isgeneratorfunction(bound) else self._wrap
+            describe = self._describer(code, params, container_param, subject_param, size_of)
+            setattr(storage, method, wrap(bound, code, describe))
+
+    def record(
+        self,
+        code: int,
+        container: str | None,
+        name: str | None,
+        size: int,
+        start: float,
+        duration: float,
+        flags: int = 0,
+    ) -> None:
+        """Escribe un registro (los contenedores se definen la primera vez que aparecen)."""
+        data = b""
+        container_id = _NO_CONTAINER
+        if container is not None:
+            container_id = _container_id(container)
+            if container not in self._containers:
+                encoded = container.encode("utf-8")
+                data = _RECORD.pack(_DEFINE, 0, start, container_id, 0, len(encoded), 0) + encoded
+        hashed = name_hash(name) if name else 0
+        data += _RECORD.pack(code, flags, start, container_id, hashed, size, duration)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(data)
+            if container is not None:
+                self._containers.add(container)
+
+    def close(self) -> None:
+        """Cierra el archivo (las operaciones posteriores no se registran)."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    @staticmethod
+    def _describer(code, params, container_param, subject_param, size_of):
+        """Retorna la función que extrae (contenedor, nombre, tamaño, opciones) de una llamada."""
+
+        def position(param):
+            return params.index(param) if param in params else len(params)
+
+        container_at, subject_at = position(container_param), position(subject_param)
+        overwrite_at, tier_at = position("overwrite"), position("tier")
+
+        def describe(args, kwargs):
+            container = _arg(args, kwargs, container_at, container_param)
+            flags = _OVERWRITE if _arg(args, kwargs, overwrite_at, "overwrite") else 0
+            if tier_at < len(params):
+                from bloblite.tiering import TIERS
+
+                tier = _arg(args, kwargs, tier_at, "tier")
+                flags = TIERS.index(tier) + 1 if tier in TIERS else 0
+            name, size = None, 0
+            if subject_param is not None:
+                name = _arg(args, kwargs, subject_at, subject_param)
+                try:
+                    if subject_param in ("file_path", "archive_path"):
+                        size = os.stat(name).st_size
+                        name = Path(name).name if subject_param == "file_path" else None
+                    elif subject_param == "blob_name":
+                        size = size_of(container, name)
+                except (OSError, TypeError, ValueError):
+                    size = 0
+            return container, name, size, flags
+
+        return describe
+
+    def _wrap(self, method, code: int, describe):
+        def traced(*args, **kwargs):
+            if getattr(self._local, "active", False):
+                return method(*args, **kwargs)
+            container, name, size, flags = describe(args, kwargs)
+            self._local.active = True
+            start, began = time.time(), time.perf_counter()
+            result = None
+            try:
+                result = method(*args, **kwargs)
+                return result
+            finally:
+                self._local.active = False
+                if OPERATIONS[code] == "create_container_snapshot" and isinstance(result, str):
+                    name = result  # el snapshot creado identifica los siguientes
+                duration = time.perf_counter() - began
+                self.record(code, container, name, size, start, duration, flags)
+
+        return traced
+
+    def _wrap_iterator(self, method, code: int, describe):
+        """Como ``_wrap``, pero la duración abarca hasta agotar o cerrar el iterador."""
+
+        def traced(*args, **kwargs):
+            if getattr(self._local, "active", False):
+                yield from method(*args, **kwargs)
+                return
+            container, name, size, flags = describe(args, kwargs)
+            start, began = time.time(), time.perf_counter()
+            iterator = method(*args, **kwargs)
+            try:
+                while True:
+                    # Las llamadas internas del iterador no se registran aparte.
+                    self._local.active = True
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        self._local.active = False
+                    yield item
+            finally:
+                iterator.close()
+                duration = time.perf_counter() - began
+                self.record(code, container, name, size, start, duration, flags)
+
+        return traced
+
+
+def read_trace(path: str | Path) -> Iterator[TraceRecord]:
+    """
+    Recorre los registros de un archivo de traza.
+
+    Raises:
+        ValueError: Si el archivo no es una traza de BlobLite.
+        OSError: Si no se puede leer.
+    """
+    containers: dict[int, str] = {}
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not a BlobLite trace")
+        while True:
+            data = f.read(_RECORD.size)
+            if len(data) < _RECORD.size:
+                return  # registro a medio escribir al final
+            code, flags, start, container_id, hashed, size, duration = _RECORD.unpack(data)
+            if code == _DEFINE:
+                containers[container_id] = f.read(size).decode("utf-8")
+                continue
+            if code not in OPERATIONS:
+                raise ValueError(f"unknown operation code {code} in '{path}'")
+            container = containers.get(container_id)
+            yield TraceRecord(start, OPERATIONS[code], container, hashed, size, duration, flags)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    import math
+
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def replay(
+    records: list[TraceRecord],
+    storage,
+    data_dir: Path,
+    speed: float = 1.0,
+    workers: int = 4,
+) -> dict[str, list[float]]:
+    """
+    Reproduce una traza contra ``storage`` con datos sintéticos.
+
+    Los blobs se llaman ``blob-<hash>`` y se rellenan con datos del tamaño
+    registrado. Antes de empezar solo se crean los contenedores que la traza
+    usa sin haberlos creado; un blob que se lee sin haberse subido se crea
+    justo antes de esa primera lectura, fuera de la medición. Las operaciones
+    se lanzan respetando los intervalos originales divididos por ``speed``
+    (0 = lo más rápido posible). Las de un mismo blob van siempre al mismo
+    worker, así que conservan su orden, y las que cambian un contenedor
+    entero (ver ``_BARRIERS``) se ejecutan solas.
+
+    Args:
+        records: Registros de ``read_trace``.
+        storage: ``Storage`` de destino (normalmente en una raíz temporal).
+        data_dir: Directorio para los archivos sintéticos y las descargas.
+        speed: Factor de velocidad respecto a la grabación.
+        workers: Número de hilos que ejecutan operaciones.
+
+    Returns:
+        Latencias en segundos por operación.
+    """
+    import queue
+
+    from bloblite.backends import SNAPSHOT_SEP
+
+    created, missing = set(), set()
+    for r in records:
+        if r.op == "create_container":
+            created.add(r.container)
+        elif r.container:
+            base = r.container.split(SNAPSHOT_SEP, 1)[0]
+            if base not in created:
+                missing.add(base)
+    for container in sorted(missing):
+        storage.create_container(container)
+
+    state = _ReplayState(storage, data_dir)
+    latencies: dict[str, list[float]] = {}
+    lock = threading.Lock()
+    queues = [queue.Queue() for _ in range(workers)]
+
+    def worker(number: int) -> None:
+        downloads = data_dir / f"downloads-{number}"
+        downloads.mkdir(parents=True, exist_ok=True)
+        while (r := queues[number].get()) is not None:
+            call = _call(state, r, downloads)
+            began = time.perf_counter()
+            call()
+            elapsed = time.perf_counter() - began
+            with lock:
+                latencies.setdefault(r.op, []).append(elapsed)
+            queues[number].task_done()
+
+    threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(workers)]
+    for thread in threads:
+        thread.start()
+    origin, started = records[0].time if records else 0.0, time.monotonic()
+    for r in records:
+        if speed > 0:
+            delay = (r.time - origin) / speed - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+        target = queues[(r.name_hash or hash(r.container)) % workers]
+        if r.op in _BARRIERS:
+            for q in queues:
+                q.join()
+        target.put(r)
+        if r.op in _BARRIERS:
+            target.join()
+    for q in queues:
+        q.put(None)
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+class _ReplayState:
+    """Estado compartido por los workers de ``replay``."""
+
+    def __init__(self, storage, data_dir: Path) -> None:
+        self.storage = storage
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._seen: set[tuple[str, int]] = set()
+        self._snapshots: dict[tuple[str, int], str] = {}
+        self._archives = 0
+
+    def saw(self, container: str, hashed: int) -> bool:
+        """Marca un blob como conocido; retorna si ya lo estaba."""
+        with self._lock:
+            if (container, hashed) in self._seen:
+                return True
+            self._seen.add((container, hashed))
+            return False
+
+    def remember_snapshot(self, container: str, hashed: int, snapshot: str | None) -> None:
+        if snapshot:
+            with self._lock:
+                self._snapshots[(container, hashed)] = snapshot
+
+    def snapshot(self, container: str, hashed: int) -> str:
+        """Snapshot de la reproducción que corresponde a uno grabado (se crea si falta)."""
+        with self._lock:
+            snapshot = self._snapshots.get((container, hashed))
+        if snapshot is None:
+            snapshot = self.storage.create_container_snapshot(container) or ""
+            self.remember_snapshot(container, hashed, snapshot)
+        return snapshot
+
+    def resolve(self, container: str | None) -> str | None:
+        """Traduce ``<contenedor>@<snapshot>`` al snapshot equivalente de la reproducción."""
+        from bloblite.backends import SNAPSHOT_SEP
+
+        if not container or SNAPSHOT_SEP not in container:
+            return container
+        base, snapshot = container.split(SNAPSHOT_SEP, 1)
+        return f"{base}{SNAPSHOT_SEP}{self.snapshot(base, name_hash(snapshot))}"
+
+    def archive(self, record: TraceRecord) -> Path:
+        """Archivo de exportación sintético con un blob del tamaño registrado."""
+        import json
+
+        from bloblite import archive
+
+        with self._lock:
+            self._archives += 1
+            path = self.data_dir / "archives" / f"import-{self._archives}.tar"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "format": archive.FORMAT_VERSION,
+            "container": record.container or "imported",
+            "blobs": {},
+        }
+        blob = _synthetic(self.data_dir, record._replace(name_hash=0))
+        with archive.open_writer(path, "w") as tar:
+            archive.add_bytes(tar, archive.MANIFEST, json.dumps(manifest).encode("utf-8"))
+            with open(blob, "rb") as stream:
+                archive.add_stream(tar, archive.BLOBS_PREFIX + blob.name, stream)
+        return path
+
+
+def _synthetic(data_dir: Path, record: TraceRecord) -> Path:
+    """Archivo local con el nombre sintético del blob y el tamaño registrado."""
+    path = data_dir / "blobs" / f"blob-{record.name_hash:016x}"
+    if path.exists() and path.stat().st_size == record.size:
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    block = os.urandom(min(record.size, 1024 * 1024))
+    with open(path, "wb") as f:
+        remaining = record.size
+        while remaining > 0:
+            f.write(block[:remaining])
+            remaining -= len(block)
+    return path
+
+
+def _call(state: _ReplayState, record: TraceRecord, downloads: Path) -> Callable[[], object]:
+    """Prepara (fuera de la medición) la llamada que reproduce un registro."""
+    storage, op, hashed = state.storage, record.op, record.name_hash
+    container, name = state.resolve(record.container), f"blob-{hashed:016x}"
+    overwrite = bool(record.flags & _OVERWRITE)
+    if op == "upload_blob":
+        state.saw(container, hashed)
+        source = str(_synthetic(state.data_dir, record))
+        return lambda: storage.upload_blob(container, source, overwrite=overwrite)
+    if op in _NEEDS_BLOB and container == record.container and not state.saw(container, hashed):
+        storage.upload_blob(container, str(_synthetic(state.data_dir, record)))
+
+    if op == "create_container":
+        return lambda: storage.create_container(container)
+    if op == "list_containers":
+        return lambda: storage.list_containers(verbose=False)
+    if op == "list_blobs":
+        return lambda: storage.list_blobs(container, verbose=False)
+    if op == "download_blob":
+        return lambda: storage.download_blob(container, name, str(downloads))
+    if op == "get_blob_metadata":
+        return lambda: storage.get_blob_metadata(container, name)
+    if op == "delete_blob":
+        return lambda: storage.delete_blob(container, name)
+    if op == "set_blob_tags":
+        return lambda: storage.set_blob_tags(container, name, {"replay": "1"})
+    if op == "get_blob_tags":
+        return lambda: storage.get_blob_tags(container, name)
+    if op == "find_blobs_by_tags":
+        # La consulta no se graba: se reproduce una que recorre el contenedor.
+        return lambda: storage.find_blobs_by_tags("size >= 0", container)
+    if op == "iter_changes":
+        return lambda: list(storage.iter_changes(container))
+    if op == "change_feed_cursor":
+        return lambda: storage.change_feed_cursor(container)
+    if op == "watch":
+        return lambda: list(storage.watch(container, timeout=0))
+    if op == "export_container":
+        target = str(downloads / "export.tar")
+        return lambda: storage.export_container(container, target)
+    if op == "import_container":
+        source = str(state.archive(record))
+        return lambda: storage.import_container(source, record.container, overwrite=overwrite)
+    if op == "create_container_snapshot":
+        return lambda: state.remember_snapshot(
+            container, hashed, storage.create_container_snapshot(container)
+        )
+    if op == "list_snapshots":
+        return lambda: storage.list_snapshots(container, verbose=False)
+    if op == "restore_snapshot":
+        snapshot = state.snapshot(container, hashed)
+        return lambda: storage.restore_snapshot(container, snapshot)
+    if op == "delete_snapshot":
+        snapshot = state.snapshot(container, hashed)
+        return lambda: storage.delete_snapshot(container, snapshot)
+    if op == "set_blob_tier":
+        from bloblite.tiering import TIERS
+
+        tier = TIERS[record.flags - 1] if 0 < record.flags <= len(TIERS) else "cool"
+        return lambda: storage.set_blob_tier(container, name, tier)
+    if op == "apply_tier_policy":
+        return lambda: storage.apply_tier_policy(container)
+    if op == "recover":
+        return storage.recover
+    raise ValueError(f"unknown operation '{op}'")
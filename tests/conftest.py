@@ -1,8 +1,43 @@
 import pytest
 
+from bloblite.backends import SQLiteBackend, create_backend
 from bloblite.storage import Storage
 
 
 @pytest.fixture
 def storage(tmp_path):
     return Storage(base_path=tmp_path)
+
+
+@pytest.fixture(params=["fs", "memory", "sqlite"])
+def any_storage(request, tmp_path):
+    """Un ``Storage`` por backend, con la raíz en ``tmp_path / "root"``."""
+    backend = create_backend(request.param, tmp_path / "root")
+    if isinstance(backend, SQLiteBackend):
+        backend.inline_limit = 4  # mezcla blobs en la base y en objects/
+    return Storage(backend=backend)
+
+
+@pytest.fixture
+def make_file(tmp_path):
+    """Crea ``tmp_path / name`` con ``content`` (texto o bytes) y retorna su ruta."""
+
+    def make(name, content="data"):
+        source = tmp_path / name
+        if isinstance(content, bytes):
+            source.write_bytes(content)
+        else:
+            source.write_text(content)
+        return source
+
+    return make
+
+
+@pytest.fixture
+def upload(make_file):
+    """Sube ``content`` como el blob ``name`` a través de un archivo local."""
+
+    def upload(storage, container, name, content="data", overwrite=False):
+        storage.upload_blob(container, str(make_file(name, content)), overwrite=overwrite)
+
+    return upload
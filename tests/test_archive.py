@@ -0,0 +1,221 @@
+import io
+import json
+import tarfile
+
+import pytest
+
+from bloblite.cli import main
+from bloblite.storage import Storage
+
+
+def _seed(tmp_path, storage, container="clientes", count=20):
+    storage.create_container(container)
+    for i in range(count):
+        source = tmp_path / f"file{i}.csv"
+        source.write_bytes(b"x" * (i * 1000))
+        storage.upload_blob(container, str(source))
+    storage.set_blob_tags(container, "file3.csv", {"label": "hot"})
+
+
+@pytest.mark.parametrize("suffix", [".tar", ".tar.gz", ".tar.xz"])
+def test_export_import_roundtrip(tmp_path, any_storage, suffix, capsys):
+    _seed(tmp_path, any_storage)
+    archive = tmp_path / f"clientes{suffix}"
+    assert any_storage.export_container("clientes", str(archive)) == 20
+    assert "Exported 20 blob(s)" in capsys.readouterr().out
+
+    target = Storage(base_path=tmp_path / "destino")
+    assert target.import_container(str(archive), workers=3) == 20
+    assert "Imported 20 blob(s) into container 'clientes'" in capsys.readouterr().out
+
+    assert target.list_blobs("clientes", verbose=False) == any_storage.list_blobs(
+        "clientes", verbose=False
+    )
+    original = any_storage.get_blob_metadata("clientes", "file7.csv")
+    assert target.get_blob_metadata("clientes", "file7.csv") == original
+    assert target.get_blob_tags("clientes", "file3.csv") == {"label": "hot"}
+    assert [b["name"] for b in target.find_blobs_by_tags("size >= 19000")] == ["file19.csv"]
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    target.download_blob("clientes", "file5.csv", str(out_dir))
+    assert (out_dir / "file5.csv").read_bytes() == b"x" * 5000
+
+    events = list(target.iter_changes("clientes"))
+    assert len(events) == 20
+    assert {e["event_type"] for e in events} == {"BlobCreated"}
+
+
+def test_import_into_other_container_and_overwrite(tmp_path, capsys):
+    storage = Storage(base_path=tmp_path / "root")
+    _seed(tmp_path, storage, count=3)
+    archive = tmp_path / "clientes.tar"
+    storage.export_container("clientes", str(archive))
+
+    assert storage.import_container(str(archive), container="copia") == 3
+    assert storage.list_blobs("copia", verbose=False) == ["file0.csv", "file1.csv", "file2.csv"]
+
+    capsys.readouterr()
+    assert storage.import_container(str(archive), container="copia") == 0
+    assert "Skipped 3 existing blob(s)" in capsys.readouterr().out
+    assert storage.import_container(str(archive), container="copia", overwrite=True) == 3
+    events = list(storage.iter_changes("copia"))
+    assert [e["event_type"] for e in events][-3:] == ["BlobOverwritten"] * 3
+
+
+def test_export_errors(tmp_path, capsys):
+    storage = Storage(base_path=tmp_path / "root")
+    assert storage.export_container("missing", str(tmp_path / "x.tar")) == 0
+    assert "does not exist" in capsys.readouterr().out
+
+    storage.create_container("clientes")
+    assert storage.export_container("clientes", str(tmp_path / "x.zip")) == 0
+    assert "unsupported archive extension" in capsys.readouterr().out.lower()
+    assert not (tmp_path / "x.zip").exists()
+
+
+def test_import_rejects_foreign_and_unsafe_archives(tmp_path, capsys):
+    storage = Storage(base_path=tmp_path / "root")
+
+    assert storage.import_container(str(tmp_path / "missing.tar")) == 0
+    assert "not found" in capsys.readouterr().out
+
+    foreign = tmp_path / "foreign.tar"
+    with tarfile.open(foreign, "w") as tar:
+        tar.add(__file__, arcname="random.py")
+    assert storage.import_container(str(foreign)) == 0
+    assert "is not a BlobLite archive" in capsys.readouterr().out
+
+    unsafe = tmp_path / "unsafe.tar"
+    with tarfile.open(unsafe, "w") as tar:
+        for name, data in [
+            ("bloblite.json", json.dumps({"format": 1, "container": "c", "blobs": {}}).encode()),
+            ("blobs/../../evil.txt", b"evil"),
+            ("blobs/ok.txt", b"ok"),
+        ]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    assert storage.import_container(str(unsafe)) == 1
+    assert "invalid name" in capsys.readouterr().out
+    assert storage.list_blobs("c", verbose=False) == ["ok.txt"]
+    assert storage.get_blob_metadata("c", "ok.txt")["size"] == 2
+    assert not (tmp_path / "evil.txt").exists()
+
+    escaping = tmp_path / "escaping.tar"
+    manifest = {"format": 1, "container": "../escaped", "blobs": {}}
+    with tarfile.open(escaping, "w") as tar:
+        for name, data in [
+            ("bloblite.json", json.dumps(manifest).encode()),
+            ("blobs/x.txt", b"x"),
+        ]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    assert storage.import_container(str(escaping)) == 0
+    assert "Invalid container name '../escaped'" in capsys.readouterr().out
+    assert not (tmp_path / "escaped").exists()
+
+    for name in ("../x", "a/b", "a\\b", ".hidden", ""):
+        storage.create_container(name)
+    assert capsys.readouterr().out.count("Invalid container name") == 5
+    assert storage.list_containers(verbose=False) == ["c"]
+
+
+def _write_archive(path, manifest, members):
+    with tarfile.open(path, "w") as tar:
+        for name, data in [("bloblite.json", json.dumps(manifest).encode()), *members]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+def test_import_ignores_internal_fields_in_manifest(tmp_path):
+    storage = Storage(base_path=tmp_path / "root")
+    record = {
+        "name": "x.txt",
+        "size": 999,
+        "uploaded_at": "2020-01-01T00:00:00+00:00",
+        "tier": "archive",
+        "cold": {"codec": "lzma", "object": "nope", "length": 5},
+    }
+    archive = tmp_path / "tampered.tar"
+    manifest = {"format": 1, "container": "c", "blobs": {"x.txt": record}}
+    _write_archive(archive, manifest, [("blobs/x.txt", b"hola")])
+    assert storage.import_container(str(archive)) == 1
+
+    metadata = storage.get_blob_metadata("c", "x.txt")
+    assert metadata["size"] == 4
+    assert metadata["uploaded_at"] == "2020-01-01T00:00:00+00:00"
+    assert "tier" not in metadata and "cold" not in metadata
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    storage.download_blob("c", "x.txt", str(out_dir))
+    assert (out_dir / "x.txt").read_bytes() == b"hola"
+
+
+def test_import_drops_invalid_tags(tmp_path, capsys):
+    storage = Storage(base_path=tmp_path / "root")
+    blobs = {
+        "a.txt": {"tags": {"owner": "ana"}},
+        "b.txt": {"tags": {"tier": "hot"}},
+        "c.txt": {"tags": {"@container": "x"}},
+        "d.txt": {"tags": {f"k{i}": "v" for i in range(11)}},
+        "e.txt": {"tags": ["no"]},
+    }
+    archive = tmp_path / "tags.tar"
+    members = [(f"blobs/{name}", b"x") for name in blobs]
+    _write_archive(archive, {"format": 1, "container": "c", "blobs": blobs}, members)
+    assert storage.import_container(str(archive)) == 5
+    assert capsys.readouterr().out.count("Ignoring invalid tags") == 4
+
+    assert storage.get_blob_tags("c", "a.txt") == {"owner": "ana"}
+    assert all(storage.get_blob_tags("c", n) == {} for n in ("b.txt", "c.txt", "d.txt", "e.txt"))
+    assert [b["name"] for b in storage.find_blobs_by_tags("tier = 'hot'")] == sorted(blobs)
+
+
+def test_interrupted_import_is_reindexed(tmp_path, capsys):
+    storage = Storage(base_path=tmp_path / "root")
+    _seed(tmp_path, storage, count=5)
+    archive = tmp_path / "clientes.tar.gz"
+    storage.export_container("clientes", str(archive))
+    # Se trunca el archivo: la importación falla a mitad de la lectura.
+    data = archive.read_bytes()
+    archive.write_bytes(data[: len(data) // 2])
+
+    assert storage.import_container(str(archive), container="copia") == 0
+    assert "Cannot read archive" in capsys.readouterr().out
+    assert not storage._pending
+    imported = storage.list_blobs("copia", verbose=False)
+    found = storage.find_blobs_by_tags("@container = 'copia'")
+    assert sorted(b["name"] for b in found) == imported
+
+
+def test_import_zstd_requires_optional_dependency(tmp_path, capsys):
+    storage = Storage(base_path=tmp_path / "root")
+    _seed(tmp_path, storage, count=2)
+    archive = tmp_path / "clientes.tar.zst"
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        assert storage.export_container("clientes", str(archive)) == 0
+        assert "zstandard" in capsys.readouterr().out
+        return
+    assert storage.export_container("clientes", str(archive)) == 2
+    assert storage.import_container(str(archive), container="copia") == 2
+
+
+def test_cli_export_import(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("BLOBLITE_ROOT", str(tmp_path / "root"))
+    source = tmp_path / "data.csv"
+    source.write_text("a,b\n")
+    main(["container", "create", "clientes"])
+    main(["blob", "upload", "--container", "clientes", "--file", str(source)])
+    archive = tmp_path / "clientes.tar.gz"
+    main(["container", "export", "--container", "clientes", "--out", str(archive)])
+    main(["container", "import", "--file", str(archive), "--container", "copia", "--workers", "2"])
+    main(["container", "import", "--file", str(archive), "--workers", "zero"])
+    out = capsys.readouterr().out
+    assert "Exported 1 blob(s)" in out
+    assert "Imported 1 blob(s) into container 'copia'" in out
+    assert "--workers must be a positive integer" in out
+    assert (tmp_path / "root" / "copia" / "data.csv").read_text() == "a,b\n"
@@ -0,0 +1,140 @@
+import io
+
+import pytest
+
+from bloblite.backends import Backend, MemoryBackend, SQLiteBackend, create_backend
+from bloblite.sdk.blob_service_client import BlobServiceClient
+from bloblite.storage import Storage
+
+
+def test_backend_workflow(tmp_path, any_storage, capsys):
+    any_storage.create_container("clientes")
+    any_storage.create_container("clientes")
+    assert "already exists" in capsys.readouterr().out
+    assert any_storage.list_containers(verbose=False) == ["clientes"]
+
+    source = tmp_path / "archivo.csv"
+    source.write_text("id,nombre\n1,Ana\n")
+    any_storage.upload_blob("clientes", str(source))
+    any_storage.upload_blob("clientes", str(source))
+    assert "already exists" in capsys.readouterr().out
+    assert any_storage.list_blobs("clientes", verbose=False) == ["archivo.csv"]
+
+    metadata = any_storage.get_blob_metadata("clientes", "archivo.csv")
+    assert metadata["size"] == source.stat().st_size
+    any_storage.set_blob_tags("clientes", "archivo.csv", {"label": "hot"})
+    assert [b["name"] for b in any_storage.find_blobs_by_tags("label = 'hot'")] == [
+        "archivo.csv"
+    ]
+
+    out_dir = tmp_path / "descargas"
+    out_dir.mkdir()
+    any_storage.download_blob("clientes", "archivo.csv", str(out_dir))
+    assert (out_dir / "archivo.csv").read_text() == "id,nombre\n1,Ana\n"
+
+    source.write_text("nuevo")
+    any_storage.upload_blob("clientes", str(source), overwrite=True)
+    any_storage.delete_blob("clientes", "archivo.csv")
+    assert any_storage.list_blobs("clientes", verbose=False) == []
+    assert any_storage.get_blob_metadata("clientes", "archivo.csv") is None
+    assert [e["event_type"] for e in any_storage.iter_changes("clientes")] == [
+        "BlobCreated",
+        "BlobOverwritten",
+        "BlobDeleted",
+    ]
+
+
+def test_memory_backend_never_touches_disk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = BlobServiceClient(backend=MemoryBackend())
+    container = client.get_container_client("clientes")
+    container.create_container()
+    source = tmp_path / "archivo.csv"
+    source.write_text("1,2")
+    container.upload_blob(source)
+
+    assert client.storage_root is None
+    assert client.list_containers() == ["clientes"]
+    assert container.get_blob_metadata("archivo.csv")["size"] == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["archivo.csv"]
+
+
+def test_sqlite_backend_inlines_small_blobs(tmp_path):
+    root = tmp_path / "root"
+    storage = Storage(backend=SQLiteBackend(root, inline_limit=16))
+    storage.create_container("clientes")
+    small = tmp_path / "small.txt"
+    small.write_text("x" * 16)
+    large = tmp_path / "large.txt"
+    large.write_text("y" * 100)
+    storage.upload_blob("clientes", str(small))
+    storage.upload_blob("clientes", str(large))
+
+    assert sorted(p.name for p in (root / "objects" / "clientes").iterdir()) == ["large.txt"]
+    with storage.backend.open_blob("clientes", "small.txt") as f:
+        assert f.read() == b"x" * 16
+
+    # Una segunda instancia (otro proceso) ve el mismo contenido e índice.
+    other = Storage(backend=SQLiteBackend(root, inline_limit=16))
+    assert other.list_blobs("clientes", verbose=False) == ["large.txt", "small.txt"]
+    assert [b["name"] for b in other.find_blobs_by_tags("size > 16")] == ["large.txt"]
+
+    large.write_text("z")
+    storage.upload_blob("clientes", str(large), overwrite=True)
+    assert list((root / "objects" / "clientes").iterdir()) == []
+    assert other.get_blob_metadata("clientes", "large.txt")["size"] == 1
+
+
+def test_create_backend_unknown(tmp_path):
+    with pytest.raises(ValueError):
+        create_backend("s3", tmp_path)
+
+
+def test_incomplete_backend_fails_on_creation():
+    class Partial(Backend):
+        def container_exists(self, container):
+            return False
+
+    # Un backend al que le falta parte de la interfaz no llega a instanciarse.
+    with pytest.raises(TypeError, match="create_snapshot"):
+        Partial()
+
+
+def test_sqlite_backend_errors_and_single_transaction(tmp_path, capsys):
+    broken = tmp_path / "broken"
+    broken.mkdir()
+    (broken / "blobs.sqlite3").write_bytes(b"not a database" * 100)
+    storage = Storage(backend=SQLiteBackend(broken))
+    assert storage.list_containers(verbose=False) == []
+    out = capsys.readouterr().out
+    assert "Cannot create or access storage" in out
+    assert "Storage not initialized" in out
+
+    backend = SQLiteBackend(tmp_path / "root", inline_limit=4)
+    backend.initialize()
+    backend.create_container("clientes")
+    # El contenido y la metadata se confirman juntos; sin metadata se conserva la anterior.
+    for name, data in (("small.txt", b"abc"), ("large.txt", b"x" * 100)):
+        backend.write_blob("clientes", name, io.BytesIO(data), metadata={"name": name, "v": 1})
+        assert backend.read_metadata("clientes", name) == {"name": name, "v": 1}
+        backend.write_blob("clientes", name, io.BytesIO(data * 2))
+        assert backend.read_metadata("clientes", name) == {"name": name, "v": 1}
+        assert backend.blob_size("clientes", name) == 2 * len(data)
+
+
+def test_filesystem_writes_without_token_do_not_collide(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    backend = create_backend("fs", tmp_path / "root")
+    backend.initialize()
+    backend.create_container("clientes")
+
+    def write(i):
+        backend.write_blob("clientes", f"f{i}.bin", io.BytesIO(bytes([i]) * 200_000))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(write, range(32)))
+    for i in range(32):
+        with backend.open_blob("clientes", f"f{i}.bin") as f:
+            assert f.read() == bytes([i]) * 200_000
+    assert not list((tmp_path / "root" / ".bloblite" / "tmp").iterdir())
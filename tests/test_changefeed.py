@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+from bloblite.sdk.blob_service_client import BlobServiceClient
+
+
+@pytest.fixture
+def container(tmp_path):
+    client = BlobServiceClient(storage_root=tmp_path / "root")
+    container = client.get_container_client("clientes")
+    container.create_container()
+    return container
+
+
+def test_change_feed_events_and_cursor(container, make_file):
+    container.upload_blob(make_file("a.csv", "1"))
+    container.upload_blob(make_file("a.csv", "22"), overwrite=True)
+    container.set_blob_tags("a.csv", {"label": "hot"})  # no genera eventos
+    container.delete_blob("a.csv")
+
+    events = list(container.iter_changes())
+    assert [(e["event_type"], e["name"]) for e in events] == [
+        ("BlobCreated", "a.csv"),
+        ("BlobOverwritten", "a.csv"),
+        ("BlobDeleted", "a.csv"),
+    ]
+    assert events[1]["size"] == 2
+    assert [e["seq"] for e in events] == sorted(e["seq"] for e in events)
+
+    cursor = events[1]["cursor"]
+    assert [e["event_type"] for e in container.iter_changes(since=cursor)] == ["BlobDeleted"]
+    assert list(container.iter_changes(since=events[-1]["cursor"])) == []
+
+
+def test_iter_changes_invalid_cursor(capsys, container):
+    assert list(container.iter_changes(since="nope")) == []
+    assert "Invalid change feed cursor" in capsys.readouterr().out
+
+
+def test_delete_blob(tmp_path, container, make_file, capsys):
+    container.upload_blob(make_file("a.csv", "1"))
+    container.delete_blob("a.csv")
+    assert container.get_blob_metadata("a.csv") is None
+    assert not (tmp_path / "root" / "clientes" / "a.csv").exists()
+    assert container.find_blobs_by_tags("size > 0") == []
+
+    container.delete_blob("a.csv")
+    assert "not found" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watch_receives_new_events(container, make_file, use_inotify):
+    container.upload_blob(make_file("old.csv", "1"))
+    received = []
+
+    def consume():
+        for event in container.watch(timeout=5, poll_interval=0.05, use_inotify=use_inotify):
+            received.append(event)
+            return
+
+    watcher = threading.Thread(target=consume)
+    watcher.start()
+    time.sleep(0.2)
+    container.upload_blob(make_file("new.csv", "2"))
+    watcher.join(timeout=5)
+
+    assert not watcher.is_alive()
+    assert [e["name"] for e in received] == ["new.csv"]
+
+
+def test_watch_stops_after_idle_timeout(container):
+    start = time.monotonic()
+    assert list(container.watch(timeout=0.2, poll_interval=0.05)) == []
+    assert time.monotonic() - start < 2
+
+
+def test_missing_feed_events_are_rebuilt_from_the_journal(
+    tmp_path, container, make_file, monkeypatch, capsys
+):
+    from bloblite.changefeed import ChangeFeed
+    from bloblite.storage import Storage
+
+    container.upload_blob(make_file("a.csv", "1"))
+    # El feed falla tras confirmar el journal: la subida termina igualmente.
+    append = ChangeFeed.append
+
+    def fail(self, *args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ChangeFeed, "append", fail)
+    container.upload_blob(make_file("b.csv", "22"))
+    monkeypatch.setattr(ChangeFeed, "append", append)
+    out = capsys.readouterr().out
+    assert "It will be rebuilt from the journal" in out and "Uploaded 'b.csv'" in out
+    # Y un proceso que murió a mitad dejó un evento cortado al final del feed.
+    with open(tmp_path / "root" / ".bloblite" / "changefeed" / "clientes.log", "ab") as f:
+        f.write(b'{"seq":99,"event_ty')
+    assert [e["name"] for e in container.iter_changes()] == ["a.csv"]
+
+    storage = Storage(base_path=tmp_path / "root")
+    storage.recover()
+    events = list(storage.iter_changes("clientes"))
+    assert [(e["event_type"], e["name"], e["size"]) for e in events] == [
+        ("BlobCreated", "a.csv", 1),
+        ("BlobCreated", "b.csv", 2),
+    ]
+    storage.recover()
+    assert len(list(storage.iter_changes("clientes"))) == 2
+
+
+def test_checkpoint_completes_the_feed_before_emptying_the_journal(
+    tmp_path, container, make_file, monkeypatch
+):
+    import bloblite.storage
+    from bloblite.changefeed import ChangeFeed
+
+    monkeypatch.setattr(bloblite.storage, "_CHECKPOINT_EVERY", 4)
+    append = ChangeFeed.append
+
+    def fail(self, *args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ChangeFeed, "append", fail)
+    container.upload_blob(make_file("a.csv"))
+    monkeypatch.setattr(ChangeFeed, "append", append)
+    for name in ("b.csv", "c.csv"):
+        container.upload_blob(make_file(name))
+
+    journal = (tmp_path / "root" / ".bloblite" / "journal.log").read_text().splitlines()
+    assert len(journal) < 4
+    assert sorted(e["name"] for e in container.iter_changes()) == ["a.csv", "b.csv", "c.csv"]
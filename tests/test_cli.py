@@ -5,7 +5,7 @@ from pathlib import Path
 
 
 def run_cli(
-    args: list[str], env: dict[str, str], cwd: Path
+    args: list[str], env: dict[str, str], cwd: Path, stdin: str | None = None
 ) -> subprocess.CompletedProcess:
     """
     Ejecuta el CLI con argumentos y entorno personalizados.
@@ -19,6 +19,7 @@ def run_cli(
         [sys.executable, "-m", "bloblite.cli"] + args,
         env=env,
         cwd=str(cwd),
+        input=stdin,
         capture_output=True,
         text=True,
         check=False,
@@ -83,6 +84,90 @@ def test_cli_full_workflow(tmp_path: Path):
     assert "downloaded" in result.stdout.lower()
 
 
+
+def test_cli_batch_from_stdin(tmp_path: Path):
+    env = {**os.environ, "BLOBLITE_ROOT": str(tmp_path / "root")}
+    project_root = Path(__file__).resolve().parent.parent
+
+    test_file = tmp_path / "archivo.csv"
+    test_file.write_text("id,nombre\n1,Ana\n")
+
+    commands = "\n".join(
+        [
+            "# comentario",
+            "container create clientes",
+            f'blob upload --container clientes --file "{test_file}"',
+            "",
+            "blob list --container=clientes",
+            "blob nope",
+        ]
+    )
+    result = run_cli(["batch"], env, project_root, stdin=commands)
+
+    assert "created" in result.stdout.lower(), result.stdout + result.stderr
+    assert "uploaded" in result.stdout.lower()
+    assert "archivo.csv" in result.stdout
+    assert "Line 6: invalid command" in result.stdout
+    assert result.returncode == 1
+
+
+def test_cli_import_is_lightweight(tmp_path: Path):
+    """Regresión de arranque: importar el CLI no debe cargar módulos pesados."""
+    project_root = Path(__file__).resolve().parent.parent
+    env = {**os.environ, "PYTHONPATH": str(project_root / "src")}
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import bloblite.cli"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {
+        line.rsplit("|", 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+    assert "bloblite.cli" in imported
+    heavy = {"argparse", "json", "shutil", "datetime", "pathlib", "bloblite.storage"}
+    assert not heavy & imported, sorted(heavy & imported)
+
+
+
+def test_cli_container_list_skips_index_and_recovery(tmp_path: Path):
+    """Regresión de arranque: un comando simple no carga el índice ni recupera."""
+    from bloblite.storage import Storage
+
+    project_root = Path(__file__).resolve().parent.parent
+    env = {**os.environ, "BLOBLITE_ROOT": str(tmp_path)}
+    storage = Storage(base_path=tmp_path)
+    storage.create_container("clientes")
+    # Una subida a medias de un proceso muerto: se recupera al abrir el índice.
+    dead = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True
+    )
+    storage._log(
+        {"op": "begin", "container": "clientes", "name": "lost.csv", "pid": int(dead.stdout)}
+    )
+    journal = (tmp_path / ".bloblite" / "journal.log").read_text()
+
+    result = run_cli(["container", "list"], {**env, "PYTHONPROFILEIMPORTTIME": "1"}, project_root)
+    imported = {
+        line.rsplit("|", 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    assert "clientes" in result.stdout
+    assert "Recovered" not in result.stdout
+    assert "bloblite.storage" in imported
+    assert not {"bloblite.index", "bloblite.journal"} & imported
+    assert (tmp_path / ".bloblite" / "journal.log").read_text() == journal
+
+    result = run_cli(["blob", "list", "--container", "clientes"], env, project_root)
+    assert "Recovered" not in result.stdout
+    assert (tmp_path / ".bloblite" / "journal.log").read_text() == journal
+
 # def test_cli_blob_show_metadata_missing(monkeypatch, tmp_path):
 #     monkeypatch.setenv("BLOBLITE_ROOT", str(tmp_path))
 #     subprocess.run(
@@ -0,0 +1,160 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import bloblite.storage
+from bloblite.storage import Storage
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _dead_pid() -> int:
+    result = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(result.stdout)
+
+
+def test_instances_tail_the_journal(tmp_path, upload):
+    root = tmp_path / "root"
+    writer = Storage(base_path=root)
+    reader = Storage(base_path=root)
+    writer.create_container("clientes")
+    assert reader.find_blobs_by_tags("size > 0") == []
+
+    upload(writer, "clientes", "a.csv")
+    writer.set_blob_tags("clientes", "a.csv", {"label": "hot"})
+
+    assert [b["name"] for b in reader.find_blobs_by_tags("label = 'hot'")] == ["a.csv"]
+    assert reader.get_blob_metadata("clientes", "a.csv")["tags"] == {"label": "hot"}
+
+    entries = (root / ".bloblite" / "journal.log").read_text().splitlines()
+    seqs = [json.loads(line)["seq"] for line in entries]
+    assert seqs == sorted(seqs) and len(set(seqs)) == len(seqs)
+    assert [json.loads(line)["op"] for line in entries] == ["begin", "put", "put"]
+
+
+def test_checkpoint_rotation_keeps_readers_coherent(tmp_path, monkeypatch, upload):
+    monkeypatch.setattr(bloblite.storage, "_CHECKPOINT_EVERY", 4)
+    root = tmp_path / "root"
+    writer = Storage(base_path=root)
+    reader = Storage(base_path=root)
+    writer.create_container("clientes")
+    reader.find_blobs_by_tags("size > 0")
+
+    for i in range(5):
+        upload(writer, "clientes", f"f{i}.csv", "x" * (i + 1))
+
+    found = reader.find_blobs_by_tags("size > 0")
+    assert [b["name"] for b in found] == [f"f{i}.csv" for i in range(5)]
+    journal = (root / ".bloblite" / "journal.log").read_text().splitlines()
+    assert len(journal) < 4
+    checkpoint = json.loads((root / ".bloblite" / "index.json").read_text())
+    assert checkpoint["seq"] >= 8
+
+
+def test_recover_interrupted_upload(tmp_path, capsys):
+    root = tmp_path / "root"
+    storage = Storage(base_path=root)
+    storage.create_container("clientes")
+    storage.find_blobs_by_tags("size > 0")
+
+    # Simula dos procesos que murieron a mitad de una subida: uno alcanzó a
+    # mover el blob al contenedor y el otro solo dejó un temporal parcial.
+    pid = _dead_pid()
+    done = storage._log({"op": "begin", "container": "clientes", "name": "done.csv", "pid": pid})
+    (root / "clientes" / "done.csv").write_text("complete")
+    partial = storage._log(
+        {"op": "begin", "container": "clientes", "name": "partial.csv", "pid": pid}
+    )
+    storage.backend._tmp_path(str(partial["seq"])).write_text("par")
+
+    fresh = Storage(base_path=root)
+    found = fresh.find_blobs_by_tags("size > 0")
+    output = capsys.readouterr().out
+
+    assert [b["name"] for b in found] == ["done.csv"]
+    assert fresh.get_blob_metadata("clientes", "done.csv")["size"] == len("complete")
+    assert (root / "clientes" / "done.metadata.json").exists()
+    assert not storage.backend._tmp_path(str(partial["seq"])).exists()
+    assert "partial.csv" in output and "done.csv" in output
+    assert fresh.recover() == 0
+    assert done["seq"] < partial["seq"]
+
+
+def test_long_lived_instance_recovers_when_checkpoint_is_blocked(
+    tmp_path, monkeypatch, capsys, upload
+):
+    monkeypatch.setattr(bloblite.storage, "_CHECKPOINT_EVERY", 4)
+    root = tmp_path / "root"
+    storage = Storage(base_path=root)
+    storage.create_container("clientes")
+    storage.find_blobs_by_tags("size > 0")
+
+    # Otro escritor muere a mitad de una subida después de abrir esta instancia.
+    storage._log({"op": "begin", "container": "clientes", "name": "lost.csv", "pid": _dead_pid()})
+    for i in range(5):
+        upload(storage, "clientes", f"f{i}.csv")
+
+    assert not storage._pending
+    assert "Recovered interrupted upload of 'lost.csv'" in capsys.readouterr().out
+    journal = (root / ".bloblite" / "journal.log").read_text().splitlines()
+    assert len(journal) < 4
+
+
+def test_concurrent_processes_share_the_index(tmp_path):
+    root = tmp_path / "root"
+    Storage(base_path=root).create_container("clientes")
+    script = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "from bloblite.storage import Storage\n"
+        "root, worker = Path(sys.argv[1]), sys.argv[2]\n"
+        "storage = Storage(base_path=root)\n"
+        "for i in range(10):\n"
+        "    source = root.parent / f'w{worker}_{i}.txt'\n"
+        "    source.write_text('x' * (i + 1))\n"
+        "    storage.upload_blob('clientes', str(source))\n"
+    )
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT / "src")}
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-c", script, str(root), str(n)],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        for n in range(3)
+    ]
+    assert all(worker.wait() == 0 for worker in workers)
+
+    found = Storage(base_path=root).find_blobs_by_tags("size > 0")
+    assert len(found) == 30
+    entries = (root / ".bloblite" / "journal.log").read_text().splitlines()
+    seqs = [json.loads(line)["seq"] for line in entries]
+    assert seqs == list(range(1, 61))
+
+
+def test_point_lookups_skip_index_load_and_upload_fsyncs_once(tmp_path, monkeypatch, upload):
+    storage = Storage(base_path=tmp_path / "root")
+    storage.create_container("clientes")
+    upload(storage, "clientes", "data.csv", "hello")
+
+    calls = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: calls.append(fd) or fsync(fd))
+    upload(storage, "clientes", "other.csv", "bye")
+    assert len(calls) == 1
+
+    fresh = Storage(base_path=tmp_path / "root")
+    assert fresh.get_blob_metadata("clientes", "data.csv")["size"] == 5
+    fresh.download_blob("clientes", "data.csv", str(tmp_path / "data-copy.csv"))
+    assert fresh._index is None
+    # Si la metadata no cuadra con el blob se pasa por el índice.
+    (tmp_path / "root" / "clientes" / "data.csv").write_bytes(b"changed!")
+    assert fresh.get_blob_metadata("clientes", "data.csv")["size"] == 5
+    assert fresh._index is not None
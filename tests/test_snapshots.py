@@ -0,0 +1,127 @@
+import os
+
+from bloblite.cli import main
+from bloblite.sdk.blob_service_client import BlobServiceClient
+from bloblite.storage import Storage
+
+
+def test_snapshot_is_frozen_and_restorable(tmp_path, any_storage, upload, capsys):
+    any_storage.create_container("clientes")
+    upload(any_storage, "clientes", "a.csv", "uno")
+    upload(any_storage, "clientes", "b.csv", "contenido grande")
+    any_storage.set_blob_tags("clientes", "a.csv", {"label": "hot"})
+
+    snapshot = any_storage.create_container_snapshot("clientes")
+    assert snapshot
+    assert any_storage.list_snapshots("clientes", verbose=False) == [snapshot]
+    frozen = f"clientes@{snapshot}"
+
+    upload(any_storage, "clientes", "a.csv", "modificado", overwrite=True)
+    any_storage.delete_blob("clientes", "b.csv")
+    upload(any_storage, "clientes", "c.csv", "nuevo")
+    any_storage.set_blob_tags("clientes", "a.csv", {"label": "cool"})
+
+    # El snapshot se lee con los métodos normales y no ve los cambios.
+    assert any_storage.list_blobs(frozen, verbose=False) == ["a.csv", "b.csv"]
+    assert any_storage.get_blob_tags(frozen, "a.csv") == {"label": "hot"}
+    assert any_storage.get_blob_metadata(frozen, "b.csv")["size"] == len("contenido grande")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    any_storage.download_blob(frozen, "b.csv", str(out_dir))
+    assert (out_dir / "b.csv").read_text() == "contenido grande"
+    # Los snapshots no aparecen como contenedores ni en las búsquedas.
+    assert any_storage.list_containers(verbose=False) == ["clientes"]
+    assert [b["container"] for b in any_storage.find_blobs_by_tags("label = 'hot'")] == []
+
+    capsys.readouterr()
+    assert any_storage.restore_snapshot("clientes", snapshot)
+    assert "restored from snapshot" in capsys.readouterr().out
+    assert any_storage.list_blobs("clientes", verbose=False) == ["a.csv", "b.csv"]
+    any_storage.download_blob("clientes", "a.csv", str(out_dir))
+    assert (out_dir / "a.csv").read_text() == "uno"
+    assert any_storage.get_blob_tags("clientes", "a.csv") == {"label": "hot"}
+    found = any_storage.find_blobs_by_tags("label = 'hot'")
+    assert [(b["container"], b["name"]) for b in found] == [("clientes", "a.csv")]
+    events = list(any_storage.iter_changes("clientes"))[-3:]
+    assert sorted((e["event_type"], e["name"]) for e in events) == [
+        ("BlobCreated", "b.csv"),
+        ("BlobDeleted", "c.csv"),
+        ("BlobOverwritten", "a.csv"),
+    ]
+
+    # El contenido restaurado es independiente del snapshot.
+    upload(any_storage, "clientes", "b.csv", "otra vez", overwrite=True)
+    any_storage.download_blob(frozen, "b.csv", str(out_dir))
+    assert (out_dir / "b.csv").read_text() == "contenido grande"
+
+    any_storage.delete_snapshot("clientes", snapshot)
+    assert any_storage.list_snapshots("clientes", verbose=False) == []
+    assert any_storage.list_blobs(frozen, verbose=False) == []
+
+
+def test_snapshots_are_read_only(tmp_path, any_storage, upload, capsys):
+    any_storage.create_container("clientes")
+    upload(any_storage, "clientes", "a.csv", "uno")
+    frozen = f"clientes@{any_storage.create_container_snapshot('clientes')}"
+    capsys.readouterr()
+
+    source = tmp_path / "x.csv"
+    source.write_text("x")
+    any_storage.upload_blob(frozen, str(source))
+    any_storage.delete_blob(frozen, "a.csv")
+    any_storage.set_blob_tags(frozen, "a.csv", {"k": "v"})
+    assert any_storage.create_container_snapshot(frozen) is None
+    assert capsys.readouterr().out.count("is a snapshot and is read-only") == 4
+    assert any_storage.list_blobs(frozen, verbose=False) == ["a.csv"]
+
+    any_storage.create_container("otro@x")
+    assert "'@' is reserved for snapshots" in capsys.readouterr().out
+    assert not any_storage.restore_snapshot("clientes", "nope")
+    assert "not found" in capsys.readouterr().out
+
+
+def test_fs_snapshot_shares_blob_files(tmp_path, upload):
+    storage = Storage(base_path=tmp_path / "root")
+    storage.create_container("clientes")
+    upload(storage, "clientes", "a.csv", "uno")
+    snapshot = storage.create_container_snapshot("clientes")
+
+    live = tmp_path / "root" / "clientes" / "a.csv"
+    frozen = tmp_path / "root" / ".bloblite" / "snapshots" / "clientes" / snapshot / "a.csv"
+    assert os.path.samefile(live, frozen)
+
+    # Sobrescribir crea un archivo nuevo: el snapshot conserva el contenido.
+    upload(storage, "clientes", "a.csv", "dos", overwrite=True)
+    assert not os.path.samefile(live, frozen)
+    assert frozen.read_text() == "uno"
+
+
+def test_sdk_and_cli_snapshots(tmp_path, monkeypatch, capsys):
+    client = BlobServiceClient(storage_root=tmp_path / "root")
+    container = client.get_container_client("clientes")
+    container.create_container()
+    source = tmp_path / "a.csv"
+    source.write_text("uno")
+    container.upload_blob(source)
+    snapshot = container.create_snapshot()
+    assert container.list_snapshots() == [snapshot]
+
+    reader = client.get_container_client("clientes", snapshot=snapshot)
+    container.delete_blob("a.csv")
+    assert reader.get_blob_metadata("a.csv")["size"] == 3
+    assert container.get_snapshot_client(snapshot).get_blob_metadata("a.csv")["size"] == 3
+    assert container.restore_snapshot(snapshot)
+    assert container.get_blob_metadata("a.csv")["size"] == 3
+
+    monkeypatch.setenv("BLOBLITE_ROOT", str(tmp_path / "root"))
+    capsys.readouterr()
+    main(["container", "snapshot", "--container", "clientes"])
+    main(["container", "snapshots", "--container", "clientes"])
+    assert "Total: 2 snapshot(s)" in capsys.readouterr().out
+    main(["container", "restore", "--container", "clientes", "--snapshot", snapshot])
+    main(["blob", "list", "--container", f"clientes@{snapshot}"])
+    main(["container", "delete-snapshot", "--container", "clientes", "--snapshot", snapshot])
+    out = capsys.readouterr().out
+    assert "restored from snapshot" in out
+    assert "1. a.csv" in out
+    assert f"Deleted snapshot '{snapshot}'" in out
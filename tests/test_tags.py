@@ -0,0 +1,105 @@
+import pytest
+
+from bloblite.index import BlobIndex, parse_query
+from bloblite.sdk.blob_service_client import BlobServiceClient
+from bloblite.storage import Storage
+
+
+def test_parse_query():
+    conditions = parse_query("size > 1000000 AND tier = 'hot' and \"@container\" = 'a''b'")
+    assert conditions == [
+        ("size", ">", 1000000),
+        ("tier", "=", "hot"),
+        ("@container", "=", "a'b"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "expression", ["", "size >", "size ! 3", "tier = hot", "size > 1 OR size < 3"]
+)
+def test_parse_query_invalid(expression):
+    with pytest.raises(ValueError):
+        parse_query(expression)
+
+
+def test_find_blobs_by_tags(storage, upload):
+    storage.create_container("clientes")
+    storage.create_container("ventas")
+    upload(storage, "clientes", "grande.csv", "x" * 2000)
+    upload(storage, "clientes", "chico.csv", "x")
+    upload(storage, "ventas", "enero.csv", "x" * 5000)
+
+    storage.set_blob_tags("clientes", "grande.csv", {"label": "hot"})
+    storage.set_blob_tags("ventas", "enero.csv", {"label": "cool"})
+
+    assert storage.get_blob_tags("clientes", "grande.csv") == {"label": "hot"}
+    assert storage.get_blob_metadata("clientes", "grande.csv")["tags"] == {"label": "hot"}
+
+    found = storage.find_blobs_by_tags("size > 1000")
+    assert [(b["container"], b["name"]) for b in found] == [
+        ("clientes", "grande.csv"),
+        ("ventas", "enero.csv"),
+    ]
+    found = storage.find_blobs_by_tags("size >= 1 AND label = 'hot'")
+    assert [b["name"] for b in found] == ["grande.csv"]
+    assert found[0]["tags"] == {"label": "hot"}
+    assert storage.find_blobs_by_tags("size < 2000", container="ventas") == []
+    assert [b["name"] for b in storage.find_blobs_by_tags("name = 'chico.csv'")] == [
+        "chico.csv"
+    ]
+
+
+def test_find_blobs_by_tags_rebuilds_missing_index(tmp_path, storage, upload):
+    storage.create_container("clientes")
+    upload(storage, "clientes", "data.csv", "1,2")
+    (storage.base_path / ".bloblite" / "index.json").unlink()
+
+    fresh = Storage(base_path=storage.base_path)
+    found = fresh.find_blobs_by_tags("size = 3")
+    assert [b["name"] for b in found] == ["data.csv"]
+    assert "clientes" in fresh.list_containers()
+    assert ".bloblite" not in fresh.list_containers()
+
+
+def test_set_blob_tags_errors(capsys, storage):
+    storage.create_container("clientes")
+    storage.set_blob_tags("clientes", "missing.csv", {"a": "b"})
+    assert "not found" in capsys.readouterr().out
+
+    storage.set_blob_tags("clientes", "missing.csv", {"size": "1"})
+    assert "reserved field name" in capsys.readouterr().out
+
+    assert storage.find_blobs_by_tags("size >") == []
+    assert "Invalid query" in capsys.readouterr().out
+
+
+def test_index_secondary_updates():
+    index = BlobIndex()
+    index.put("c", {"name": "a", "size": 5, "tags": {"k": "v"}})
+    assert index.query("k = 'v'") == [("c", "a")]
+
+    index.put("c", {"name": "a", "size": 5, "tags": {"k": "w"}})
+    index.put("c", {"name": "b", "size": 7})
+    assert index.query("k = 'v'") == []
+    assert index.query("size > 5") == [("c", "b")]
+    assert index.query("size <= 5") == [("c", "a")]
+
+    index.remove("c", "b")
+    assert index.query("size > 5") == []
+
+
+def test_sdk_find_blobs_by_tags(tmp_path):
+    client = BlobServiceClient(storage_root=tmp_path)
+    container = client.get_container_client("clientes")
+    container.create_container()
+    source = tmp_path / "archivo.csv"
+    source.write_text("id,name\n1,Santiago")
+    container.upload_blob(source)
+
+    container.set_blob_tags("archivo.csv", {"owner": "ana"})
+    assert container.get_blob_tags("archivo.csv") == {"owner": "ana"}
+    assert [b["name"] for b in container.find_blobs_by_tags("owner = 'ana'")] == [
+        "archivo.csv"
+    ]
+    assert len(client.find_blobs_by_tags("owner = 'ana'")) == 1
+    assert client.list_containers() == ["clientes"]
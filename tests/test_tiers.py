@@ -0,0 +1,259 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bloblite.cli import main
+from bloblite.sdk.blob_service_client import BlobServiceClient
+from bloblite.storage import Storage
+
+CONTENT = b"id,nombre\n" + b"1,Ana\n" * 5000
+
+
+@pytest.fixture
+def any_storage(any_storage, upload):
+    """El ``any_storage`` de conftest con ``clientes/data.csv`` ya subido."""
+    any_storage.create_container("clientes")
+    upload(any_storage, "clientes", "data.csv", CONTENT)
+    return any_storage
+
+
+def _download(storage, tmp_path, container="clientes"):
+    out_dir = tmp_path / "out"
+    out_dir.mkdir(exist_ok=True)
+    storage.download_blob(container, "data.csv", str(out_dir))
+    return (out_dir / "data.csv").read_bytes()
+
+
+@pytest.mark.parametrize("tier", ["cool", "archive"])
+def test_cold_tier_compresses_and_rehydrates_on_read(tmp_path, any_storage, tier, capsys):
+    any_storage.set_blob_tags("clientes", "data.csv", {"owner": "ana"})
+    any_storage.set_blob_tier("clientes", "data.csv", tier)
+    assert f"moved to the {tier} tier" in capsys.readouterr().out
+
+    metadata = any_storage.get_blob_metadata("clientes", "data.csv")
+    assert metadata["tier"] == tier
+    assert metadata["size"] == len(CONTENT)
+    assert metadata["cold"]["length"] < len(CONTENT) // 10
+    assert metadata["tags"] == {"owner": "ana"}
+    assert any_storage.backend.blob_size("clientes", "data.csv") == 0
+    assert any_storage.list_blobs("clientes", verbose=False) == ["data.csv"]
+    assert [b["name"] for b in any_storage.find_blobs_by_tags("owner = 'ana'")] == ["data.csv"]
+    assert [b["name"] for b in any_storage.find_blobs_by_tags(f"tier = '{tier}'")] == ["data.csv"]
+    assert any_storage.find_blobs_by_tags("tier = 'hot'") == []
+
+    assert _download(any_storage, tmp_path) == CONTENT
+    metadata = any_storage.get_blob_metadata("clientes", "data.csv")
+    assert metadata["tier"] == "hot"
+    assert "cold" not in metadata
+    assert [b["name"] for b in any_storage.find_blobs_by_tags("tier = 'hot'")] == ["data.csv"]
+    assert metadata["last_accessed_at"]
+    assert any_storage.backend.blob_size("clientes", "data.csv") == len(CONTENT)
+
+
+def test_hot_download_does_not_read_sidecar_metadata(tmp_path, any_storage, monkeypatch):
+    any_storage.get_blob_metadata("clientes", "data.csv")  # carga el índice
+
+    def fail(*args):
+        raise AssertionError("download_blob should use the in-memory index")
+
+    monkeypatch.setattr(any_storage.backend, "read_metadata", fail)
+    assert _download(any_storage, tmp_path) == CONTENT
+
+
+def test_move_between_cold_tiers_and_back(tmp_path, any_storage, capsys):
+    any_storage.set_blob_tier("clientes", "data.csv", "cool")
+    any_storage.set_blob_tier("clientes", "data.csv", "archive")
+    assert any_storage.get_blob_metadata("clientes", "data.csv")["cold"]["codec"] == "lzma"
+    any_storage.set_blob_tier("clientes", "data.csv", "archive")
+    assert "already in the archive tier" in capsys.readouterr().out
+    any_storage.set_blob_tier("clientes", "data.csv", "hot")
+    assert _download(any_storage, tmp_path) == CONTENT
+
+    any_storage.set_blob_tags("clientes", "data.csv", {"tier": "cool"})
+    assert "'tier' is a reserved field name" in capsys.readouterr().out
+    any_storage.set_blob_tier("clientes", "data.csv", "frozen")
+    any_storage.set_blob_tier("clientes", "missing.csv", "cool")
+    out = capsys.readouterr().out
+    assert "Invalid tier 'frozen'" in out
+    assert "not found" in out
+
+
+def test_tier_policy_demotes_idle_blobs(tmp_path, any_storage, capsys):
+    source = tmp_path / "reciente.csv"
+    source.write_text("x")
+    any_storage.upload_blob("clientes", str(source))
+    later = datetime.now(timezone.utc) + timedelta(days=45)
+
+    moved = any_storage.apply_tier_policy(cool_after_days=30, now=later)
+    assert moved == {"cool": 2, "archive": 0}
+    moved = any_storage.apply_tier_policy(
+        cool_after_days=30, archive_after_days=40, now=later
+    )
+    assert moved == {"cool": 0, "archive": 2}
+    # La política nunca sube de nivel.
+    assert any_storage.apply_tier_policy(now=later) == {"cool": 0, "archive": 0}
+
+    assert _download(any_storage, tmp_path) == CONTENT
+    assert any_storage.apply_tier_policy(cool_after_days=1) == {"cool": 0, "archive": 0}
+    tiers = {
+        name: any_storage.get_blob_metadata("clientes", name)["tier"]
+        for name in ("data.csv", "reciente.csv")
+    }
+    assert tiers == {"data.csv": "hot", "reciente.csv": "archive"}
+
+
+def test_cold_blobs_in_snapshots_and_exports(tmp_path, any_storage):
+    any_storage.set_blob_tier("clientes", "data.csv", "cool")
+    snapshot = any_storage.create_container_snapshot("clientes")
+    assert _download(any_storage, tmp_path, f"clientes@{snapshot}") == CONTENT
+    assert any_storage.get_blob_metadata(f"clientes@{snapshot}", "data.csv")["tier"] == "cool"
+
+    archive = tmp_path / "clientes.tar"
+    any_storage.export_container("clientes", str(archive))
+    target = Storage(base_path=tmp_path / "destino")
+    target.import_container(str(archive))
+    assert "tier" not in target.get_blob_metadata("clientes", "data.csv")
+    assert _download(target, tmp_path) == CONTENT
+
+
+def test_replaced_cold_objects_are_reclaimed(tmp_path, any_storage):
+    cold = any_storage._get_cold()
+    for _ in range(5):
+        any_storage.set_blob_tier("clientes", "data.csv", "cool")
+        any_storage.set_blob_tier("clientes", "data.csv", "archive")
+        assert len(cold.objects("clientes")) == 1
+        assert _download(any_storage, tmp_path) == CONTENT
+        assert cold.objects("clientes") == {}
+
+    # Un snapshot mantiene vivo el objeto que referencia.
+    any_storage.set_blob_tier("clientes", "data.csv", "cool")
+    snapshot = any_storage.create_container_snapshot("clientes")
+    assert _download(any_storage, tmp_path) == CONTENT
+    assert len(cold.objects("clientes")) == 1
+    assert _download(any_storage, tmp_path, f"clientes@{snapshot}") == CONTENT
+    any_storage.delete_snapshot("clientes", snapshot)
+    assert cold.objects("clientes") == {}
+
+    # Tras restaurar, el contenedor comparte el objeto con el snapshot.
+    any_storage.set_blob_tier("clientes", "data.csv", "cool")
+    snapshot = any_storage.create_container_snapshot("clientes")
+    any_storage.set_blob_tier("clientes", "data.csv", "hot")
+    assert any_storage.restore_snapshot("clientes", snapshot)
+    any_storage.delete_snapshot("clientes", snapshot)
+    assert len(cold.objects("clientes")) == 1
+    assert _download(any_storage, tmp_path) == CONTENT
+
+    any_storage.set_blob_tier("clientes", "data.csv", "archive")
+    any_storage.delete_blob("clientes", "data.csv")
+    assert cold.objects("clientes") == {}
+
+
+def test_interrupted_tier_change_is_recovered(tmp_path, monkeypatch, capsys):
+    storage = Storage(base_path=tmp_path / "root")
+    storage.create_container("clientes")
+    source = tmp_path / "data.csv"
+    source.write_bytes(CONTENT)
+    storage.upload_blob("clientes", str(source))
+
+    # El proceso "muere" justo después de dejar el marcador vacío en el backend.
+    write_blob = storage.backend.write_blob
+
+    def crash(*args, **kwargs):
+        write_blob(*args, **kwargs)
+        raise SystemExit
+
+    monkeypatch.setattr(storage.backend, "write_blob", crash)
+    with pytest.raises(SystemExit):
+        storage.set_blob_tier("clientes", "data.csv", "archive")
+    monkeypatch.undo()
+    assert (tmp_path / "root" / "clientes" / "data.csv").stat().st_size == 0
+
+    monkeypatch.setattr("bloblite.journal.pid_alive", lambda pid: False)
+    other = Storage(base_path=tmp_path / "root")
+    other.find_blobs_by_tags("size > 0")  # recupera al abrir el índice
+    assert "Recovered interrupted tier change of 'data.csv'" in capsys.readouterr().out
+    metadata = other.get_blob_metadata("clientes", "data.csv")
+    assert metadata["tier"] == "archive"
+    assert _download(other, tmp_path) == CONTENT
+
+
+def test_tier_change_aborts_if_blob_changed_meanwhile(tmp_path, monkeypatch, capsys):
+    storage = Storage(base_path=tmp_path / "root")
+    other = Storage(base_path=tmp_path / "root")
+    storage.create_container("clientes")
+    source = tmp_path / "data.csv"
+    source.write_bytes(CONTENT)
+    storage.upload_blob("clientes", str(source))
+
+    from bloblite import tiering
+
+    compress = tiering.compress
+
+    def overwrite_then_compress(stream, codec):
+        # Otro proceso sobrescribe el blob mientras se comprime el anterior.
+        source.write_bytes(b"nuevo")
+        other.upload_blob("clientes", str(source), overwrite=True)
+        return compress(stream, codec)
+
+    monkeypatch.setattr(tiering, "compress", overwrite_then_compress)
+    storage.set_blob_tier("clientes", "data.csv", "cool")
+    assert "changed while moving it to cool" in capsys.readouterr().out
+    metadata = storage.get_blob_metadata("clientes", "data.csv")
+    assert metadata["size"] == 5 and "tier" not in metadata
+    assert _download(storage, tmp_path) == b"nuevo"
+
+    # Una actualización de last_accessed_at con metadata vieja tampoco pisa nada.
+    monkeypatch.setattr("bloblite.storage._ACCESS_RESOLUTION", -1)
+    stale = storage.get_blob_metadata("clientes", "data.csv")
+    other.set_blob_tags("clientes", "data.csv", {"owner": "ana"})
+    storage._touch("clientes", stale)
+    metadata = other.get_blob_metadata("clientes", "data.csv")
+    assert metadata["tags"] == {"owner": "ana"} and "last_accessed_at" not in metadata
+    storage._touch("clientes", storage.get_blob_metadata("clientes", "data.csv"))
+    metadata = other.get_blob_metadata("clientes", "data.csv")
+    assert metadata["tags"] == {"owner": "ana"} and metadata["last_accessed_at"]
+
+
+def test_sdk_and_cli_tiers(tmp_path, monkeypatch, capsys):
+    client = BlobServiceClient(storage_root=tmp_path / "root")
+    container = client.get_container_client("clientes")
+    container.create_container()
+    source = tmp_path / "data.csv"
+    source.write_bytes(CONTENT)
+    container.upload_blob(source)
+    container.set_blob_tier("data.csv", "cool")
+    assert container.get_blob_metadata("data.csv")["tier"] == "cool"
+    assert container.apply_tier_policy(cool_after_days=0) == {"cool": 0, "archive": 0}
+
+    monkeypatch.setenv("BLOBLITE_ROOT", str(tmp_path / "root"))
+    main(["blob", "set-tier", "--container", "clientes", "--name", "data.csv", "--tier", "hot"])
+    main(["blob", "apply-tier-policy", "--container", "clientes", "--archive-after-days", "0"])
+    main(["blob", "apply-tier-policy", "--cool-after-days", "soon"])
+    out = capsys.readouterr().out
+    assert "moved to the hot tier" in out
+    assert "Tier policy moved 0 blob(s) to cool and 1 to archive" in out
+    assert "must be numbers of days" in out
+
+
+def test_cold_blobs_share_packs_that_are_compacted(tmp_path, any_storage, upload):
+    cold = any_storage._get_cold()
+    names = ["data.csv"] + [f"extra{i}.csv" for i in range(3)]
+    for i, name in enumerate(names[1:]):
+        upload(any_storage, "clientes", name, CONTENT + bytes([i]))
+    for name in names:
+        any_storage.set_blob_tier("clientes", name, "archive")
+    packs = cold.objects("clientes")
+    assert len(packs) == 1
+
+    # Un snapshot fija el pack: no se compacta aunque casi todo esté muerto.
+    snapshot = any_storage.create_container_snapshot("clientes")
+    for name in names[1:]:
+        any_storage.set_blob_tier("clientes", name, "hot")
+    assert cold.objects("clientes") == packs
+
+    any_storage.delete_snapshot("clientes", snapshot)
+    any_storage.set_blob_tier("clientes", "extra0.csv", "cool")
+    compacted = cold.objects("clientes")
+    assert len(compacted) == 1 and sum(compacted.values()) < sum(packs.values())
+    assert any_storage.get_blob_metadata("clientes", "data.csv")["cold"]["object"] in compacted
+    assert _download(any_storage, tmp_path) == CONTENT
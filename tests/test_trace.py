@@ -0,0 +1,227 @@
+import pytest
+
+from bloblite.backends import create_backend
+from bloblite.cli import main
+from bloblite.sdk.blob_service_client import BlobServiceClient
+from bloblite.storage import Storage
+from bloblite.trace import MAGIC, TraceRecorder, name_hash, percentile, read_trace, replay
+
+
+def _record_workload(tmp_path, trace):
+    storage = Storage(base_path=tmp_path / "root", trace=trace)
+    storage.create_container("clientes")
+    for i in range(3):
+        source = tmp_path / f"file{i}.csv"
+        source.write_bytes(b"x" * (i * 100))
+        storage.upload_blob("clientes", str(source))
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    storage.download_blob("clientes", "file2.csv", str(out_dir))
+    storage.set_blob_tags("clientes", "file1.csv", {"owner": "ana"})
+    storage.list_blobs("clientes", verbose=False)
+    storage.delete_blob("clientes", "file0.csv")
+    storage.trace.close()
+    return storage
+
+
+def test_recorder_writes_compact_trace(tmp_path):
+    trace = tmp_path / "trace.bin"
+    _record_workload(tmp_path, trace)
+
+    records = list(read_trace(trace))
+    # set_blob_tags y download_blob llaman a otros métodos: solo cuenta el de primer nivel.
+    assert [r.op for r in records] == [
+        "create_container",
+        "upload_blob",
+        "upload_blob",
+        "upload_blob",
+        "download_blob",
+        "set_blob_tags",
+        "list_blobs",
+        "delete_blob",
+    ]
+    assert {r.container for r in records} == {"clientes"}
+    assert records[3].size == 200 and records[3].name_hash == name_hash("file2.csv")
+    assert records[4].size == 200 and records[4].name_hash == name_hash("file2.csv")
+    assert all(r.duration >= 0 for r in records)
+    # Los nombres de los blobs no se guardan en la traza.
+    assert b"file2.csv" not in trace.read_bytes()
+    assert len(trace.read_bytes()) < 400
+
+
+def test_replay_against_scratch_storage(tmp_path):
+    trace = tmp_path / "trace.bin"
+    _record_workload(tmp_path, trace)
+    records = list(read_trace(trace))
+
+    # La traza empieza a mitad: el blob descargado debe existir antes de reproducirla.
+    scratch = Storage(backend=create_backend("memory", tmp_path / "scratch"), trace=False)
+    latencies = replay(records[4:], scratch, tmp_path / "data", speed=0, workers=2)
+    assert {op: len(values) for op, values in latencies.items()} == {
+        "download_blob": 1,
+        "set_blob_tags": 1,
+        "list_blobs": 1,
+        "delete_blob": 1,
+    }
+    seeded = {f"blob-{name_hash(name):016x}": name for name in ("file1.csv", "file2.csv")}
+    assert sorted(scratch.list_blobs("clientes", verbose=False)) == sorted(seeded)
+    sizes = {seeded[b]: scratch.get_blob_metadata("clientes", b)["size"] for b in seeded}
+    assert sizes == {"file1.csv": 100, "file2.csv": 200}
+
+
+def test_trace_from_environment_and_sdk(tmp_path, monkeypatch):
+    monkeypatch.setenv("BLOBLITE_TRACE", str(tmp_path / "trace-{pid}.bin"))
+    client = BlobServiceClient(storage_root=tmp_path / "root")
+    client.get_container_client("clientes").create_container()
+    client.list_containers()
+    client.storage.trace.close()
+    assert client.storage.trace.path.name.startswith("trace-")
+    assert [r.op for r in read_trace(client.storage.trace.path)] == [
+        "create_container",
+        "list_containers",
+    ]
+
+    untraced = BlobServiceClient(storage_root=tmp_path / "root", trace=False)
+    assert untraced.storage.trace is None
+
+
+def test_storages_share_one_trace_file(tmp_path):
+    trace = tmp_path / "shared.bin"
+    first = Storage(base_path=tmp_path / "root", trace=trace)
+    second = Storage(base_path=tmp_path / "root", trace=str(trace))
+    assert first.trace is second.trace
+    first.create_container("a")
+    second.create_container("b")
+    first.list_blobs("b", verbose=False)
+    # Otro proceso (aquí, otro recorder sobre el mismo archivo) escribe a la vez.
+    TraceRecorder(trace).record(4, "a", None, 0, 0.0, 0.0)
+    first.trace.close()
+
+    records = list(read_trace(trace))
+    assert [(r.op, r.container) for r in records] == [
+        ("create_container", "a"),
+        ("create_container", "b"),
+        ("list_blobs", "b"),
+        ("list_blobs", "a"),
+    ]
+    assert trace.read_bytes().count(MAGIC) == 1
+    # Cerrar el recorder compartido y abrir otro Storage vuelve a registrar.
+    third = Storage(base_path=tmp_path / "root", trace=trace)
+    third.list_containers(verbose=False)
+    third.trace.close()
+    assert len(list(read_trace(trace))) == 5
+
+
+def test_read_trace_rejects_foreign_files(tmp_path):
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"not a trace")
+    with pytest.raises(ValueError, match="not a BlobLite trace"):
+        list(read_trace(other))
+    assert percentile([], 50) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
+
+
+def test_cli_replay_reports_latencies(tmp_path, capsys):
+    trace = tmp_path / "trace.bin"
+    _record_workload(tmp_path, trace)
+    capsys.readouterr()
+
+    main(["replay", str(trace), "--speed", "max", "--workers", "2"])
+    out = capsys.readouterr().out
+    assert "Replayed 8 operation(s)" in out
+    assert "upload_blob" in out and "p99 ms" in out
+
+    scratch = tmp_path / "scratch"
+    main(["replay", str(trace), "--speed", "50x", "--root", str(scratch)])
+    assert (scratch / "root" / "clientes").is_dir()
+
+    for argv in (["--speed", "fast"], ["--workers", "0"]):
+        with pytest.raises(SystemExit):
+            main(["replay", str(trace), *argv])
+    with pytest.raises(SystemExit):
+        main(["replay", str(tmp_path / "missing.bin")])
+    out = capsys.readouterr().out
+    assert "--speed must look like" in out
+    assert "--workers must be a positive integer" in out
+    assert "Cannot read trace" in out
+
+
+def test_every_public_operation_has_its_own_code(tmp_path):
+    trace = tmp_path / "trace.bin"
+    _record_workload(tmp_path, tmp_path / "first.bin")
+    storage = Storage(base_path=tmp_path / "root", trace=trace)
+    storage.upload_blob("clientes", str(tmp_path / "file1.csv"), overwrite=True)
+    storage.get_blob_tags("clientes", "file1.csv")
+    storage.set_blob_tier("clientes", "file1.csv", "archive")
+    storage.find_blobs_by_tags("owner = 'ana'", container="clientes")
+    list(storage.iter_changes("clientes"))
+    storage.change_feed_cursor("clientes")
+    list(storage.watch("clientes", timeout=0))
+    storage.export_container("clientes", str(tmp_path / "clientes.tar"))
+    storage.import_container(str(tmp_path / "clientes.tar"), "copia")
+    snapshot = storage.create_container_snapshot("clientes")
+    storage.list_blobs(f"clientes@{snapshot}", verbose=False)
+    storage.list_snapshots("clientes", verbose=False)
+    storage.restore_snapshot("clientes", snapshot)
+    storage.delete_snapshot("clientes", snapshot)
+    storage.apply_tier_policy("clientes")
+    storage.recover()
+    storage.trace.close()
+
+    records = list(read_trace(trace))
+    assert [r.op for r in records] == [
+        "upload_blob",
+        "get_blob_tags",
+        "set_blob_tier",
+        "find_blobs_by_tags",
+        "iter_changes",
+        "change_feed_cursor",
+        "watch",
+        "export_container",
+        "import_container",
+        "create_container_snapshot",
+        "list_blobs",
+        "list_snapshots",
+        "restore_snapshot",
+        "delete_snapshot",
+        "apply_tier_policy",
+        "recover",
+    ]
+    assert records[0].flags == 1 and records[8].flags == 0
+    assert records[2].flags == 3  # "archive"
+    assert records[8].container == "copia"
+    assert records[9].name_hash == records[12].name_hash == name_hash(snapshot)
+
+    scratch = Storage(backend=create_backend("memory", tmp_path / "scratch"), trace=False)
+    created = []
+    create = scratch.create_container
+    scratch.create_container = lambda name: created.append(name) or create(name)
+    latencies = replay(records, scratch, tmp_path / "data", speed=0, workers=3)
+    assert set(latencies) == {r.op for r in records}
+    # Solo se crean de antemano los contenedores usados sin crearlos antes.
+    assert sorted(created) == ["clientes", "copia"]
+    assert scratch.get_blob_metadata("clientes", f"blob-{name_hash('file1.csv'):016x}")["tier"] == (
+        "archive"
+    )
+    assert scratch.list_snapshots("clientes", verbose=False) == []
+    assert len(scratch.list_blobs("copia", verbose=False)) == 1
+
+
+def test_replay_keeps_container_creation_and_overwrite_flag(tmp_path, capsys):
+    trace = tmp_path / "trace.bin"
+    _record_workload(tmp_path, trace)
+    records = list(read_trace(trace))
+    capsys.readouterr()
+    assert [r.flags for r in records if r.op == "upload_blob"] == [0, 0, 0]
+
+    scratch = Storage(backend=create_backend("memory", tmp_path / "scratch"), trace=False)
+    created = []
+    create = scratch.create_container
+    scratch.create_container = lambda name: created.append(name) or create(name)
+    # La segunda subida sin overwrite falla igual que fallaría en la grabación.
+    latencies = replay(records + records[2:3], scratch, tmp_path / "data", speed=0, workers=2)
+    assert created == ["clientes"]
+    assert len(latencies["upload_blob"]) == 4
+    assert len(scratch.list_blobs("clientes", verbose=False)) == 2
+    assert "already exists in container 'clientes'" in capsys.readouterr().out